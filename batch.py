@@ -0,0 +1,221 @@
+"""
+批处理模块
+按清单（JSON或CSV）批量执行裁切/剪辑任务，支持多进程并发和中断后续跑
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core import ExportError, iter_export, parse_crop, parse_trim
+from parallel_export import resolve_worker_count
+from utils import generate_output_filename
+
+
+def _parse_param(value, parser):
+    """解析清单中的裁切/时间裁切参数，可以是字符串、字典或空值"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, dict):
+        return value
+    return parser(str(value))
+
+
+def load_manifest(manifest_path, output_dir=None):
+    """
+    读取任务清单
+
+    JSON清单为对象列表，CSV清单需要表头；两者的字段均为
+    input、crop（"x,y,w,h"）、trim（"start:end"）、output（可选）。
+
+    Args:
+        manifest_path: 清单文件路径
+        output_dir: 未指定output时的输出目录，默认与输入文件相同
+
+    Returns:
+        任务列表，每个任务为包含input、output、crop_params、trim_params的字典
+    """
+    with open(manifest_path, encoding="utf-8", newline="") as f:
+        if manifest_path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = json.load(f)
+
+    jobs = []
+    for row in rows:
+        crop_params = _parse_param(row.get("crop"), parse_crop)
+        trim_params = _parse_param(row.get("trim"), parse_trim)
+        output_path = row.get("output")
+        if not output_path:
+            file_name = generate_output_filename(
+                row["input"],
+                crop_params["width"] if crop_params else 0,
+                crop_params["height"] if crop_params else 0,
+                trim_params is not None,
+                trim_params["start_frame"] if trim_params else 0,
+                trim_params["end_frame"] if trim_params else 0,
+            )
+            output_path = os.path.join(
+                output_dir or os.path.dirname(os.path.abspath(row["input"])), file_name
+            )
+        jobs.append(
+            {
+                "input": row["input"],
+                "output": os.path.abspath(output_path),
+                "crop_params": crop_params,
+                "trim_params": trim_params,
+            }
+        )
+    return jobs
+
+
+def load_state(state_path):
+    """读取批处理状态文件，不存在时返回空状态"""
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state_path, state):
+    """原子地写入批处理状态文件，避免中断时文件损坏"""
+    temp_path = state_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, state_path)
+
+
+def run_job(job):
+    """
+    在工作进程中执行单个任务
+
+    Returns:
+        任务结果字典（status为"done"或"failed"）
+    """
+    started = time.perf_counter()
+    frames = 0
+    try:
+        # 批处理已在任务之间并行，单个任务内不再分段并行
+        for event in iter_export(
+            job["input"],
+            job["output"],
+            job["crop_params"],
+            job["trim_params"],
+            parallel_workers=1,
+        ):
+            if event["type"] == "progress":
+                frames = event["processed"]
+    except (ExportError, OSError) as e:
+        return {"status": "failed", "error": str(e)}
+
+    return {
+        "status": "done",
+        "frames": frames,
+        "bytes": os.path.getsize(job["output"]),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def run_batch(jobs, state_path, workers=0, log=print):
+    """
+    并发执行任务清单，已完成的任务会被跳过
+
+    Args:
+        jobs: load_manifest()返回的任务列表
+        state_path: 状态文件路径，每个任务结束后立即更新
+        workers: 进程数，0表示按CPU核数自动选择
+        log: 输出日志的函数
+
+    Returns:
+        汇总信息字典
+    """
+    state = load_state(state_path)
+    pending = [job for job in jobs if state.get(job["output"], {}).get("status") != "done"]
+    skipped = len(jobs) - len(pending)
+    if skipped:
+        log(f"跳过已完成的任务: {skipped} 个")
+
+    started = time.perf_counter()
+    summary = {
+        "total": len(jobs),
+        "skipped": skipped,
+        "done": 0,
+        "failed": 0,
+        "frames": 0,
+        "bytes": 0,
+    }
+
+    if pending:
+        context = multiprocessing.get_context("spawn")
+        max_workers = min(resolve_worker_count(workers), len(pending))
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = {executor.submit(run_job, job): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 工作进程崩溃（如BrokenProcessPool）或任务中未处理的异常只记为该任务失败，
+                    # 不影响其余任务的结果
+                    result = {"status": "failed", "error": str(e) or type(e).__name__}
+                result["input"] = job["input"]
+                state[job["output"]] = result
+                save_state(state_path, state)
+
+                if result["status"] == "done":
+                    summary["done"] += 1
+                    summary["frames"] += result["frames"]
+                    summary["bytes"] += result["bytes"]
+                    log(f"完成: {job['output']} ({result['frames']} 帧, {result['seconds']:.1f}s)")
+                else:
+                    summary["failed"] += 1
+                    log(f"失败: {job['input']}: {result['error']}")
+
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = elapsed
+    summary["fps"] = summary["frames"] / elapsed if elapsed > 0 else 0.0
+    summary["mb_per_second"] = summary["bytes"] / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def format_summary(summary):
+    """格式化汇总信息"""
+    return (
+        f"任务: {summary['total']} | 完成: {summary['done']} | 失败: {summary['failed']} | "
+        f"跳过: {summary['skipped']}\n"
+        f"总帧数: {summary['frames']} | 用时: {summary['seconds']:.1f}s | "
+        f"吞吐: {summary['fps']:.1f} 帧/s, {summary['mb_per_second']:.2f} MB/s（输出）"
+    )
+
+
+def main(argv=None):
+    """批处理命令行入口点"""
+    parser = argparse.ArgumentParser(
+        prog="videoclip-batch", description="按清单批量执行视频裁切和剪辑"
+    )
+    parser.add_argument("manifest", help="任务清单文件（.json 或 .csv）")
+    parser.add_argument("--state", help="状态文件路径，默认为 <清单>.state.json")
+    parser.add_argument("--output-dir", help="未指定output的任务的输出目录")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="并发进程数，默认按CPU核数")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_manifest(args.manifest, args.output_dir)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"错误: 无法读取清单: {e}", file=sys.stderr)
+        return 2
+
+    state_path = args.state or os.path.splitext(args.manifest)[0] + ".state.json"
+    summary = run_batch(jobs, state_path, args.workers)
+    print(format_summary(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
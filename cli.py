@@ -0,0 +1,217 @@
+"""
+命令行入口模块
+无需图形界面即可执行视频裁切和剪辑
+"""
+
+import argparse
+import os
+import sys
+
+from core import (
+    ExportError,
+    export_multi,
+    export_split,
+    export_video,
+    parse_crop,
+    parse_ranges,
+    parse_trim,
+    probe_video,
+)
+from utils import generate_output_filename, invert_ranges, keep_ranges_to_trim, split_every
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="videoclip-cli",
+        description="视频尺寸裁切和时间剪辑（命令行版）",
+    )
+    parser.add_argument("input", help="输入视频文件")
+    parser.add_argument(
+        "-o",
+        "--output",
+        action="append",
+        help="输出文件路径，默认根据裁切参数自动生成；多个裁切区域时按顺序对应",
+    )
+    parser.add_argument(
+        "--crop",
+        type=parse_crop,
+        action="append",
+        help="空间裁切区域 x,y,w,h（像素）；可重复指定，一次解码同时导出多个区域",
+    )
+    parser.add_argument(
+        "--trim",
+        type=parse_trim,
+        action="append",
+        help=(
+            "时间裁切范围 start:end（帧号，均包含）；用逗号分隔多个范围时拼接为一个输出，"
+            "重复指定时一次顺序读取导出多个片段"
+        ),
+    )
+    parser.add_argument(
+        "--cut",
+        type=parse_ranges,
+        metavar="START:END[,START:END...]",
+        help="要删除的帧范围（如广告、空白），其余部分拼接为一个输出",
+    )
+    parser.add_argument(
+        "--split-every",
+        type=float,
+        metavar="SECONDS",
+        help="按固定时长把整个视频切分为多个文件（一次顺序读取）",
+    )
+    parser.add_argument(
+        "--trim-mode",
+        choices=["smart", "copy", "reencode"],
+        help="仅时间剪辑时的处理方式，默认使用配置中的TRIM_MODE",
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=["auto", "ffmpeg", "opencv"],
+        help="重新编码时的编码后端，默认使用配置中的EXPORT_ENCODER",
+    )
+    parser.add_argument("--codec", help="ffmpeg编码器名称，如 libx264、libx265")
+    parser.add_argument("--crf", type=int, help="ffmpeg编码质量（CRF）")
+    parser.add_argument("--preset", help="ffmpeg编码速度预设，如 ultrafast、veryfast、medium")
+    parser.add_argument("--info", action="store_true", help="只输出视频信息，不处理")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度")
+    return parser
+
+
+def default_output_path(input_path, crop_params, trim_params):
+    """生成与图形界面一致的默认输出路径（与输入文件位于同一目录）"""
+    file_name = generate_output_filename(
+        input_path,
+        crop_params["width"] if crop_params else 0,
+        crop_params["height"] if crop_params else 0,
+        trim_params is not None,
+        trim_params["start_frame"] if trim_params else 0,
+        trim_params["end_frame"] if trim_params else 0,
+    )
+    return os.path.join(os.path.dirname(os.path.abspath(input_path)), file_name)
+
+
+def resolve_outputs(input_path, jobs, outputs):
+    """
+    确定每个输出文件的路径
+
+    Args:
+        input_path: 输入文件路径
+        jobs: [(裁切参数, 时间裁切参数), ...]，每项对应一个输出文件
+        outputs: 命令行指定的输出路径列表，None表示自动生成
+
+    Raises:
+        ValueError: 指定的输出路径数与输出文件数不一致
+    """
+    if outputs:
+        if len(outputs) != len(jobs):
+            raise ValueError("-o 的数量须与 --crop 或 --trim 的数量一致")
+        return outputs
+
+    paths = []
+    for crop_params, trim_params in jobs:
+        path = default_output_path(input_path, crop_params, trim_params)
+        if path in paths and crop_params:
+            # 尺寸相同的区域自动生成的文件名相同，按位置区分
+            base, extension = os.path.splitext(path)
+            path = f"{base}_at_{crop_params['x']}_{crop_params['y']}{extension}"
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    """命令行入口点"""
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.info:
+            info = probe_video(args.input)
+            print(
+                f"尺寸: {info['width']}x{info['height']} | 帧率: {info['fps']:.2f} | "
+                f"总帧数: {info['total_frames']} | 时长: {info['duration']:.3f}s"
+            )
+            return 0
+
+        if not (args.crop or args.trim or args.split_every or args.cut):
+            print("错误: 请至少指定 --crop、--trim、--cut 或 --split-every", file=sys.stderr)
+            return 2
+
+        crops = args.crop or [None]
+        trims = args.trim or [None]
+        try:
+            if args.split_every is not None:
+                if args.trim:
+                    raise ValueError("--split-every 不能与 --trim 同时使用")
+                info = probe_video(args.input)
+                trims = split_every(info["total_frames"], info["fps"], args.split_every)
+            if args.cut is not None:
+                if args.trim or args.split_every is not None:
+                    raise ValueError("--cut 不能与 --trim 或 --split-every 同时使用")
+                info = probe_video(args.input)
+                trims = [keep_ranges_to_trim(invert_ranges(args.cut, info["total_frames"]))]
+            if len(crops) > 1 and len(trims) > 1:
+                raise ValueError("多个 --crop 不能与多个时间片段同时使用")
+            jobs = [(crop_params, trim_params) for crop_params in crops for trim_params in trims]
+            output_paths = resolve_outputs(args.input, jobs, args.output)
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 2
+
+        def on_progress(processed, total):
+            """在标准错误输出同一行刷新进度"""
+            if not args.quiet and total > 0:
+                percent = processed / total * 100
+                print(f"\r进度: {processed}/{total} 帧 ({percent:.1f}%)", end="", file=sys.stderr)
+
+        def on_warning(message):
+            """在标准错误输出警告"""
+            print(f"\n警告: {message}", file=sys.stderr)
+
+        encoder_params = {
+            "backend": args.encoder,
+            "codec": args.codec,
+            "crf": args.crf,
+            "preset": args.preset,
+        }
+        if len(crops) > 1:
+            export_multi(
+                args.input,
+                list(zip(crops, output_paths)),
+                trims[0],
+                on_progress=on_progress,
+                on_warning=on_warning,
+                encoder_params=encoder_params,
+            )
+        elif len(trims) > 1:
+            output_paths = export_split(
+                args.input,
+                list(zip(trims, output_paths)),
+                crops[0],
+                on_progress=on_progress,
+                on_warning=on_warning,
+                encoder_params=encoder_params,
+            )
+        else:
+            export_video(
+                args.input,
+                output_paths[0],
+                crops[0],
+                trims[0],
+                args.trim_mode,
+                on_progress=on_progress,
+                on_warning=on_warning,
+                encoder_params=encoder_params,
+            )
+    except ExportError as e:
+        print(f"\n错误: {e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    for output_path in output_paths:
+        print(output_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
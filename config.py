@@ -3,6 +3,9 @@
 包含应用程序的配置常量和设置
 """
 
+import os
+import tempfile
+
 # 窗口配置
 WINDOW_TITLE = "视频尺寸裁切工具"
 WINDOW_SIZE = "1000x700"
@@ -19,10 +22,70 @@ SUPPORTED_VIDEO_FORMATS = [("视频文件", "*.mp4 *.avi *.mov *.mkv *.flv"), ("
 OUTPUT_VIDEO_FORMATS = [("MP4视频", "*.mp4"), ("AVI视频", "*.avi"), ("所有文件", "*.*")]
 
 # 处理配置
-PROGRESS_UPDATE_INTERVAL = 10  # 每多少帧更新一次进度
+PROGRESS_UPDATE_SECONDS = 0.1  # 导出进度的最短更新间隔（秒）
+UI_EVENT_POLL_MS = 50  # UI线程处理后台事件队列的间隔（毫秒）
+EXPORT_QUEUE_SIZE = 16  # 导出流水线各阶段之间队列的容量（帧数）
+PARALLEL_EXPORT_WORKERS = 0  # 分段并行导出的进程数，0表示按CPU核数自动选择，1表示禁用
+PARALLEL_EXPORT_MIN_FRAMES = 3000  # 导出帧数不少于该值时才分段并行（需要安装ffmpeg用于拼接）
+PARALLEL_EXPORT_CHUNKS_PER_WORKER = 2  # 每个进程平均分到的分段数
 DEFAULT_OUTPUT_EXTENSION = ".mp4"
 VIDEO_FOURCC = "mp4v"
+# 仅时间剪辑（无空间裁切）时的处理方式：
+#   "smart"    - 只重新编码首尾不完整的GOP，中间流复制，帧精确且接近流复制速度（需要ffmpeg）
+#   "copy"     - 用ffmpeg按关键帧流复制，不重新编码，保留音频（需要安装ffmpeg）
+#   "reencode" - 逐帧解码并重新编码
+TRIM_MODE = "smart"
+FFMPEG_BINARY = "ffmpeg"
+FFPROBE_BINARY = "ffprobe"
+# 重新编码导出时使用的编码后端：
+#   "auto"   - 安装了ffmpeg时通过管道交给ffmpeg编码，否则使用OpenCV
+#   "ffmpeg" - 通过标准输入向ffmpeg传送原始帧，可选编码器、CRF和速度预设，多线程编码
+#   "opencv" - cv2.VideoWriter，使用VIDEO_FOURCC
+EXPORT_ENCODER = "auto"
+FFMPEG_ENCODER_CODEC = "libx264"
+FFMPEG_ENCODER_CRF = 20  # 质量（越小质量越高、文件越大）
+FFMPEG_ENCODER_PRESET = "veryfast"  # 速度预设（x264/x265），越快压缩率越低
+FFMPEG_ENCODER_THREADS = 0  # 编码线程数，0表示由编码器自动选择
+# 使用ffmpeg编码时，逐帧导出也用ffmpeg解码并全程保持YUV420平面格式（不转换为BGR）
+EXPORT_YUV_NATIVE = True
+
+# 解码缓存配置
+FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 已解码帧缓存的内存上限（字节）
+SEQUENTIAL_GRAB_LIMIT = 30  # 向前跳转不超过该帧数时用grab()逐帧跳过，而不是seek
+DECODER_POOL_MAX_HANDLES = 4  # 同一视频同时打开的解码器句柄上限（预览、播放、导出等）
+
+# 磁盘缓存配置（探测信息、关键帧索引和缩略图，重新打开同一文件时复用）
+DISK_CACHE_ENABLED = True
+# 可用环境变量VIDEOCLIP_CACHE_PATH指定位置（工作进程会继承）
+DISK_CACHE_PATH = os.environ.get("VIDEOCLIP_CACHE_PATH") or os.path.join(
+    os.path.expanduser("~"), ".cache", "videoclip", "cache.sqlite3"
+)
+DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 磁盘缓存总大小上限（字节），超出时按LRU淘汰
+
+# 代理文件配置（高分辨率视频用低分辨率全帧内编码的代理文件预览，导出仍使用原文件）
+PROXY_MODE = "auto"  # "auto"：像素数不少于PROXY_MIN_PIXELS时生成；"always"；"off"
+PROXY_MIN_PIXELS = 2560 * 1440
+PROXY_HEIGHT = 540  # 代理文件的高度
+PROXY_CODEC = "MJPG"  # 代理文件编码（全帧内编码）
+PROXY_DIR = os.path.join(tempfile.gettempdir(), "videoclip_proxies")
+PROXY_DIR_MAX_BYTES = 4 * 1024 * 1024 * 1024  # 代理目录总大小上限（字节），超出时删除最久未用的代理
+
+# 播放配置
+PLAYBACK_READ_AHEAD = True  # 播放时使用后台线程预读解码
+PLAYBACK_BUFFER_SIZE = 8  # 预读缓冲区可容纳的帧数
+PLAYBACK_SPEEDS = [0.25, 0.5, 1.0, 1.5, 2.0, 4.0, 8.0]  # 可选的播放速度（倍速）
+PLAYBACK_MIN_SPEED = 0.25
+PLAYBACK_MAX_SPEED = 8.0
+ASYNC_SCRUB = True  # 拖动预览帧滑块时在后台线程解码，只解码最新请求的帧
+SCRUB_POLL_INTERVAL_MS = 10  # 拖动时检查后台解码结果的间隔（毫秒）
+
+# 时间轴胶片条配置
+FILMSTRIP_ENABLED = True
+THUMBNAIL_HEIGHT = 40  # 胶片条缩略图高度（像素）
+THUMBNAIL_REFINE_LEVELS = 3  # 第一遍覆盖整个范围后，最多再加密的次数（每次采样点数翻倍）
+FILMSTRIP_POLL_MS = 200  # 生成缩略图期间刷新胶片条的间隔（毫秒）
 
 # UI配置
+RESIZE_DEBOUNCE_MS = 80  # 窗口大小停止变化该毫秒数后才重绘
 BUTTON_WIDTH = 15
 SLIDER_LENGTH = 150
@@ -0,0 +1,283 @@
+"""
+核心接口模块
+提供不依赖tkinter和PIL的裁切/剪辑导出接口，可用于命令行、脚本和无界面的渲染节点
+"""
+
+import queue
+
+from utils import keep_ranges_to_trim
+from video_processor import DirectCallbackManager, VideoProcessor
+
+
+class ExportError(RuntimeError):
+    """导出失败"""
+
+
+def parse_crop(text):
+    """
+    解析裁切参数字符串 "x,y,w,h"
+
+    Returns:
+        裁切参数 {'x': int, 'y': int, 'width': int, 'height': int}
+    """
+    parts = [part.strip() for part in text.split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"裁切参数格式应为 x,y,w,h: {text}")
+    x, y, width, height = (int(part) for part in parts)
+    if x < 0 or y < 0 or width <= 0 or height <= 0:
+        raise ValueError(f"裁切参数无效: {text}")
+    return {"x": x, "y": y, "width": width, "height": height}
+
+
+def parse_ranges(text):
+    """
+    解析帧范围列表字符串 "start:end[,start:end...]"（帧号，均包含）
+
+    Returns:
+        [(起始帧, 结束帧), ...]
+    """
+    ranges = []
+    for item in text.split(","):
+        parts = [part.strip() for part in item.split(":")]
+        if len(parts) != 2:
+            raise ValueError(f"时间裁切参数格式应为 start:end: {text}")
+        start_frame, end_frame = (int(part) for part in parts)
+        if start_frame < 0 or end_frame < start_frame:
+            raise ValueError(f"时间裁切参数无效: {text}")
+        ranges.append((start_frame, end_frame))
+    return ranges
+
+
+def parse_trim(text):
+    """
+    解析时间裁切参数字符串 "start:end"（帧号，均包含）
+
+    用逗号分隔多个范围（"0:99,200:299"）时，这些范围按顺序拼接为一个输出。
+
+    Returns:
+        时间裁切参数 {'start_frame': int, 'end_frame': int}，多个范围时另有 'ranges'
+    """
+    return keep_ranges_to_trim(parse_ranges(text))
+
+
+def probe_video(input_path):
+    """
+    获取视频信息
+
+    Returns:
+        与VideoProcessor.get_video_info()相同的字典
+
+    Raises:
+        ExportError: 无法打开视频
+    """
+    processor = VideoProcessor(DirectCallbackManager())
+    try:
+        success, message = processor.load_video(input_path)
+        if not success:
+            raise ExportError(message)
+        return processor.get_video_info()
+    finally:
+        processor.release()
+
+
+def iter_export(
+    input_path,
+    output_path,
+    crop_params=None,
+    trim_params=None,
+    trim_mode=None,
+    parallel_workers=None,
+    encoder_params=None,
+):
+    """
+    执行导出并以迭代器的方式报告进度
+
+    使用与图形界面完全相同的VideoProcessor导出流程。
+
+    Args:
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        crop_params: 裁切参数，None表示不裁切
+        trim_params: 时间裁切参数，None表示处理整个视频
+        trim_mode: 仅时间剪辑时的处理方式，默认使用config.TRIM_MODE
+        parallel_workers: 分段并行导出的进程数，默认使用config.PARALLEL_EXPORT_WORKERS
+        encoder_params: 重新编码时的编码参数（后端、编码器、CRF、预设、线程数），
+            未指定的项使用config中的默认值
+
+    Yields:
+        事件字典：{"type": "progress", "processed": int, "total": int}
+        或 {"type": "warning", "message": str}，最后是 {"type": "complete", "output_path": str}
+
+    Raises:
+        ExportError: 无法打开视频或导出失败
+    """
+    yield from _iter_events(
+        input_path,
+        lambda processor: processor.process_video(output_path, crop_params, trim_params, trim_mode),
+        parallel_workers,
+        encoder_params,
+    )
+
+
+def _iter_events(input_path, start, parallel_workers=None, encoder_params=None):
+    """
+    加载视频，调用start(processor)开始后台导出，并以迭代器的方式转发回调事件
+
+    Raises:
+        ExportError: 无法打开视频或导出失败
+    """
+    events = queue.Queue()
+    callback_manager = DirectCallbackManager()
+    callback_manager.set_callbacks(
+        progress_cb=lambda processed, total: events.put(
+            {"type": "progress", "processed": processed, "total": total}
+        ),
+        complete_cb=lambda path: events.put({"type": "complete", "output_path": path}),
+        error_cb=lambda message: events.put({"type": "error", "message": message}),
+        warning_cb=lambda message: events.put({"type": "warning", "message": message}),
+    )
+
+    processor = VideoProcessor(callback_manager)
+    if parallel_workers is not None:
+        processor.parallel_workers = parallel_workers
+    processor.encoder_params = encoder_params
+    try:
+        success, message = processor.load_video(input_path)
+        if not success:
+            raise ExportError(message)
+
+        start(processor)
+        while True:
+            event = events.get()
+            if event["type"] == "error":
+                raise ExportError(event["message"])
+            yield event
+            if event["type"] == "complete":
+                return
+    finally:
+        processor.release()
+
+
+def export_video(
+    input_path,
+    output_path,
+    crop_params=None,
+    trim_params=None,
+    trim_mode=None,
+    on_progress=None,
+    on_warning=None,
+    parallel_workers=None,
+    encoder_params=None,
+):
+    """
+    执行导出直到完成
+
+    Args:
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        crop_params: 裁切参数，None表示不裁切
+        trim_params: 时间裁切参数，None表示处理整个视频
+        trim_mode: 仅时间剪辑时的处理方式，默认使用config.TRIM_MODE
+        on_progress: 进度回调 on_progress(已处理帧数, 总帧数)
+        on_warning: 警告回调 on_warning(消息)
+        parallel_workers: 分段并行导出的进程数，默认使用config.PARALLEL_EXPORT_WORKERS
+        encoder_params: 重新编码时的编码参数，未指定的项使用config中的默认值
+
+    Returns:
+        输出文件路径
+
+    Raises:
+        ExportError: 无法打开视频或导出失败
+    """
+    events = iter_export(
+        input_path,
+        output_path,
+        crop_params,
+        trim_params,
+        trim_mode,
+        parallel_workers,
+        encoder_params,
+    )
+    for event in events:
+        if event["type"] == "progress" and on_progress:
+            on_progress(event["processed"], event["total"])
+        elif event["type"] == "warning" and on_warning:
+            on_warning(event["message"])
+    return output_path
+
+
+def export_multi(
+    input_path,
+    targets,
+    trim_params=None,
+    on_progress=None,
+    on_warning=None,
+    encoder_params=None,
+):
+    """
+    从同一次解码导出多个裁切区域，直到全部完成
+
+    Args:
+        input_path: 输入文件路径
+        targets: [(裁切参数, 输出文件路径), ...]，裁切参数为None表示不裁切
+        trim_params: 时间裁切参数，None表示处理整个视频
+        on_progress: 进度回调 on_progress(所有输出都已完成的帧数, 总帧数)
+        on_warning: 警告回调 on_warning(消息)
+        encoder_params: 编码参数，未指定的项使用config中的默认值
+
+    Returns:
+        输出文件路径列表
+
+    Raises:
+        ExportError: 无法打开视频或导出失败
+    """
+    events = _iter_events(
+        input_path,
+        lambda processor: processor.process_video_multi(targets, trim_params),
+        encoder_params=encoder_params,
+    )
+    return _wait_for_completion(events, on_progress, on_warning)
+
+
+def export_split(
+    input_path,
+    clips,
+    crop_params=None,
+    on_progress=None,
+    on_warning=None,
+    encoder_params=None,
+):
+    """
+    顺序读一遍源视频，把若干帧范围分别导出为独立的文件，直到全部完成
+
+    Args:
+        input_path: 输入文件路径
+        clips: [(时间裁切参数, 输出文件路径), ...]，范围可以重叠
+        crop_params: 所有片段共用的裁切参数，None表示不裁切
+        on_progress: 进度回调 on_progress(已处理帧数, 总帧数)
+        on_warning: 警告回调 on_warning(消息)
+        encoder_params: 编码参数，未指定的项使用config中的默认值
+
+    Returns:
+        已写出的输出文件路径列表
+
+    Raises:
+        ExportError: 无法打开视频或导出失败
+    """
+    events = _iter_events(
+        input_path,
+        lambda processor: processor.process_video_split(clips, crop_params),
+        encoder_params=encoder_params,
+    )
+    return _wait_for_completion(events, on_progress, on_warning)
+
+
+def _wait_for_completion(events, on_progress=None, on_warning=None):
+    """转发事件直到完成，返回完成事件中的输出路径"""
+    for event in events:
+        if event["type"] == "progress" and on_progress:
+            on_progress(event["processed"], event["total"])
+        elif event["type"] == "warning" and on_warning:
+            on_warning(event["message"])
+        elif event["type"] == "complete":
+            return event["output_path"]
@@ -104,8 +104,8 @@ class CropController:
         y2 = max(0, min(y2, self.canvas.display_image.height))
 
         # 计算原始坐标（考虑缩放）
-        if hasattr(self.canvas, "current_frame") and self.canvas.current_frame is not None:
-            frame_height, frame_width = self.canvas.current_frame.shape[:2]
+        if getattr(self.canvas, "frame_shape", None) is not None:
+            frame_height, frame_width = self.canvas.frame_shape[:2]
 
             self.crop_x = int(x1 / self.canvas.scale_x)
             self.crop_y = int(y1 / self.canvas.scale_y)
@@ -0,0 +1,202 @@
+"""
+磁盘缓存模块
+以SQLite数据库持久保存视频的探测信息、关键帧索引和缩略图，重新打开同一文件时直接复用
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from config import DISK_CACHE_ENABLED, DISK_CACHE_MAX_BYTES, DISK_CACHE_PATH
+
+# 默认缓存实例，首次使用时创建
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def file_key(video_path):
+    """
+    计算视频文件的缓存键，由绝对路径、文件大小和修改时间决定
+
+    文件被修改或替换后键随之改变，旧条目不会被误用，最终由LRU淘汰。
+    """
+    stat = os.stat(video_path)
+    text = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_default_cache():
+    """获取默认的磁盘缓存，禁用或无法打开时返回None"""
+    global _default_cache
+    if not DISK_CACHE_ENABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = DiskCache(DISK_CACHE_PATH)
+            except (OSError, sqlite3.Error):
+                return None
+        return _default_cache
+
+
+class DiskCache:
+    """
+    持久化缓存
+
+    条目以 (文件键, 类型, 名称) 为主键保存为二进制数据，记录大小和最近访问时间。
+    总大小超过上限时按最近访问时间淘汰最久未使用的条目（LRU）。
+    总大小在内存中累计，只有估计值超过上限时才扫描数据库重新统计并淘汰。
+    可被多个线程共享；缓存损坏或写入失败时只是退化为未命中，不影响调用方。
+    """
+
+    def __init__(self, path, max_bytes=DISK_CACHE_MAX_BYTES):
+        """
+        初始化磁盘缓存
+
+        Args:
+            path: SQLite数据库文件路径
+            max_bytes: 缓存总大小上限（字节）
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, "
+                "value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL, "
+                "PRIMARY KEY (key, kind, name))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        # 条目总大小的估计值（其他进程同时写入时可能偏小，超过上限时重新统计校正）
+        self._total = self._sum_sizes()
+
+    def get(self, key, kind, name=""):
+        """读取条目，未命中时返回None"""
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT value FROM entries WHERE key = ? AND kind = ? AND name = ?",
+                    (key, kind, name),
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    "UPDATE entries SET accessed = ? WHERE key = ? AND kind = ? AND name = ?",
+                    (time.time(), key, kind, name),
+                )
+                return bytes(row[0])
+        except sqlite3.Error:
+            return None
+
+    def put(self, key, kind, value, name=""):
+        """写入条目，必要时淘汰最久未使用的条目"""
+        if len(value) > self.max_bytes:
+            return
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT size FROM entries WHERE key = ? AND kind = ? AND name = ?",
+                    (key, kind, name),
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, kind, name, sqlite3.Binary(value), len(value), time.time()),
+                )
+                self._total += len(value) - (row[0] if row else 0)
+                if self._total > self.max_bytes:
+                    self._evict()
+        except sqlite3.Error:
+            pass
+
+    def _sum_sizes(self):
+        """扫描数据库统计条目总大小"""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        """重新统计总大小，超过上限时删除最久未访问的条目（需持有锁）"""
+        total = self._sum_sizes()
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT rowid, size FROM entries ORDER BY accessed ASC"
+        ).fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+        self._total = total
+
+    def total_bytes(self):
+        """缓存条目的总大小（字节）"""
+        with self._lock:
+            return self._sum_sizes()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._total = 0
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def get_json(self, key, kind, name=""):
+        """读取JSON条目"""
+        value = self.get(key, kind, name)
+        if value is None:
+            return None
+        try:
+            return json.loads(value.decode("utf-8"))
+        except ValueError:
+            return None
+
+    def put_json(self, key, kind, data, name=""):
+        """写入JSON条目"""
+        self.put(key, kind, json.dumps(data).encode("utf-8"), name)
+
+    def get_arrays(self, key, kind, name=""):
+        """读取以npz格式保存的数组字典"""
+        value = self.get(key, kind, name)
+        if value is None:
+            return None
+        try:
+            with np.load(io.BytesIO(value)) as data:
+                return {array_name: data[array_name] for array_name in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def put_arrays(self, key, kind, arrays, name=""):
+        """以压缩的npz格式写入数组字典"""
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        self.put(key, kind, buffer.getvalue(), name)
+
+    def get_thumbnail(self, key, frame_number, height):
+        """读取缩略图（BGR），未命中时返回None"""
+        value = self.get(key, "thumbnail", f"{height}@{frame_number}")
+        if value is None:
+            return None
+        return cv2.imdecode(np.frombuffer(value, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def put_thumbnail(self, key, frame_number, image):
+        """以JPEG格式写入缩略图，名称中包含缩略图高度以区分不同尺寸"""
+        success, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if success:
+            self.put(key, "thumbnail", encoded.tobytes(), f"{image.shape[0]}@{frame_number}")
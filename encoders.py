@@ -0,0 +1,242 @@
+"""
+编码器模块
+导出时可选的视频编码后端：通过标准输入向ffmpeg子进程传送原始帧，或使用OpenCV的VideoWriter
+"""
+
+import os
+import subprocess
+import tempfile
+
+import cv2
+import numpy as np
+
+from config import (
+    EXPORT_ENCODER,
+    FFMPEG_ENCODER_CODEC,
+    FFMPEG_ENCODER_CRF,
+    FFMPEG_ENCODER_PRESET,
+    FFMPEG_ENCODER_THREADS,
+    VIDEO_FOURCC,
+)
+from ffmpeg_tools import find_ffmpeg
+
+# 编码参数的默认值，encoder_params中未指定的项使用这些值
+DEFAULT_ENCODER_PARAMS = {
+    "backend": EXPORT_ENCODER,
+    "codec": FFMPEG_ENCODER_CODEC,
+    "crf": FFMPEG_ENCODER_CRF,
+    "preset": FFMPEG_ENCODER_PRESET,
+    "threads": FFMPEG_ENCODER_THREADS,
+}
+
+# 支持-preset参数的编码器
+PRESET_CODECS = ("libx264", "libx265", "libsvtav1")
+
+
+class EncoderError(IOError):
+    """编码器创建或写入失败"""
+
+
+def resolve_encoder_params(encoder_params=None):
+    """合并默认值，并把"auto"后端解析为实际使用的后端"""
+    params = dict(DEFAULT_ENCODER_PARAMS)
+    if encoder_params:
+        params.update({key: value for key, value in encoder_params.items() if value is not None})
+    if params["backend"] == "auto":
+        params["backend"] = "ffmpeg" if find_ffmpeg() else "opencv"
+    return params
+
+
+def build_encoder_command(ffmpeg, output_path, fps, frame_size, encoder_params, pix_fmt="bgr24"):
+    """
+    构建从标准输入读取原始帧并编码的ffmpeg命令
+
+    Args:
+        ffmpeg: ffmpeg可执行文件路径
+        output_path: 输出文件路径
+        fps: 帧率
+        frame_size: 帧尺寸 (宽, 高)
+        encoder_params: resolve_encoder_params()返回的编码参数
+        pix_fmt: 输入帧的像素格式
+    """
+    width, height = frame_size
+    codec = encoder_params["codec"]
+    command = [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        pix_fmt,
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        f"{fps:.6f}",
+        "-i",
+        "-",
+        "-an",
+        "-c:v",
+        codec,
+    ]
+    if encoder_params.get("crf") is not None:
+        command += ["-crf", str(encoder_params["crf"])]
+    if encoder_params.get("preset") and codec in PRESET_CODECS:
+        command += ["-preset", encoder_params["preset"]]
+    command += ["-threads", str(encoder_params.get("threads") or 0)]
+    if width % 2 or height % 2:
+        # yuv420p要求宽高为偶数，奇数尺寸补一行/列
+        command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+    command += ["-pix_fmt", "yuv420p", output_path]
+    return command
+
+
+class OpenCVEncoder:
+    """使用cv2.VideoWriter编码（单线程，未安装ffmpeg时的后备方案）"""
+
+    def __init__(self, output_path, fps, frame_size, fourcc=VIDEO_FOURCC):
+        """
+        创建编码器
+
+        Raises:
+            EncoderError: 无法创建输出文件
+        """
+        self.output_path = output_path
+        self._writer = cv2.VideoWriter(
+            output_path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size
+        )
+        if not self._writer.isOpened():
+            raise EncoderError("无法创建输出文件")
+
+    def write(self, frame):
+        """写入一帧BGR图像"""
+        self._writer.write(frame)
+
+    def close(self):
+        """完成编码"""
+        self._writer.release()
+
+    def abort(self):
+        """放弃编码并删除输出文件"""
+        self._writer.release()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+
+class FFmpegPipeEncoder:
+    """
+    通过标准输入向ffmpeg子进程传送原始帧进行编码
+
+    编码在独立进程中进行，可使用x264/x265等编码器的多线程和速度预设，
+    不占用Python进程的GIL。
+    """
+
+    def __init__(self, output_path, fps, frame_size, encoder_params=None, pix_fmt="bgr24"):
+        """
+        启动ffmpeg编码进程
+
+        Args:
+            output_path: 输出文件路径
+            fps: 帧率
+            frame_size: 帧尺寸 (宽, 高)
+            encoder_params: 编码参数，未指定的项使用默认值
+            pix_fmt: 写入帧的像素格式，"bgr24"或"yuv420p"
+
+        Raises:
+            EncoderError: 未安装ffmpeg或无法启动
+        """
+        ffmpeg = find_ffmpeg()
+        if ffmpeg is None:
+            raise EncoderError("未找到ffmpeg")
+
+        self.output_path = output_path
+        self.command = build_encoder_command(
+            ffmpeg, output_path, fps, frame_size, resolve_encoder_params(encoder_params), pix_fmt
+        )
+        # 错误输出写入临时文件，避免管道写满导致子进程阻塞
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=self._stderr,
+            )
+        except OSError as e:
+            self._stderr.close()
+            raise EncoderError(f"无法启动ffmpeg: {e}") from e
+
+    def write(self, frame):
+        """
+        写入一帧
+
+        BGR帧为一个数组；YUV420帧为 (Y, U, V) 三个平面，依次写入。
+        裁切得到的非连续数组会先复制为连续内存。
+        """
+        planes = frame if isinstance(frame, tuple) else (frame,)
+        try:
+            for plane in planes:
+                self._process.stdin.write(np.ascontiguousarray(plane).data)
+        except (BrokenPipeError, OSError) as e:
+            self._process.wait()
+            raise EncoderError(self._error_message() or f"ffmpeg写入失败: {e}") from e
+
+    def close(self):
+        """
+        关闭输入并等待编码完成
+
+        Raises:
+            EncoderError: ffmpeg返回非零退出码
+        """
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        returncode = self._process.wait()
+        message = self._error_message()
+        self._stderr.close()
+        if returncode != 0:
+            raise EncoderError(message or f"ffmpeg退出码 {returncode}")
+
+    def abort(self):
+        """终止编码进程并删除输出文件"""
+        self._process.kill()
+        self._process.wait()
+        self._stderr.close()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def _error_message(self):
+        """读取ffmpeg的错误输出"""
+        self._stderr.seek(0)
+        return self._stderr.read().decode("utf-8", errors="replace").strip()
+
+
+def create_encoder(output_path, fps, frame_size, encoder_params=None, pix_fmt="bgr24"):
+    """
+    按编码参数创建编码器
+
+    Args:
+        output_path: 输出文件路径
+        fps: 帧率
+        frame_size: 帧尺寸 (宽, 高)
+        encoder_params: {"backend": "auto"/"ffmpeg"/"opencv", "codec", "crf", "preset",
+            "threads"}，未指定的项使用config中的默认值
+        pix_fmt: 写入帧的像素格式，"yuv420p"只有ffmpeg后端支持
+
+    Returns:
+        具有write()、close()、abort()方法的编码器
+
+    Raises:
+        EncoderError: 无法创建编码器
+    """
+    params = resolve_encoder_params(encoder_params)
+    if params["backend"] == "ffmpeg":
+        return FFmpegPipeEncoder(output_path, fps, frame_size, params, pix_fmt)
+    if params["backend"] == "opencv":
+        if pix_fmt != "bgr24":
+            raise EncoderError("OpenCV编码器只接受BGR帧")
+        return OpenCVEncoder(output_path, fps, frame_size)
+    raise EncoderError(f"未知的编码后端: {params['backend']}")
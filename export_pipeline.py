@@ -0,0 +1,285 @@
+"""
+导出流水线模块
+将导出拆分为解码、变换、编码三个阶段，分别在独立线程中并行执行
+"""
+
+import queue
+import threading
+import time
+
+from config import EXPORT_QUEUE_SIZE
+
+# 阶段之间传递的结束标记
+_END = object()
+
+
+class PipelineError(RuntimeError):
+    """流水线某个阶段处理失败"""
+
+    def __init__(self, stage, frame_number, error):
+        """
+        初始化流水线错误
+
+        Args:
+            stage: 出错的阶段名称
+            frame_number: 出错时正在处理的帧号，未知时为None
+            error: 原始异常
+        """
+        super().__init__(str(error))
+        self.stage = stage
+        self.frame_number = frame_number
+        self.error = error
+
+
+class ExportPipeline:
+    """
+    三级导出流水线：解码 → 变换 → 编码
+
+    各阶段之间使用有界队列连接：下游处理不过来时上游在队列上阻塞（反压），
+    任一阶段出错时其余阶段立即停止，错误在run()中重新抛出。
+    OpenCV的解码、编码在执行时会释放GIL，因此各阶段可以真正并行。
+    """
+
+    def __init__(self, read_frames, transform, write_frame, queue_size=EXPORT_QUEUE_SIZE):
+        """
+        初始化导出流水线
+
+        Args:
+            read_frames: 返回 (帧号, 帧) 迭代器的函数，在解码线程中执行
+            transform: 变换函数 transform(帧号, 帧) -> 帧，在变换线程中执行
+            write_frame: 编码函数 write_frame(帧号, 帧)，在调用run()的线程中执行
+            queue_size: 阶段之间队列的容量（帧数）
+        """
+        self.read_frames = read_frames
+        self.transform = transform
+        self.write_frame = write_frame
+        self._decoded = queue.Queue(maxsize=queue_size)
+        self._transformed = queue.Queue(maxsize=queue_size)
+        self._abort = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+        self.stats = {"decode": 0.0, "transform": 0.0, "encode": 0.0, "frames": 0, "wall": 0.0}
+
+    def run(self):
+        """
+        运行流水线直到所有帧处理完毕
+
+        Returns:
+            已编码的帧数
+
+        Raises:
+            PipelineError: 任一阶段处理失败
+        """
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._decode_stage, daemon=True),
+            threading.Thread(target=self._transform_stage, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._encode_stage()
+        finally:
+            # 编码阶段结束后确保上游阶段都能退出
+            self._abort.set()
+            for thread in threads:
+                thread.join()
+            self.stats["wall"] = time.perf_counter() - started
+
+        if self._error:
+            raise self._error
+        return self.stats["frames"]
+
+    def cancel(self):
+        """中止流水线"""
+        self._abort.set()
+
+    def _fail(self, stage, frame_number, error):
+        """记录第一个错误并通知所有阶段停止"""
+        with self._error_lock:
+            if self._error is None:
+                self._error = PipelineError(stage, frame_number, error)
+        self._abort.set()
+
+    def _put(self, target, item):
+        """放入队列，队列满时等待；流水线中止时返回False"""
+        while not self._abort.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source):
+        """从队列取出，队列空时等待；流水线中止时返回结束标记"""
+        while not self._abort.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _decode_stage(self):
+        """解码阶段"""
+        frame_number = None
+        try:
+            frames = iter(self.read_frames())
+            while True:
+                t0 = time.perf_counter()
+                item = next(frames, _END)
+                self.stats["decode"] += time.perf_counter() - t0
+                if item is _END:
+                    break
+                frame_number = item[0]
+                if not self._put(self._decoded, item):
+                    return
+        except Exception as e:
+            self._fail("decode", frame_number, e)
+            return
+        self._put(self._decoded, _END)
+
+    def _transform_stage(self):
+        """变换阶段"""
+        frame_number = None
+        try:
+            while True:
+                item = self._get(self._decoded)
+                if item is _END:
+                    break
+                frame_number, frame = item
+                t0 = time.perf_counter()
+                frame = self.transform(frame_number, frame)
+                self.stats["transform"] += time.perf_counter() - t0
+                if not self._put(self._transformed, (frame_number, frame)):
+                    return
+        except Exception as e:
+            self._fail("transform", frame_number, e)
+            return
+        self._put(self._transformed, _END)
+
+    def _encode_stage(self):
+        """编码阶段"""
+        frame_number = None
+        try:
+            while True:
+                item = self._get(self._transformed)
+                if item is _END:
+                    return
+                frame_number, frame = item
+                t0 = time.perf_counter()
+                self.write_frame(frame_number, frame)
+                self.stats["encode"] += time.perf_counter() - t0
+                self.stats["frames"] += 1
+        except Exception as e:
+            self._fail("encode", frame_number, e)
+
+
+class MultiOutputPipeline(ExportPipeline):
+    """
+    单次解码、多路输出的导出流水线：解码 → 每一路各自的 变换 → 编码
+
+    每一帧只解码一次，然后分发到每一路的有界队列；每一路在独立线程中变换（如裁切）
+    并编码。较慢的编码器只在自己的队列写满时才让解码等待，其余各路继续编码，
+    解码开销不随输出数量增加。
+    """
+
+    def __init__(self, read_frames, outputs, queue_size=EXPORT_QUEUE_SIZE):
+        """
+        初始化多路输出流水线
+
+        Args:
+            read_frames: 返回 (帧号, 帧) 迭代器的函数，在调用run()的线程中执行
+            outputs: [(transform, write_frame), ...]，每一路的变换和编码函数，
+                在该路独立的线程中执行；各路收到的是同一个帧对象，变换不得原地修改
+            queue_size: 每一路队列的容量（帧数）
+        """
+        super().__init__(read_frames, None, None, queue_size)
+        self.outputs = outputs
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in outputs]
+        self._stats_lock = threading.Lock()
+        self.written = [0] * len(outputs)  # 每一路已编码的帧数
+
+    @property
+    def completed_frames(self):
+        """所有输出都已编码完成的帧数"""
+        return min(self.written) if self.written else 0
+
+    def run(self):
+        """
+        运行流水线直到所有帧都写入所有输出
+
+        Returns:
+            解码的帧数
+
+        Raises:
+            PipelineError: 解码或任一路输出失败
+        """
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._output_stage, args=(i,), daemon=True)
+            for i in range(len(self.outputs))
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._fan_out_stage()
+        finally:
+            # 正常结束时各路处理完队列中剩余的帧后退出
+            for thread in threads:
+                thread.join()
+            self.stats["wall"] = time.perf_counter() - started
+
+        if self._error:
+            raise self._error
+        return self.stats["frames"]
+
+    def _fan_out_stage(self):
+        """解码阶段：每帧解码一次，放入每一路的队列"""
+        frame_number = None
+        try:
+            frames = iter(self.read_frames())
+            while True:
+                t0 = time.perf_counter()
+                item = next(frames, _END)
+                self.stats["decode"] += time.perf_counter() - t0
+                if item is _END:
+                    break
+                frame_number = item[0]
+                for target in self._queues:
+                    if not self._put(target, item):
+                        return
+                self.stats["frames"] += 1
+        except Exception as e:
+            self._fail("decode", frame_number, e)
+            return
+        for target in self._queues:
+            self._put(target, _END)
+
+    def _output_stage(self, index):
+        """某一路的变换和编码阶段"""
+        transform, write_frame = self.outputs[index]
+        source = self._queues[index]
+        frame_number = None
+        stage = "transform"
+        try:
+            while True:
+                item = self._get(source)
+                if item is _END:
+                    return
+                frame_number, frame = item
+                stage = "transform"
+                t0 = time.perf_counter()
+                frame = transform(frame_number, frame)
+                t1 = time.perf_counter()
+                stage = "encode"
+                write_frame(frame_number, frame)
+                t2 = time.perf_counter()
+                with self._stats_lock:
+                    self.stats["transform"] += t1 - t0
+                    self.stats["encode"] += t2 - t1
+                self.written[index] += 1
+        except Exception as e:
+            self._fail(f"{stage}[{index}]", frame_number, e)
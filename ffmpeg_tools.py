@@ -0,0 +1,518 @@
+"""
+ffmpeg工具模块
+封装对外部ffmpeg命令的调用，用于无需（或只需少量）重新编码的快速剪辑
+"""
+
+import bisect
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+from config import FFMPEG_BINARY, FFPROBE_BINARY
+
+# 智能渲染时用于重新编码边界GOP的编码器及参数，按源视频编码格式选择
+SMART_RENDER_ENCODERS = {
+    "h264": ["-c:v", "libx264", "-preset", "fast", "-crf", "18"],
+    "hevc": ["-c:v", "libx265", "-preset", "fast", "-crf", "20"],
+    "mpeg4": ["-c:v", "mpeg4", "-q:v", "2"],
+    "mpeg2video": ["-c:v", "mpeg2video", "-q:v", "2"],
+}
+
+# 重新编码的边界GOP与复制的GOP拼接在同一码流中，像素格式（色度采样、位深）和profile
+# 必须与源视频一致；无法匹配时不做智能渲染
+SMART_RENDER_PIX_FMTS = {
+    "h264": (
+        "yuv420p",
+        "yuvj420p",
+        "yuv422p",
+        "yuvj422p",
+        "yuv444p",
+        "yuvj444p",
+        "yuv420p10le",
+        "yuv422p10le",
+        "yuv444p10le",
+    ),
+    "hevc": ("yuv420p", "yuv420p10le", "yuv422p10le", "yuv444p", "yuv444p10le"),
+    "mpeg4": ("yuv420p",),
+    "mpeg2video": ("yuv420p", "yuv422p"),
+}
+
+# ffprobe报告的H.264 profile名称 → libx264的-profile:v
+H264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+
+# HEVC像素格式 → libx265的-profile:v（RExt的具体profile由色度采样和位深决定）
+HEVC_PROFILES = {
+    "yuv420p": "main",
+    "yuv420p10le": "main10",
+    "yuv422p10le": "main422-10",
+    "yuv444p": "main444-8",
+    "yuv444p10le": "main444-10",
+}
+
+# 复制片段写入MPEG-TS时需要的码流过滤器（将参数集放入码流，便于拼接）
+ANNEXB_FILTERS = {
+    "h264": "h264_mp4toannexb",
+    "hevc": "hevc_mp4toannexb",
+}
+
+
+class FFmpegError(RuntimeError):
+    """ffmpeg执行失败"""
+
+
+def find_ffmpeg():
+    """查找ffmpeg可执行文件，未安装时返回None"""
+    return shutil.which(FFMPEG_BINARY)
+
+
+def find_ffprobe():
+    """查找ffprobe可执行文件，未安装时返回None"""
+    return shutil.which(FFPROBE_BINARY)
+
+
+def format_seconds(seconds):
+    """格式化为ffmpeg接受的秒数字符串"""
+    return f"{max(0.0, seconds):.6f}"
+
+
+def build_stream_copy_command(ffmpeg, input_path, output_path, start_time, end_time):
+    """
+    构建流复制剪辑命令
+
+    -ss放在-i之前时ffmpeg按关键帧定位，配合-c copy直接复制数据包，不解码也不编码。
+
+    Args:
+        ffmpeg: ffmpeg可执行文件路径
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        start_time: 起始时间（秒），应为关键帧时间
+        end_time: 结束时间（秒，不包含）
+    """
+    return [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-ss",
+        format_seconds(start_time),
+        "-i",
+        input_path,
+        "-t",
+        format_seconds(end_time - start_time),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a?",
+        "-c",
+        "copy",
+        "-avoid_negative_ts",
+        "make_zero",
+        output_path,
+    ]
+
+
+def run_ffmpeg(command):
+    """
+    执行ffmpeg命令
+
+    Raises:
+        FFmpegError: ffmpeg返回非零退出码
+    """
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise FFmpegError(message or f"ffmpeg退出码 {result.returncode}")
+
+
+def stream_copy_trim(input_path, output_path, start_time, end_time):
+    """
+    以流复制方式剪辑视频（不重新编码，保留音频）
+
+    Args:
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        start_time: 起始关键帧时间（秒）
+        end_time: 结束时间（秒，不包含）
+
+    Raises:
+        FFmpegError: 未安装ffmpeg或执行失败
+    """
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise FFmpegError("未找到ffmpeg")
+    run_ffmpeg(build_stream_copy_command(ffmpeg, input_path, output_path, start_time, end_time))
+
+
+def probe_video_stream(input_path):
+    """
+    获取视频流的编码参数
+
+    Returns:
+        {"codec_name": 编码格式（如h264、hevc）, "pix_fmt": 像素格式, "profile": profile名称,
+         "level": level数值}，ffprobe未报告的项为None
+
+    Raises:
+        FFmpegError: 未安装ffprobe或探测失败
+    """
+    ffprobe = find_ffprobe()
+    if ffprobe is None:
+        raise FFmpegError("未找到ffprobe")
+
+    command = [
+        ffprobe,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=codec_name,pix_fmt,profile,level",
+        "-of",
+        "json",
+        input_path,
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        raise FFmpegError(result.stderr.decode("utf-8", errors="replace").strip())
+
+    streams = json.loads(result.stdout.decode("utf-8") or "{}").get("streams", [])
+    if not streams:
+        raise FFmpegError("未找到视频流")
+    stream = streams[0]
+    return {key: stream.get(key) for key in ("codec_name", "pix_fmt", "profile", "level")}
+
+
+def smart_render_encoder_args(stream):
+    """
+    构建重新编码边界GOP的编码参数，使像素格式、profile和level与源视频一致
+
+    Args:
+        stream: probe_video_stream()返回的视频流参数
+
+    Raises:
+        FFmpegError: 编码格式不支持，或无法匹配源视频的像素格式/profile
+    """
+    codec = stream.get("codec_name")
+    if codec not in SMART_RENDER_ENCODERS:
+        raise FFmpegError(f"智能渲染不支持的编码格式: {codec}")
+
+    pix_fmt = stream.get("pix_fmt")
+    if pix_fmt not in SMART_RENDER_PIX_FMTS[codec]:
+        raise FFmpegError(f"智能渲染无法匹配源视频的像素格式: {pix_fmt}")
+
+    args = SMART_RENDER_ENCODERS[codec] + ["-pix_fmt", pix_fmt]
+    level = stream.get("level") or 0
+    if codec == "h264":
+        profile = H264_PROFILES.get(stream.get("profile"))
+        if profile is None:
+            raise FFmpegError(f"智能渲染无法匹配源视频的profile: {stream.get('profile')}")
+        args += ["-profile:v", profile]
+        if level > 0:
+            # ffprobe报告的H.264 level为level_idc，如41表示4.1
+            args += ["-level", f"{level / 10:.1f}"]
+    elif codec == "hevc":
+        args += ["-profile:v", HEVC_PROFILES[pix_fmt]]
+        if level > 0:
+            # ffprobe报告的HEVC level为general_level_idc，即level的30倍
+            args += ["-x265-params", f"level-idc={level / 30:.1f}"]
+    return args
+
+
+def plan_smart_render(keyframes, start_frame, end_frame, total_frames):
+    """
+    规划智能渲染的分段
+
+    起始和结束处不完整的GOP重新编码，中间完整的GOP直接复制。
+
+    Args:
+        keyframes: 升序的关键帧帧号列表
+        start_frame: 起始帧（包含）
+        end_frame: 结束帧（包含）
+        total_frames: 视频总帧数
+
+    Returns:
+        [(模式, 起始帧, 结束帧(不包含)), ...]，模式为"encode"或"copy"
+    """
+    stop = end_frame + 1
+
+    # 第一个不早于起始帧的关键帧
+    i = bisect.bisect_left(keyframes, start_frame)
+    copy_start = keyframes[i] if i < len(keyframes) else stop
+
+    # 不晚于结束位置的最后一个GOP边界（视频末尾也是边界）
+    if stop >= total_frames:
+        copy_end = stop
+    else:
+        j = bisect.bisect_right(keyframes, stop)
+        copy_end = keyframes[j - 1] if j > 0 else start_frame
+
+    if copy_start >= copy_end:
+        return [("encode", start_frame, stop)]
+
+    segments = []
+    if start_frame < copy_start:
+        segments.append(("encode", start_frame, copy_start))
+    segments.append(("copy", copy_start, copy_end))
+    if copy_end < stop:
+        segments.append(("encode", copy_end, stop))
+    return segments
+
+
+def build_segment_command(ffmpeg, input_path, output_path, mode, start_time, frame_count, stream):
+    """
+    构建智能渲染单个片段的命令（仅视频，输出MPEG-TS）
+
+    Args:
+        ffmpeg: ffmpeg可执行文件路径
+        input_path: 输入文件路径
+        output_path: 片段输出路径
+        mode: "encode"重新编码 或 "copy"流复制
+        start_time: 片段起始时间（秒）
+        frame_count: 片段帧数
+        stream: probe_video_stream()返回的源视频流参数
+    """
+    codec = stream["codec_name"]
+    command = [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-ss",
+        format_seconds(start_time),
+        "-i",
+        input_path,
+        "-map",
+        "0:v:0",
+        "-an",
+        "-frames:v",
+        str(frame_count),
+    ]
+    if mode == "copy":
+        command += ["-c:v", "copy"]
+        if codec in ANNEXB_FILTERS:
+            command += ["-bsf:v", ANNEXB_FILTERS[codec]]
+    else:
+        command += smart_render_encoder_args(stream)
+    command += ["-f", "mpegts", output_path]
+    return command
+
+
+def _concat_list_line(path):
+    """生成concat列表中的一行，转义单引号"""
+    escaped = path.replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def smart_render_trim(input_path, output_path, segments, start_time, end_time, progress=None):
+    """
+    智能渲染剪辑：只重新编码边界GOP，其余部分流复制，然后拼接并复制音频
+
+    Args:
+        input_path: 输入文件路径
+        output_path: 输出文件路径
+        segments: [(模式, 起始时间(秒), 帧数), ...]
+        start_time: 剪辑起始时间（秒），用于截取音频
+        end_time: 剪辑结束时间（秒，不包含），用于截取音频
+        progress: 每完成一个片段调用一次 progress(完成片段数, 片段总数)
+
+    Raises:
+        FFmpegError: 未安装ffmpeg、编码格式或像素格式不支持、或执行失败；
+            调用方应改为完整重新编码
+    """
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise FFmpegError("未找到ffmpeg")
+
+    stream = probe_video_stream(input_path)
+    # 在生成任何片段之前确认能够匹配源视频的编码参数
+    smart_render_encoder_args(stream)
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir:
+        list_path = os.path.join(temp_dir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for i, (mode, segment_start, frame_count) in enumerate(segments):
+                segment_path = os.path.join(temp_dir, f"segment_{i:04d}.ts")
+                run_ffmpeg(
+                    build_segment_command(
+                        ffmpeg, input_path, segment_path, mode, segment_start, frame_count, stream
+                    )
+                )
+                list_file.write(_concat_list_line(segment_path))
+                if progress:
+                    progress(i + 1, len(segments))
+
+        # 拼接视频片段，同时从源文件复制对应时间段的音频
+        run_ffmpeg(
+            [
+                ffmpeg,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                list_path,
+                "-ss",
+                format_seconds(start_time),
+                "-t",
+                format_seconds(end_time - start_time),
+                "-i",
+                input_path,
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a?",
+                "-c",
+                "copy",
+                output_path,
+            ]
+        )
+
+
+def concat_videos(input_paths, output_path):
+    """
+    以流复制方式按顺序拼接编码参数相同的多个视频文件
+
+    Raises:
+        FFmpegError: 未安装ffmpeg或执行失败
+    """
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise FFmpegError("未找到ffmpeg")
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir:
+        list_path = os.path.join(temp_dir, "inputs.txt")
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for path in input_paths:
+                list_file.write(_concat_list_line(os.path.abspath(path)))
+
+        run_ffmpeg(
+            [
+                ffmpeg,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                list_path,
+                "-c",
+                "copy",
+                output_path,
+            ]
+        )
+
+
+def build_yuv_decode_command(ffmpeg, input_path, start_time, frame_count):
+    """
+    构建将视频解码为原始YUV420平面帧并写到标准输出的命令
+
+    转码时-ss放在-i之前也是帧精确的（ffmpeg从前一个关键帧解码并丢弃之前的帧）。
+    passthrough使每个解码出的帧原样输出，不按帧率补帧或丢帧。
+
+    Args:
+        ffmpeg: ffmpeg可执行文件路径
+        input_path: 输入文件路径
+        start_time: 起始时间（秒）
+        frame_count: 输出帧数
+    """
+    return [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-ss",
+        format_seconds(start_time),
+        "-i",
+        input_path,
+        "-map",
+        "0:v:0",
+        "-an",
+        "-vsync",
+        "passthrough",
+        "-frames:v",
+        str(frame_count),
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "yuv420p",
+        "-",
+    ]
+
+
+def iter_yuv420_frames(input_path, width, height, start_time, frame_count):
+    """
+    用ffmpeg解码，逐帧返回YUV420平面，不经过BGR转换
+
+    每帧为 (Y, U, V) 三个二维数组，是同一块只读缓冲区上的视图。
+
+    Args:
+        input_path: 输入文件路径
+        width: 视频宽度（须为偶数）
+        height: 视频高度（须为偶数）
+        start_time: 起始时间（秒）
+        frame_count: 最多读取的帧数
+
+    Raises:
+        FFmpegError: 未安装ffmpeg或解码失败
+    """
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise FFmpegError("未找到ffmpeg")
+
+    luma_size = width * height
+    chroma_size = luma_size // 4
+    frame_bytes = luma_size + 2 * chroma_size
+
+    # 错误输出写入临时文件，避免管道写满导致子进程阻塞
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            build_yuv_decode_command(ffmpeg, input_path, start_time, frame_count),
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+        )
+        finished = False
+        try:
+            for _ in range(frame_count):
+                data = process.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                buffer = np.frombuffer(data, dtype=np.uint8)
+                yield (
+                    buffer[:luma_size].reshape(height, width),
+                    buffer[luma_size : luma_size + chroma_size].reshape(height // 2, width // 2),
+                    buffer[luma_size + chroma_size :].reshape(height // 2, width // 2),
+                )
+            finished = True
+        finally:
+            # 调用方提前结束（取消或出错）时不等待ffmpeg解码完剩余部分
+            process.stdout.close()
+            if not finished:
+                process.kill()
+            returncode = process.wait()
+
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace").strip()
+            raise FFmpegError(message or f"ffmpeg退出码 {returncode}")
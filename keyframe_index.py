@@ -0,0 +1,164 @@
+"""
+关键帧索引模块
+在后台扫描视频容器中的数据包，建立关键帧位置和时间戳索引
+"""
+
+import bisect
+import threading
+
+import cv2
+import numpy as np
+
+
+class KeyframeIndex:
+    """
+    关键帧/GOP索引
+
+    以原始数据包模式（CAP_PROP_FORMAT=-1）读取视频流，只解析容器不解码画面，
+    记录每个关键帧的帧号以及每帧的显示时间戳。索引在后台线程中增量建立，
+    建立过程中已扫描的部分即可用于查询。
+    """
+
+    def __init__(self, video_path, on_complete=None):
+        """
+        初始化关键帧索引
+
+        Args:
+            video_path: 视频文件路径
+            on_complete: 扫描完成时在扫描线程中调用 on_complete(索引)，用于保存到磁盘缓存
+        """
+        self.video_path = video_path
+        self.on_complete = on_complete
+        self._keyframes = []  # 已知关键帧的帧号（升序）
+        self._timestamps = []  # 每帧的时间戳（毫秒），按数据包顺序
+        self._scanned = 0
+        self._complete = False
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def from_arrays(cls, video_path, keyframes, timestamps):
+        """
+        由已保存的数组直接构造完整的索引（不扫描）
+
+        Args:
+            video_path: 视频文件路径
+            keyframes: 关键帧帧号数组
+            timestamps: 每帧时间戳（毫秒）数组，按显示顺序
+        """
+        index = cls(video_path)
+        index._keyframes = [int(n) for n in keyframes]
+        index._timestamps = [float(t) for t in timestamps]
+        index._scanned = len(index._timestamps)
+        index._complete = True
+        return index
+
+    def to_arrays(self):
+        """将完整的索引导出为数组字典，索引未完成时返回None"""
+        with self._lock:
+            if not self._complete:
+                return None
+            return {
+                "keyframes": np.asarray(self._keyframes, dtype=np.int64),
+                "timestamps": np.asarray(self._timestamps, dtype=np.float64),
+            }
+
+    def start(self):
+        """在后台线程中开始建立索引"""
+        self._thread = threading.Thread(target=self._scan_thread, daemon=True)
+        self._thread.start()
+
+    def build(self):
+        """在当前线程中同步建立完整索引"""
+        self._scan_thread()
+        return self._complete
+
+    def cancel(self):
+        """取消后台扫描"""
+        self._cancelled = True
+
+    def wait(self, timeout=None):
+        """等待后台扫描结束"""
+        if self._thread:
+            self._thread.join(timeout)
+        return self._complete
+
+    def _scan_thread(self):
+        """索引扫描线程"""
+        cap = cv2.VideoCapture(self.video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        try:
+            if not cap.isOpened():
+                return
+
+            frame_number = 0
+            while not self._cancelled and cap.grab():
+                is_keyframe = bool(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+
+                with self._lock:
+                    # 数据包按解码顺序到达，对于闭合GOP关键帧之前的包数即其帧号
+                    if is_keyframe:
+                        self._keyframes.append(frame_number)
+                    self._timestamps.append(timestamp)
+                    frame_number += 1
+                    self._scanned = frame_number
+
+            if not self._cancelled:
+                self._finalize()
+                if self.on_complete:
+                    self.on_complete(self)
+        finally:
+            cap.release()
+
+    def _finalize(self):
+        """扫描完成后将时间戳整理为显示顺序"""
+        with self._lock:
+            self._timestamps.sort()
+            self._complete = True
+
+    @property
+    def is_complete(self):
+        """索引是否已建立完成"""
+        return self._complete
+
+    @property
+    def scanned_frames(self):
+        """已扫描的帧数"""
+        return self._scanned
+
+    @property
+    def frame_count(self):
+        """实际帧数，索引未完成时返回None"""
+        return self._scanned if self._complete else None
+
+    @property
+    def keyframes(self):
+        """已知关键帧帧号列表的副本"""
+        with self._lock:
+            return list(self._keyframes)
+
+    def keyframe_before(self, frame_number):
+        """
+        查找不晚于指定帧的最近关键帧
+
+        Args:
+            frame_number: 目标帧号
+
+        Returns:
+            关键帧帧号；目标帧尚未被扫描到时返回None
+        """
+        with self._lock:
+            if frame_number >= self._scanned:
+                return None
+            i = bisect.bisect_right(self._keyframes, frame_number)
+            if i == 0:
+                return None
+            return self._keyframes[i - 1]
+
+    def get_timestamp(self, frame_number):
+        """获取指定帧的显示时间戳（毫秒），索引未完成时返回None"""
+        with self._lock:
+            if not self._complete or not 0 <= frame_number < len(self._timestamps):
+                return None
+            return self._timestamps[frame_number]
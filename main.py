@@ -1,11 +1,14 @@
+import multiprocessing
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
 from config import *
 from crop_controller import CropController
-from ui_components import StatusBar, VideoCanvas, VideoControlPanel
-from utils import format_time, generate_output_filename
+from playback import PlaybackClock, PlaybackReader, ScrubDecoder
+from thumbnails import ThumbnailGenerator
+from ui_components import QUALITY_FAST, QUALITY_HIGH, StatusBar, VideoCanvas, VideoControlPanel
+from utils import format_time, generate_output_filename, keep_ranges_to_trim, merge_ranges
 from video_processor import CallbackManager, VideoProcessor
 
 
@@ -34,6 +37,7 @@ class VideoCropper:
         self._setup_callbacks()
 
         # 绑定窗口调整事件
+        self.resize_timer = None
         self.root.bind("<Configure>", self.on_window_resize)
 
     def _init_components(self):
@@ -49,12 +53,19 @@ class VideoCropper:
         self.callback_manager = CallbackManager(self.root)
         self.video_processor = VideoProcessor(self.callback_manager)
         self.crop_controller = CropController(self.video_canvas)
+        self.scrub_decoder = ScrubDecoder(
+            self.video_processor.get_frame,
+            prepare=self._prepare_scrub_frame,
+            approximate=self.video_processor.get_approximate_frame_number,
+        )
+        self.scrub_decoder.start()
 
         # 状态变量
         self.video_loaded = False
         self.trim_enabled = False
         self.start_frame = 0
         self.end_frame = 0
+        self.keep_ranges = []  # 多段保留范围 [(起始帧, 结束帧), ...]，为空时使用开始帧~结束帧
 
         # 播放控制状态
         self.is_playing = False
@@ -63,15 +74,32 @@ class VideoCropper:
         self.cached_video_info = None  # 缓存视频信息以提高播放性能
         self.current_play_frame = 0  # 播放时的当前帧数（避免频繁查询UI）
         self.last_status_update_frame = -1  # 上次更新状态栏的帧数
+        self.playback_reader = None  # 播放时的后台预读器
+        self.playback_clock = None  # 播放时钟，决定每一帧的呈现时间
+        self.playback_speed = 1.0  # 播放速度（倍速）
+        self.pending_playback_item = None  # 已从预读缓冲区取出但尚未到呈现时间的帧
+        self.playback_canvas_size = (0, 0)  # 预读线程使用的画布尺寸快照
+        self.index_poll_timer = None  # 等待关键帧索引完成的定时器
+        self.proxy_poll_timer = None  # 等待代理文件生成完成的定时器
+        self.loaded_total_frames = 0  # 当前控件使用的总帧数
+        self.scrubbing = False  # 是否正在拖动预览帧滑块
+        self.scrub_canvas_size = (0, 0)  # 拖动解码线程使用的画布尺寸快照
+        self.scrub_poll_timer = None  # 检查拖动解码结果的定时器
+        self.thumbnail_generator = None  # 胶片条缩略图的后台生成器
+        self.filmstrip_poll_timer = None  # 刷新胶片条的定时器
 
     def _setup_callbacks(self):
         """设置组件之间的回调"""
         # 控制面板回调
         self.control_panel.set_callback("browse_file", self.browse_file)
         self.control_panel.set_callback("frame_change", self.update_preview)
+        self.control_panel.set_callback("scrub_start", self.on_scrub_start)
+        self.control_panel.set_callback("scrub_end", self.on_scrub_end)
         self.control_panel.set_callback("toggle_trim", self.toggle_trim)
         self.control_panel.set_callback("start_frame_change", self.update_start_frame)
         self.control_panel.set_callback("end_frame_change", self.update_end_frame)
+        self.control_panel.set_callback("add_range", self.add_keep_range)
+        self.control_panel.set_callback("remove_range", self.remove_keep_range)
         self.control_panel.set_callback("preview_crop", self.preview_crop)
         self.control_panel.set_callback("process_video", self.start_processing)
         self.control_panel.set_callback("reset_selection", self.reset_selection)
@@ -80,6 +108,8 @@ class VideoCropper:
         self.control_panel.set_callback("prev_frame", self.prev_frame)
         self.control_panel.set_callback("next_frame", self.next_frame)
         self.control_panel.set_callback("toggle_play", self.toggle_play)
+        self.control_panel.set_callback("speed_change", self.on_speed_change)
+        self.control_panel.filmstrip.set_callback("seek", self.seek_to_frame)
         self.control_panel.set_callback("set_start_frame", self.set_start_frame_to_current)
         self.control_panel.set_callback("set_end_frame", self.set_end_frame_to_current)
 
@@ -106,17 +136,30 @@ class VideoCropper:
 
     def load_video(self, video_path):
         """加载视频"""
-        success, message = self.video_processor.load_video(video_path)
+        if self.index_poll_timer:
+            self.root.after_cancel(self.index_poll_timer)
+            self.index_poll_timer = None
+        if self.proxy_poll_timer:
+            self.root.after_cancel(self.proxy_poll_timer)
+            self.proxy_poll_timer = None
+        self._stop_thumbnails()
+
+        self.scrub_decoder.cancel()
+        success, message = self.video_processor.load_video(video_path, build_proxy=True)
         if not success:
             messagebox.showerror("错误", message)
             return
 
         self.video_loaded = True
         video_info = self.video_processor.get_video_info()
+        self.video_canvas.set_source_size(video_info["width"], video_info["height"])
+        self.loaded_total_frames = video_info["total_frames"]
 
         # 初始化时间裁切状态变量
         self.start_frame = 0
         self.end_frame = video_info["total_frames"] - 1  # 设置为最后一帧的索引
+        self.keep_ranges = []
+        self.control_panel.set_keep_ranges(self.keep_ranges, video_info["fps"])
 
         # 更新UI
         self.control_panel.update_video_info(video_info["total_frames"], video_info["fps"])
@@ -145,21 +188,155 @@ class VideoCropper:
             )
 
         self.update_time_info()
+        self._start_thumbnails()
+        self.index_poll_timer = self.root.after(500, self._poll_keyframe_index)
+        if self.video_processor.proxy:
+            self.proxy_poll_timer = self.root.after(1000, self._poll_proxy)
+
+    def _poll_keyframe_index(self):
+        """等待后台关键帧索引建立完成，用准确的帧数更新界面"""
+        self.index_poll_timer = None
+        if not self.video_loaded:
+            return
+
+        if not self.video_processor.is_index_complete():
+            self.index_poll_timer = self.root.after(500, self._poll_keyframe_index)
+            return
+
+        video_info = self.video_processor.get_video_info()
+        total_frames = video_info["total_frames"]
+        if total_frames == self.loaded_total_frames:
+            return
+
+        # 容器报告的帧数不准确，按索引统计的帧数更新控件范围
+        self.loaded_total_frames = total_frames
+        self.control_panel.update_video_info(total_frames, video_info["fps"])
+        self.start_frame = self.control_panel.get_start_frame()
+        self.end_frame = self.control_panel.get_end_frame()
+        self.update_time_info()
+        self._start_thumbnails()
+        self.status_bar.set_status(f"关键帧索引已建立，实际总帧数: {total_frames}")
+
+    def _poll_proxy(self):
+        """等待后台代理文件生成完成，完成后用代理文件重绘当前帧"""
+        self.proxy_poll_timer = None
+        proxy = self.video_processor.proxy
+        if not self.video_loaded or proxy is None:
+            return
+
+        if not proxy.is_complete:
+            if proxy.error:
+                self.status_bar.set_status(f"代理文件生成失败，使用原文件预览: {proxy.error}")
+                return
+            self.proxy_poll_timer = self.root.after(1000, self._poll_proxy)
+            if not self.is_playing:
+                self.status_bar.set_status(f"正在生成预览代理文件: {proxy.progress * 100:.0f}%")
+            return
+
+        if not self.is_playing:
+            self.update_preview(self.control_panel.get_current_frame())
+        self.status_bar.set_status(
+            "预览代理文件已就绪，预览和拖动将使用低分辨率代理，导出仍使用原文件"
+        )
+
+    def _start_thumbnails(self):
+        """为当前视频在后台生成胶片条缩略图（已生成的会从磁盘缓存读取）"""
+        self._stop_thumbnails()
+        filmstrip = self.control_panel.filmstrip
+        if not FILMSTRIP_ENABLED or self.loaded_total_frames <= 0:
+            filmstrip.set_generator(None, 0, 0, 1.0)
+            return
+
+        processor = self.video_processor
+        video_info = processor.get_video_info()
+        # 代理文件每一帧都是关键帧，不需要向关键帧对齐
+        keyframe_index = None if processor.using_proxy else processor.keyframe_index
+        self.thumbnail_generator = ThumbnailGenerator(
+            processor.preview_path,
+            self.loaded_total_frames,
+            keyframe_index,
+            disk_cache=processor.disk_cache,
+            cache_key=processor.cache_key,
+            decoder_pool=processor.preview_pool,
+        )
+        filmstrip.set_generator(
+            self.thumbnail_generator,
+            0,
+            self.loaded_total_frames - 1,
+            video_info["width"] / max(1, video_info["height"]),
+        )
+        self.thumbnail_generator.start(filmstrip.slot_count())
+        self.filmstrip_poll_timer = self.root.after(FILMSTRIP_POLL_MS, self._poll_thumbnails)
+
+    def _stop_thumbnails(self):
+        """停止生成缩略图"""
+        if self.filmstrip_poll_timer:
+            self.root.after_cancel(self.filmstrip_poll_timer)
+            self.filmstrip_poll_timer = None
+        if self.thumbnail_generator:
+            self.thumbnail_generator.stop()
+            self.thumbnail_generator = None
+
+    def _poll_thumbnails(self):
+        """生成期间定期用新的缩略图刷新胶片条"""
+        self.filmstrip_poll_timer = None
+        generator = self.thumbnail_generator
+        if generator is None:
+            return
+        self.control_panel.filmstrip.refresh()
+        if not generator.is_complete and generator.error is None:
+            self.filmstrip_poll_timer = self.root.after(FILMSTRIP_POLL_MS, self._poll_thumbnails)
+
+    def seek_to_frame(self, frame_num):
+        """跳转到指定帧（胶片条点击）"""
+        if not self.video_loaded or self.is_playing:
+            return
+        self.control_panel.set_current_frame(frame_num)
+        self.update_preview(frame_num)
+        self.current_play_frame = frame_num
 
     def on_window_resize(self, event=None):
-        """窗口大小改变时重绘当前帧"""
-        if self.video_loaded and not self.is_in_crop_preview:
-            current_frame_num = self.control_panel.get_current_frame()
-            frame = self.video_processor.get_frame(current_frame_num)
-            if frame is not None:
-                self.video_canvas.show_frame(frame)
-                self.crop_controller.redraw_crop_rectangle()
-                self.status_bar.set_scale_info(
-                    self.video_canvas.scale_x,
-                    self.video_canvas.scale_y,
-                    self.video_canvas.display_offset[0],
-                    self.video_canvas.display_offset[1],
-                )
+        """窗口大小改变时合并连续的事件，停止变化后再重绘"""
+        # 绑定在根窗口上的<Configure>也会收到所有子控件的事件，只处理根窗口本身的
+        if event is not None and event.widget is not self.root:
+            return
+        if self.resize_timer:
+            self.root.after_cancel(self.resize_timer)
+        self.resize_timer = self.root.after(RESIZE_DEBOUNCE_MS, self._redraw_after_resize)
+
+    def _redraw_after_resize(self):
+        """按新的画布尺寸重绘当前帧"""
+        self.resize_timer = None
+        if self.playback_reader:
+            canvas_size = self.video_canvas.get_canvas_size()
+            if canvas_size != self.playback_canvas_size:
+                # 缓冲区中的帧按旧尺寸缩放，需要重新预读
+                self.playback_canvas_size = canvas_size
+                self._flush_playback_buffer()
+
+        if not self.video_loaded:
+            return
+
+        self.control_panel.filmstrip.refresh(force=True)
+
+        # 直接从最近显示的原始帧重新缩放，不再解码
+        mode = self.video_canvas.redraw(self._display_quality())
+        if mode is None and not self.is_in_crop_preview and not self.is_playing:
+            # 没有可用的原始帧（例如刚从预读播放停下），回退为解码当前帧
+            frame = self.video_processor.get_frame(self.control_panel.get_current_frame())
+            if frame is None:
+                return
+            self.video_canvas.show_frame(frame, self._display_quality())
+            mode = "frame"
+
+        if mode == "frame":
+            self.crop_controller.redraw_crop_rectangle()
+            self.status_bar.set_scale_info(
+                self.video_canvas.scale_x,
+                self.video_canvas.scale_y,
+                self.video_canvas.display_offset[0],
+                self.video_canvas.display_offset[1],
+            )
 
     def update_preview(self, value):
         """更新预览帧"""
@@ -177,24 +354,35 @@ class VideoCropper:
                 frame_num = self.end_frame
                 self.control_panel.set_current_frame(frame_num)
 
-        frame = self.video_processor.get_frame(frame_num)
+        # 播放中跳转时，预读器和播放时钟从新位置继续
+        if self.is_playing:
+            self.current_play_frame = frame_num
+            self._flush_playback_buffer()
+            if self.playback_clock:
+                self.playback_clock.start(frame_num)
+
+        # 拖动或播放时使用快速缩放，暂停时使用高质量缩放
+        quality = self._display_quality()
+        if self.scrubbing and not self.is_playing and ASYNC_SCRUB:
+            # 拖动时不在UI线程中解码，交给后台线程并立即返回
+            frame = None
+            self._request_scrub_frame(frame_num)
+        else:
+            frame = self.video_processor.get_frame(frame_num)
         if frame is not None:
             # 如果在裁切预览模式下，显示裁切后的帧
             if self.is_in_crop_preview and self.crop_controller.has_valid_crop():
                 crop_params = self.crop_controller.get_crop_params()
                 try:
-                    cropped_frame = frame[
-                        crop_params["y"] : crop_params["y"] + crop_params["height"],
-                        crop_params["x"] : crop_params["x"] + crop_params["width"],
-                    ]
-                    self.video_canvas.show_preview(cropped_frame)
+                    cropped_frame = self._crop_for_display(frame, crop_params)
+                    self.video_canvas.show_preview(cropped_frame, quality)
                 except Exception:
                     # 如果裁切失败，回退到原始帧显示
-                    self.video_canvas.show_frame(frame)
+                    self.video_canvas.show_frame(frame, quality)
                     self.crop_controller.redraw_crop_rectangle()
             else:
                 # 正常模式下显示原始帧
-                self.video_canvas.show_frame(frame)
+                self.video_canvas.show_frame(frame, quality)
                 self.crop_controller.redraw_crop_rectangle()
 
         # 更新状态栏显示当前时间（使用1基索引显示更直观）
@@ -221,21 +409,78 @@ class VideoCropper:
             if self.is_in_crop_preview and self.crop_controller.has_valid_crop():
                 crop_params = self.crop_controller.get_crop_params()
                 try:
-                    cropped_frame = frame[
-                        crop_params["y"] : crop_params["y"] + crop_params["height"],
-                        crop_params["x"] : crop_params["x"] + crop_params["width"],
-                    ]
-                    self.video_canvas.show_preview(cropped_frame)
+                    cropped_frame = self._crop_for_display(frame, crop_params)
+                    self.video_canvas.show_preview(cropped_frame, QUALITY_FAST)
                 except Exception:
                     # 如果裁切失败，回退到原始帧显示
-                    self.video_canvas.show_frame(frame)
+                    self.video_canvas.show_frame(frame, QUALITY_FAST)
                     self.crop_controller.redraw_crop_rectangle()
             else:
                 # 正常模式下显示原始帧
-                self.video_canvas.show_frame(frame)
+                self.video_canvas.show_frame(frame, QUALITY_FAST)
+                self.crop_controller.redraw_crop_rectangle()
+
+        self._update_playback_status(frame_num)
+
+    def _display_quality(self):
+        """当前应使用的显示质量"""
+        if self.scrubbing or self.is_playing:
+            return QUALITY_FAST
+        return QUALITY_HIGH
+
+    def on_scrub_start(self):
+        """开始拖动预览帧滑块"""
+        self.scrubbing = True
+
+    def on_scrub_end(self):
+        """结束拖动预览帧滑块，以高质量重绘停留的帧"""
+        self.scrubbing = False
+        if self.scrub_poll_timer:
+            self.root.after_cancel(self.scrub_poll_timer)
+            self.scrub_poll_timer = None
+        self.scrub_decoder.cancel()
+        if self.video_loaded and not self.is_playing:
+            self.update_preview(self.control_panel.get_current_frame())
+
+    def _request_scrub_frame(self, frame_num):
+        """拖动时请求显示指定帧：已缓存时立即显示，否则交给后台线程解码"""
+        frame = self.video_processor.frame_cache.get(frame_num)
+        if frame is not None:
+            self.scrub_decoder.cancel()
+            self._show_scrub_frame(
+                frame, self._prepare_display_frame(frame, self.video_canvas.get_canvas_size())
+            )
+            return
+
+        self.scrub_canvas_size = self.video_canvas.get_canvas_size()
+        self.scrub_decoder.request(frame_num)
+        if self.scrub_poll_timer is None:
+            self.scrub_poll_timer = self.root.after(SCRUB_POLL_INTERVAL_MS, self._poll_scrub_result)
+
+    def _poll_scrub_result(self):
+        """显示后台线程解码好的拖动帧（可能先是近似的关键帧，随后是精确帧）"""
+        self.scrub_poll_timer = None
+        # 先读取忙碌状态再取结果，保证解码线程空闲时最后的结果不会遗漏
+        busy = self.scrub_decoder.busy
+        result = self.scrub_decoder.get_result()
+        if result is not None:
+            _frame_num, frame, prepared, _exact = result
+            self._show_scrub_frame(frame, prepared)
+        if busy:
+            self.scrub_poll_timer = self.root.after(SCRUB_POLL_INTERVAL_MS, self._poll_scrub_result)
+
+    def _show_scrub_frame(self, frame, prepared):
+        """显示拖动时准备好的帧"""
+        if prepared is None:
+            return
+        if prepared["mode"] == "frame":
+            if self.video_canvas.show_prepared(prepared, source=frame):
                 self.crop_controller.redraw_crop_rectangle()
+        else:
+            self.video_canvas.show_prepared(prepared)
 
-        # 播放时也更新时间信息（但减少更新频率以提高性能）
+    def _update_playback_status(self, frame_num):
+        """播放时更新状态栏（降低更新频率以提高性能）"""
         if hasattr(self, "cached_video_info") and self.cached_video_info:
             # 每5帧更新一次状态栏，提高播放性能
             if (
@@ -249,11 +494,81 @@ class VideoCropper:
                 )
                 time_str = format_time(current_time)
                 status_text = f"播放中: 第{frame_num + 1}帧 / {self.cached_video_info['total_frames']} 帧 (时间: {time_str})"
+                if self.playback_clock:
+                    status_text += (
+                        f" | {self.playback_speed:g}x | 显示帧率: "
+                        f"{self.playback_clock.displayed_fps:.1f} fps | 丢帧: {self._dropped_frames()}"
+                    )
                 if self.is_in_crop_preview:
                     status_text += " | 裁切预览模式"
                 self.status_bar.set_status(status_text)
                 self.last_status_update_frame = frame_num
 
+    def _crop_for_display(self, frame, crop_params):
+        """
+        从预览帧中裁切出裁切区域
+
+        裁切参数是源视频坐标；使用代理文件预览时帧的分辨率较低，按比例换算。
+        """
+        source_width = self.video_processor.frame_width or frame.shape[1]
+        source_height = self.video_processor.frame_height or frame.shape[0]
+        scale_x = frame.shape[1] / source_width
+        scale_y = frame.shape[0] / source_height
+        x = int(crop_params["x"] * scale_x)
+        y = int(crop_params["y"] * scale_y)
+        width = max(1, int(round(crop_params["width"] * scale_x)))
+        height = max(1, int(round(crop_params["height"] * scale_y)))
+        return frame[y : y + height, x : x + width]
+
+    def _prepare_display_frame(self, frame, canvas_size):
+        """准备快速显示的帧（裁切、颜色转换和缩放，不访问Tk，可在后台线程中调用）"""
+        if self.is_in_crop_preview and self.crop_controller.has_valid_crop():
+            crop_params = self.crop_controller.get_crop_params()
+            try:
+                cropped_frame = self._crop_for_display(frame, crop_params)
+                return self.video_canvas.prepare_preview(cropped_frame, canvas_size, QUALITY_FAST)
+            except Exception:
+                # 如果裁切失败，回退到原始帧显示
+                pass
+        return self.video_canvas.prepare_frame(frame, canvas_size, QUALITY_FAST)
+
+    def _prepare_playback_frame(self, frame_num, frame):
+        """在预读线程中准备播放帧"""
+        return self._prepare_display_frame(frame, self.playback_canvas_size)
+
+    def _prepare_scrub_frame(self, frame_num, frame):
+        """在拖动解码线程中准备拖动帧"""
+        return self._prepare_display_frame(frame, self.scrub_canvas_size)
+
+    def _flush_playback_buffer(self):
+        """丢弃预读缓冲区中的帧，从当前播放位置之后重新预读"""
+        self.pending_playback_item = None
+        if self.playback_reader:
+            self.playback_reader.seek(self.current_play_frame + 1)
+
+    def _dropped_frames(self):
+        """本次播放累计丢弃的帧数（UI丢弃的和预读线程跳过的）"""
+        dropped = self.playback_clock.dropped_frames if self.playback_clock else 0
+        if self.playback_reader:
+            dropped += self.playback_reader.skipped_frames
+        return dropped
+
+    def on_speed_change(self, speed):
+        """播放速度变化"""
+        self.playback_speed = PlaybackClock.clamp_speed(speed)
+        if self.playback_clock:
+            self.playback_clock.set_speed(self.playback_speed)
+            # 立即按新速度安排下一帧
+            if self.play_timer:
+                self.root.after_cancel(self.play_timer)
+            self.play_next_frame()
+
+    def show_playback_frame(self, frame_num, prepared):
+        """显示预读线程准备好的播放帧"""
+        if self.video_canvas.show_prepared(prepared) and prepared["mode"] == "frame":
+            self.crop_controller.redraw_crop_rectangle()
+        self._update_playback_status(frame_num)
+
     def on_crop_changed(self, x, y, width, height):
         """裁切区域变化时的回调"""
         self.control_panel.update_crop_info(x, y, width, height)
@@ -277,15 +592,13 @@ class VideoCropper:
 
         crop_params = self.crop_controller.get_crop_params()
         try:
-            cropped_frame = frame[
-                crop_params["y"] : crop_params["y"] + crop_params["height"],
-                crop_params["x"] : crop_params["x"] + crop_params["width"],
-            ]
+            cropped_frame = self._crop_for_display(frame, crop_params)
 
             self.is_in_crop_preview = True  # 设置预览模式标志
+            self._flush_playback_buffer()
             self.video_canvas.show_preview(cropped_frame)
             self.status_bar.set_status(
-                f"裁切预览: {cropped_frame.shape[1]}x{cropped_frame.shape[0]} | 按'返回'按钮恢复"
+                f"裁切预览: {crop_params['width']}x{crop_params['height']} | 按'返回'按钮恢复"
             )
         except Exception as e:
             messagebox.showerror("预览错误", f"预览时出错: {str(e)}")
@@ -294,6 +607,7 @@ class VideoCropper:
     def back_to_preview(self):
         """从预览裁切返回"""
         self.is_in_crop_preview = False  # 退出预览模式
+        self._flush_playback_buffer()
         if self.video_loaded:
             current_frame_num = self.control_panel.get_current_frame()
             frame = self.video_processor.get_frame(current_frame_num)
@@ -308,21 +622,24 @@ class VideoCropper:
             return
 
         has_spatial_crop = self.crop_controller.has_valid_crop()
-        has_time_crop = self.trim_enabled and self.start_frame < self.end_frame
+        has_time_crop = self.trim_enabled and (
+            bool(self.keep_ranges) or self.start_frame < self.end_frame
+        )
 
         if not has_spatial_crop and not has_time_crop:
             messagebox.showwarning("警告", "请至少选择空间裁切区域或启用时间裁切！")
             return
 
         crop_params = self.crop_controller.get_crop_params()
+        trim_params = self._trim_params() if has_time_crop else None
 
         default_name = generate_output_filename(
             self.video_processor.video_path,
             crop_params["width"],
             crop_params["height"],
-            self.trim_enabled,
-            self.start_frame,
-            self.end_frame,
+            has_time_crop,
+            trim_params["start_frame"] if trim_params else 0,
+            trim_params["end_frame"] if trim_params else 0,
         )
 
         output_path = filedialog.asksaveasfilename(
@@ -337,11 +654,6 @@ class VideoCropper:
         self.control_panel.enable_controls(False)
         self.status_bar.set_status("正在处理视频，请稍候...")
 
-        trim_params = (
-            {"start_frame": self.start_frame, "end_frame": self.end_frame}
-            if has_time_crop
-            else None
-        )
         crop_params_to_pass = crop_params if has_spatial_crop else None
 
         self.video_processor.process_video(output_path, crop_params_to_pass, trim_params)
@@ -419,6 +731,31 @@ class VideoCropper:
         if current_frame > end_frame:
             self.update_preview(end_frame)
 
+    def _trim_params(self):
+        """时间裁切参数：有保留范围列表时按顺序拼接各范围，否则使用开始帧~结束帧"""
+        if self.keep_ranges:
+            return keep_ranges_to_trim(self.keep_ranges)
+        return {"start_frame": self.start_frame, "end_frame": self.end_frame}
+
+    def add_keep_range(self):
+        """把当前开始帧~结束帧添加到保留范围列表（与已有范围重叠时合并）"""
+        if not self.video_loaded or not self.trim_enabled:
+            return
+        self.keep_ranges = merge_ranges(self.keep_ranges + [(self.start_frame, self.end_frame)])
+        self._refresh_keep_ranges()
+
+    def remove_keep_range(self, index):
+        """从保留范围列表中删除一项"""
+        if 0 <= index < len(self.keep_ranges):
+            del self.keep_ranges[index]
+            self._refresh_keep_ranges()
+
+    def _refresh_keep_ranges(self):
+        """更新保留范围列表和时间信息显示"""
+        fps = self.video_processor.get_video_info()["fps"]
+        self.control_panel.set_keep_ranges(self.keep_ranges, fps)
+        self.update_time_info()
+
     def update_time_info(self):
         """更新时间信息显示"""
         if not self.video_loaded:
@@ -445,6 +782,12 @@ class VideoCropper:
                 f"时间裁切: {start_time_str} - {end_time_str} "
                 f"(时长: {duration_str}, 帧数: {trim_frames})"
             )
+            if self.keep_ranges:
+                keep_frames = sum(end - start + 1 for start, end in self.keep_ranges)
+                info_text += (
+                    f" | 导出 {len(self.keep_ranges)} 段保留范围，"
+                    f"共 {keep_frames} 帧 ({format_time(keep_frames / fps)})"
+                )
         else:
             total_time = video_info["duration"]
             total_time_str = format_time(total_time)
@@ -510,20 +853,46 @@ class VideoCropper:
 
         # 从当前UI位置开始播放
         self.current_play_frame = self.control_panel.get_current_frame()
+        self.pending_playback_item = None
+        self.playback_clock = PlaybackClock(self.cached_video_info["fps"], self.playback_speed)
+        self.playback_clock.start(self.current_play_frame)
+
+        if PLAYBACK_READ_AHEAD:
+            max_frame = self.cached_video_info["total_frames"] - 1
+            self.playback_canvas_size = self.video_canvas.get_canvas_size()
+            self.playback_reader = PlaybackReader(
+                self.video_processor.preview_path,
+                self.current_play_frame + 1,
+                self.end_frame if self.trim_enabled else max_frame,
+                prepare=self._prepare_playback_frame,
+                decoder_pool=self.video_processor.preview_pool,
+            )
+            self.playback_reader.start()
 
         self.play_next_frame()
 
     def stop_playback(self):
         """停止播放"""
+        was_playing = self.is_playing
         self.is_playing = False
         self.control_panel.set_play_button_text("播放")
         if self.play_timer:
             self.root.after_cancel(self.play_timer)
             self.play_timer = None
+        if self.playback_reader:
+            self.playback_reader.stop()
+            self.playback_reader = None
+        self.playback_clock = None
+        self.pending_playback_item = None
 
         # 清除缓存
         self.cached_video_info = None
 
+        # 暂停后以高质量重绘当前帧
+        if was_playing and self.video_loaded and not self.scrubbing:
+            self.control_panel.set_current_frame_no_callback(self.current_play_frame)
+            self.update_preview(self.current_play_frame)
+
         # 确保UI显示正确的最后播放帧信息
         if self.video_loaded:
             video_info = self.video_processor.get_video_info()
@@ -554,25 +923,71 @@ class VideoCropper:
             self.stop_playback()
             return
 
-        # 播放下一帧
-        self.current_play_frame += 1
+        last_frame = self.end_frame if self.trim_enabled else max_frame
+        clock = self.playback_clock
+        target = min(clock.frame_at(), last_frame)
+        if target <= self.current_play_frame:
+            # 还没到下一帧的呈现时间
+            self._schedule_next_frame()
+            return
+
+        if self.playback_reader:
+            item = self._take_playback_frame(target)
+            if item is None:
+                if self.playback_reader.finished:
+                    self.stop_playback()
+                    return
+                # 预读缓冲区暂时为空，稍后重试
+                self.play_timer = self.root.after(5, self.play_next_frame)
+                return
+
+            frame_num, prepared = item
+            if frame_num > target:
+                # 预读线程已跳到前面，等到该帧的呈现时间再显示
+                self.pending_playback_item = item
+                self._schedule_next_frame()
+                return
+
+            # 从预读缓冲区取出已准备好的帧，UI线程只负责绘制
+            self.current_play_frame = frame_num
+            self.show_playback_frame(self.current_play_frame, prepared)
+        else:
+            # 落后时直接跳到当前应显示的帧，中间帧由解码器grab()跳过
+            clock.record_dropped(target - self.current_play_frame - 1)
+            self.current_play_frame = target
 
-        # 直接更新预览，避免触发UI回调
-        self.update_preview_for_playback(self.current_play_frame)
+            # 直接更新预览，避免触发UI回调
+            self.update_preview_for_playback(self.current_play_frame)
+
+        clock.record_displayed()
 
         # 然后更新UI控件（但不触发回调）
         self.control_panel.set_current_frame_no_callback(self.current_play_frame)
 
-        # 计算播放间隔（基于帧率）
-        fps = video_info["fps"]
-        if fps > 0:
-            # 使用更精确的时间计算，确保播放速度正确
-            interval = max(8, int(1000.0 / fps))  # 最小8ms间隔，确保不会太快
-        else:
-            interval = 33  # 默认30fps
+        # 按下一帧的呈现时间安排播放
+        self._schedule_next_frame()
+
+    def _take_playback_frame(self, target):
+        """
+        从预读缓冲区取出不早于目标帧的第一帧，早于目标帧的帧作为丢帧丢弃
 
-        # 安排下一帧播放
-        self.play_timer = self.root.after(interval, self.play_next_frame)
+        Returns:
+            (帧号, 准备好的帧)，缓冲区为空时返回None
+        """
+        self.playback_reader.skip_before(target)
+        while True:
+            item = self.pending_playback_item or self.playback_reader.get_frame()
+            self.pending_playback_item = None
+            if item is None or item[0] >= target:
+                return item
+            self.playback_clock.record_dropped()
+
+    def _schedule_next_frame(self):
+        """在下一帧的呈现时间调用play_next_frame"""
+        delay = self.playback_clock.time_until(self.current_play_frame + 1)
+        if self.pending_playback_item:
+            delay = self.playback_clock.time_until(self.pending_playback_item[0])
+        self.play_timer = self.root.after(max(1, int(delay * 1000)), self.play_next_frame)
 
     def set_start_frame_to_current(self):
         """将起始帧设置为当前帧"""
@@ -593,12 +1008,18 @@ class VideoCropper:
     def __del__(self):
         """释放资源"""
         self.stop_playback()
+        if hasattr(self, "thumbnail_generator") and self.thumbnail_generator:
+            self.thumbnail_generator.stop()
+        if hasattr(self, "scrub_decoder"):
+            self.scrub_decoder.stop()
         if hasattr(self, "video_processor"):
             self.video_processor.release()
 
 
 def main():
     """主函数入口点"""
+    # 打包为可执行文件后，并行导出的工作进程需要此调用
+    multiprocessing.freeze_support()
     root = tk.Tk()
     VideoCropper(root)
     root.mainloop()
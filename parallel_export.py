@@ -0,0 +1,163 @@
+"""
+并行导出模块
+将导出范围按关键帧切分为多段，在进程池中并行解码、裁切和编码后按顺序拼接
+"""
+
+import bisect
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from encoders import create_encoder
+from ffmpeg_tools import concat_videos
+from utils import crop_frame
+
+
+def resolve_worker_count(workers):
+    """将配置的工作进程数（0表示自动）转换为实际进程数"""
+    if workers and workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def plan_chunks(keyframes, start_frame, end_frame, chunk_count):
+    """
+    将帧范围切分为若干段，除第一段外每段都从关键帧开始
+
+    从关键帧开始的分段可以精确seek，并且各段解码互不依赖。
+
+    Args:
+        keyframes: 升序的关键帧帧号列表
+        start_frame: 起始帧（包含）
+        end_frame: 结束帧（包含）
+        chunk_count: 期望的分段数
+
+    Returns:
+        [(起始帧, 结束帧(包含)), ...]
+    """
+    total = end_frame - start_frame + 1
+    boundaries = [start_frame]
+    for i in range(1, chunk_count):
+        target = start_frame + total * i // chunk_count
+        j = bisect.bisect_right(keyframes, target)
+        if j == 0:
+            continue
+        keyframe = keyframes[j - 1]
+        if boundaries[-1] < keyframe <= end_frame:
+            boundaries.append(keyframe)
+
+    boundaries.append(end_frame + 1)
+    return [(boundaries[i], boundaries[i + 1] - 1) for i in range(len(boundaries) - 1)]
+
+
+def export_chunk(task):
+    """
+    在工作进程中导出一段（使用独立的VideoCapture和编码器）
+
+    Args:
+        task: 分段任务参数字典
+
+    Returns:
+        {"frames": 写出的帧数, "out_of_bounds": 裁切超出范围的帧数}
+    """
+    cap = cv2.VideoCapture(task["video_path"])
+    out = None
+    try:
+        if not cap.isOpened():
+            raise IOError("无法打开视频文件")
+        out = create_encoder(
+            task["output_path"], task["fps"], task["frame_size"], task.get("encoder_params")
+        )
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, task["start_frame"])
+        frames = 0
+        out_of_bounds = 0
+        for _ in range(task["start_frame"], task["end_frame"] + 1):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame, in_bounds = crop_frame(frame, task["crop_params"])
+            if not in_bounds:
+                out_of_bounds += 1
+            out.write(frame)
+            frames += 1
+        out.close()
+        out = None
+        return {"frames": frames, "out_of_bounds": out_of_bounds}
+    finally:
+        if out is not None:
+            out.abort()
+        cap.release()
+
+
+def run_parallel_export(
+    video_path,
+    output_path,
+    chunks,
+    crop_params,
+    fps,
+    frame_size,
+    workers,
+    on_chunk_done=None,
+    encoder_params=None,
+):
+    """
+    在进程池中并行导出各分段，然后按顺序以流复制方式拼接
+
+    Args:
+        video_path: 输入文件路径
+        output_path: 输出文件路径
+        chunks: plan_chunks()返回的分段列表
+        crop_params: 裁切参数，None表示不裁切
+        fps: 输出帧率
+        frame_size: 输出尺寸 (宽, 高)
+        workers: 工作进程数
+        on_chunk_done: 每完成一段调用 on_chunk_done(分段, 结果)
+        encoder_params: 编码参数，None表示使用config中的默认值
+
+    Returns:
+        写出的总帧数
+
+    Raises:
+        FFmpegError: 拼接失败
+        IOError: 分段读取或写入失败
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    extension = os.path.splitext(output_path)[1] or ".mp4"
+    temp_dir = tempfile.mkdtemp(dir=output_dir)
+    try:
+        tasks = [
+            {
+                "video_path": video_path,
+                "output_path": os.path.join(temp_dir, f"chunk_{i:04d}{extension}"),
+                "start_frame": start,
+                "end_frame": end,
+                "crop_params": crop_params,
+                "fps": fps,
+                "frame_size": frame_size,
+                "encoder_params": encoder_params,
+            }
+            for i, (start, end) in enumerate(chunks)
+        ]
+
+        total = 0
+        # 使用spawn启动工作进程，避免fork带有后台线程的GUI进程
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(export_chunk, task): chunk for task, chunk in zip(tasks, chunks)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                total += result["frames"]
+                if on_chunk_done:
+                    on_chunk_done(futures[future], result)
+
+        concat_videos([task["output_path"] for task in tasks], output_path)
+        return total
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
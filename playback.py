@@ -0,0 +1,414 @@
+"""
+播放模块
+负责播放和拖动预览时的后台解码
+"""
+
+import math
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from config import PLAYBACK_BUFFER_SIZE, PLAYBACK_MAX_SPEED, PLAYBACK_MIN_SPEED
+
+
+class PlaybackReader:
+    """
+    播放预读器
+
+    在后台线程中使用独立的解码器顺序读取帧，经过可选的预处理（颜色转换、缩放等）
+    后放入有界环形缓冲区。UI线程只需从缓冲区取出已准备好的帧进行绘制，
+    解码耗时不再直接计入每帧的显示时间。
+    """
+
+    def __init__(
+        self,
+        video_path,
+        start_frame,
+        end_frame,
+        prepare=None,
+        buffer_size=None,
+        decoder_pool=None,
+    ):
+        """
+        初始化播放预读器
+
+        Args:
+            video_path: 视频文件路径
+            start_frame: 第一个要读取的帧号
+            end_frame: 最后一个要读取的帧号（包含）
+            prepare: 在后台线程中对每帧执行的预处理函数 prepare(frame_number, frame)
+            buffer_size: 缓冲区可容纳的帧数
+            decoder_pool: 解码器池，提供时从池中借用解码器，否则自行打开
+        """
+        self.video_path = video_path
+        self.decoder_pool = decoder_pool
+        self.end_frame = end_frame
+        self.prepare = prepare
+        self.buffer = queue.Queue(maxsize=buffer_size or PLAYBACK_BUFFER_SIZE)
+
+        self._cond = threading.Condition()
+        self._seek_target = start_frame
+        self._generation = 0
+        self._finished = False
+        self._stopped = False
+        self._skip_before = 0
+        self.skipped_frames = 0
+        self.error = None
+        self._thread = None
+
+    def start(self):
+        """启动预读线程"""
+        self._thread = threading.Thread(target=self._read_thread, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止预读线程"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._flush()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def seek(self, frame_number):
+        """
+        跳转到指定帧：清空缓冲区并从新位置重新预读
+
+        Args:
+            frame_number: 下一个要读取的帧号
+        """
+        with self._cond:
+            self._seek_target = frame_number
+            self._skip_before = 0
+            self._generation += 1
+            self._finished = False
+            self._flush()
+            self._cond.notify_all()
+
+    def get_frame(self):
+        """
+        从缓冲区取出一帧（不阻塞）
+
+        Returns:
+            (帧号, 预处理后的帧)，缓冲区为空时返回None
+        """
+        while True:
+            try:
+                generation, frame_number, frame = self.buffer.get_nowait()
+            except queue.Empty:
+                return None
+            # 丢弃跳转前读取的旧帧
+            if generation == self._generation:
+                return frame_number, frame
+
+    def skip_before(self, frame_number):
+        """
+        通知预读线程播放已推进到指定帧
+
+        预读线程落后于该帧时用grab()跳过中间帧（不解码、不预处理），
+        以便尽快追上播放时钟。
+        """
+        self._skip_before = frame_number
+
+    @property
+    def finished(self):
+        """是否已读到结束帧且缓冲区已取空"""
+        return self._finished and self.buffer.empty()
+
+    def _flush(self):
+        """清空缓冲区"""
+        while True:
+            try:
+                self.buffer.get_nowait()
+            except queue.Empty:
+                return
+
+    def _read_thread(self):
+        """预读线程"""
+        try:
+            if self.decoder_pool:
+                cap = self.decoder_pool.acquire()
+            else:
+                cap = cv2.VideoCapture(self.video_path)
+        except Exception as e:
+            self._fail(e)
+            return
+
+        try:
+            generation = None
+            frame_number = 0
+
+            while True:
+                need_seek = False
+                with self._cond:
+                    while self._finished and not self._stopped and generation == self._generation:
+                        self._cond.wait()
+                    if self._stopped:
+                        return
+                    if generation != self._generation:
+                        generation = self._generation
+                        frame_number = self._seek_target
+                        need_seek = True
+
+                if need_seek:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+                if frame_number > self.end_frame:
+                    self._mark_finished(generation)
+                    continue
+
+                if frame_number < self._skip_before:
+                    # 落后于播放时钟，只推进解码器位置而不解码
+                    if not cap.grab():
+                        self._mark_finished(generation)
+                        continue
+                    self.skipped_frames += 1
+                    frame_number += 1
+                    continue
+
+                success, frame = cap.read()
+                if not success:
+                    self._mark_finished(generation)
+                    continue
+
+                if self.prepare:
+                    frame = self.prepare(frame_number, frame)
+
+                if not self._put(generation, frame_number, frame):
+                    continue
+                frame_number += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if self.decoder_pool:
+                self.decoder_pool.release(cap)
+            else:
+                cap.release()
+
+    def _put(self, generation, frame_number, frame):
+        """将帧放入缓冲区，缓冲区满时等待；发生跳转或停止时放弃并返回False"""
+        item = (generation, frame_number, frame)
+        while True:
+            if self._stopped or generation != self._generation:
+                return False
+            try:
+                self.buffer.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+
+    def _fail(self, error):
+        """记录预读线程中的错误并结束读取"""
+        self.error = error
+        with self._cond:
+            self._finished = True
+
+    def _mark_finished(self, generation):
+        """标记当前读取轮次已结束"""
+        with self._cond:
+            if generation == self._generation:
+                self._finished = True
+
+
+class PlaybackClock:
+    """
+    播放时钟
+
+    以单调时钟为基准计算每一帧的呈现时间，而不是在每帧处理结束后再等待固定间隔，
+    因此处理耗时不会累积成播放速度的漂移；落后时由调用方直接跳到当前应显示的帧。
+    同时统计实际显示帧率和丢帧数。
+    """
+
+    def __init__(self, fps, speed=1.0, clock=time.monotonic):
+        """
+        初始化播放时钟
+
+        Args:
+            fps: 视频帧率
+            speed: 播放速度（倍速）
+            clock: 返回当前时间（秒）的函数
+        """
+        self.fps = fps if fps > 0 else 30.0
+        self.speed = self.clamp_speed(speed)
+        self.clock = clock
+        self.dropped_frames = 0
+        self._origin_frame = 0
+        self._origin_time = clock()
+        self._displayed = deque()
+
+    @staticmethod
+    def clamp_speed(speed):
+        """将播放速度限制在允许范围内"""
+        return max(PLAYBACK_MIN_SPEED, min(PLAYBACK_MAX_SPEED, speed))
+
+    def start(self, frame_number):
+        """以指定帧作为当前时刻的播放位置（开始播放或跳转后调用）"""
+        self._origin_frame = frame_number
+        self._origin_time = self.clock()
+
+    def set_speed(self, speed):
+        """改变播放速度，从当前位置继续计时"""
+        now = self.clock()
+        self._origin_frame = self.position(now)
+        self._origin_time = now
+        self.speed = self.clamp_speed(speed)
+
+    def position(self, now=None):
+        """当前的播放位置（帧号，可带小数）"""
+        if now is None:
+            now = self.clock()
+        return self._origin_frame + (now - self._origin_time) * self.fps * self.speed
+
+    def frame_at(self, now=None):
+        """当前时刻应显示的帧号"""
+        return int(math.floor(self.position(now) + 1e-9))
+
+    def time_until(self, frame_number, now=None):
+        """距离指定帧的呈现时间还有多少秒（已过时为负数）"""
+        if now is None:
+            now = self.clock()
+        presentation = self._origin_time + (frame_number - self._origin_frame) / (
+            self.fps * self.speed
+        )
+        return presentation - now
+
+    def record_displayed(self, now=None):
+        """记录显示了一帧，用于计算实际显示帧率"""
+        if now is None:
+            now = self.clock()
+        self._displayed.append(now)
+        # 只保留最近一秒的记录
+        while self._displayed and now - self._displayed[0] > 1.0:
+            self._displayed.popleft()
+
+    def record_dropped(self, count=1):
+        """记录丢弃的帧数"""
+        self.dropped_frames += count
+
+    @property
+    def displayed_fps(self):
+        """最近一秒内实际显示的帧率"""
+        if len(self._displayed) < 2:
+            return 0.0
+        span = self._displayed[-1] - self._displayed[0]
+        return (len(self._displayed) - 1) / span if span > 0 else 0.0
+
+
+class ScrubDecoder:
+    """
+    拖动预览解码器
+
+    拖动滑块时UI线程只提交请求，后台线程总是只解码最新请求的帧：
+    解码期间到达的中间请求会被新请求覆盖而直接丢弃。目标帧距离较远时先解码
+    附近的关键帧作为近似画面，再细化为精确帧；细化前如有新请求则放弃细化。
+    """
+
+    def __init__(self, get_frame, prepare=None, approximate=None):
+        """
+        初始化拖动预览解码器
+
+        Args:
+            get_frame: 解码函数 get_frame(frame_number) -> 帧或None，在后台线程中调用
+            prepare: 在后台线程中对每帧执行的预处理函数 prepare(frame_number, frame)
+            approximate: 返回近似帧号的函数 approximate(frame_number) -> 帧号或None
+        """
+        self.get_frame = get_frame
+        self.prepare = prepare
+        self.approximate = approximate
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._result = None
+        self._generation = 0
+        self._busy = False
+        self._stopped = False
+        self.error = None
+        self._thread = None
+
+    def start(self):
+        """启动解码线程"""
+        self._thread = threading.Thread(target=self._decode_thread, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止解码线程"""
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def request(self, frame_number):
+        """请求显示指定帧，覆盖尚未开始处理的旧请求"""
+        with self._cond:
+            self._pending = frame_number
+            self._cond.notify_all()
+
+    def cancel(self):
+        """丢弃尚未处理的请求和尚未取走的结果，正在解码的帧完成后也不再提交"""
+        with self._cond:
+            self._pending = None
+            self._result = None
+            self._generation += 1
+
+    def get_result(self):
+        """
+        取出最新的解码结果（不阻塞）
+
+        Returns:
+            (帧号, 原始帧, 预处理后的帧, 是否为精确帧)，没有新结果时返回None
+        """
+        with self._cond:
+            result, self._result = self._result, None
+            return result
+
+    @property
+    def busy(self):
+        """是否还有请求在等待或正在解码"""
+        with self._cond:
+            return self._busy or self._pending is not None
+
+    def _has_pending(self):
+        """是否有新的请求到达"""
+        with self._cond:
+            return self._pending is not None or self._stopped
+
+    def _decode_thread(self):
+        """解码线程"""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                frame_number, self._pending = self._pending, None
+                generation = self._generation
+                self._busy = True
+
+            try:
+                approximate = self.approximate(frame_number) if self.approximate else None
+                if approximate is not None and approximate != frame_number:
+                    self._decode_and_post(generation, approximate, exact=False)
+                    if self._has_pending():
+                        # 已有更新的请求，不再细化到这个过时的目标
+                        continue
+                self._decode_and_post(generation, frame_number, exact=True)
+            except Exception as e:
+                self.error = e
+            finally:
+                with self._cond:
+                    self._busy = False
+
+    def _decode_and_post(self, generation, frame_number, exact):
+        """解码并预处理一帧，作为最新结果提交（请求已被取消时丢弃）"""
+        frame = self.get_frame(frame_number)
+        if frame is None:
+            return
+        prepared = self.prepare(frame_number, frame) if self.prepare else None
+        with self._cond:
+            if generation == self._generation:
+                self._result = (frame_number, frame, prepared, exact)
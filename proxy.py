@@ -0,0 +1,218 @@
+"""
+代理文件模块
+为高分辨率视频在后台生成低分辨率、全帧内编码的代理文件，用于预览和拖动
+"""
+
+import hashlib
+import os
+import threading
+
+import cv2
+
+from config import (
+    PROXY_CODEC,
+    PROXY_DIR,
+    PROXY_DIR_MAX_BYTES,
+    PROXY_HEIGHT,
+    PROXY_MIN_PIXELS,
+    PROXY_MODE,
+)
+
+# 代理文件扩展名（MJPEG写入AVI容器）
+PROXY_EXTENSION = ".avi"
+
+
+def needs_proxy(width, height, mode=None):
+    """
+    判断视频是否需要生成代理文件
+
+    Args:
+        width: 源视频宽度
+        height: 源视频高度
+        mode: "auto"（超过PROXY_MIN_PIXELS时生成）、"always" 或 "off"，默认使用config.PROXY_MODE
+    """
+    mode = mode or PROXY_MODE
+    if mode == "off" or height <= PROXY_HEIGHT:
+        return False
+    return mode == "always" or width * height >= PROXY_MIN_PIXELS
+
+
+def proxy_size(width, height, target_height=PROXY_HEIGHT):
+    """计算保持宽高比、宽高均为偶数的代理尺寸"""
+    proxy_height = min(height, target_height) // 2 * 2
+    proxy_width = max(2, int(round(width * proxy_height / height / 2)) * 2)
+    return proxy_width, proxy_height
+
+
+def proxy_path_for(video_path, proxy_dir=None):
+    """
+    代理文件路径，由源文件路径、大小和修改时间决定
+
+    源文件被修改后路径随之改变，旧的代理文件不会被误用。
+    """
+    stat = os.stat(video_path)
+    key = f"{os.path.abspath(video_path)}|{stat.st_size}|{stat.st_mtime_ns}|{PROXY_HEIGHT}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(proxy_dir or PROXY_DIR, f"{name}_{digest}{PROXY_EXTENSION}")
+
+
+def prune_proxies(proxy_dir=None, max_bytes=PROXY_DIR_MAX_BYTES, keep=None):
+    """
+    代理目录总大小超过上限时，按修改时间删除最久未用的代理文件（LRU）
+
+    代理文件被复用时会更新修改时间，因此修改时间即最近使用时间。
+
+    Args:
+        proxy_dir: 代理目录，默认为config.PROXY_DIR
+        max_bytes: 总大小上限（字节）
+        keep: 不删除的代理文件路径（通常为正在使用的代理）
+
+    Returns:
+        删除的文件路径列表
+    """
+    proxy_dir = proxy_dir or PROXY_DIR
+    try:
+        names = os.listdir(proxy_dir)
+    except OSError:
+        return []
+
+    entries = []
+    for name in names:
+        path = os.path.join(proxy_dir, name)
+        # 只处理代理文件，跳过其他进程正在生成的临时文件
+        if not name.endswith(PROXY_EXTENSION) or ".part." in name or not os.path.isfile(path):
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    keep = os.path.abspath(keep) if keep else None
+    removed = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed.append(path)
+    return removed
+
+
+class ProxyBuilder:
+    """
+    代理文件生成器
+
+    在后台线程中顺序解码源视频，缩小后以全帧内编码（MJPEG）写入代理文件。
+    代理文件的每一帧都是关键帧，任意帧seek都只需解码一帧；帧号和帧率与源视频一致。
+    生成过程中写入临时文件，完成后再原子地改名，中断不会留下不完整的代理文件。
+    """
+
+    def __init__(self, video_path, output_path=None, size=None):
+        """
+        初始化代理文件生成器
+
+        Args:
+            video_path: 源视频路径
+            output_path: 代理文件路径，默认由proxy_path_for()决定
+            size: 代理尺寸 (宽, 高)，默认由proxy_size()按源视频尺寸计算
+        """
+        self.video_path = video_path
+        self.output_path = output_path or proxy_path_for(video_path)
+        self.size = size
+        self.total_frames = 0
+        self.processed_frames = 0
+        self.error = None
+        self._complete = False
+        self._cancelled = False
+        self._thread = None
+
+    def start(self):
+        """在后台线程中开始生成；代理文件已存在时直接视为完成"""
+        if os.path.exists(self.output_path):
+            # 更新修改时间，使复用的代理不被prune_proxies()优先淘汰
+            try:
+                os.utime(self.output_path)
+            except OSError:
+                pass
+            self._complete = True
+            return
+        self._thread = threading.Thread(target=self.build, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """取消后台生成"""
+        self._cancelled = True
+
+    def wait(self, timeout=None):
+        """等待后台生成结束"""
+        if self._thread:
+            self._thread.join(timeout)
+        return self._complete
+
+    @property
+    def is_complete(self):
+        """代理文件是否已生成完成"""
+        return self._complete
+
+    @property
+    def progress(self):
+        """生成进度（0~1）"""
+        if self._complete:
+            return 1.0
+        if self.total_frames <= 0:
+            return 0.0
+        return min(1.0, self.processed_frames / self.total_frames)
+
+    def build(self):
+        """在当前线程中生成代理文件，成功返回True"""
+        base, extension = os.path.splitext(self.output_path)
+        temp_path = f"{base}.part{extension}"
+        cap = cv2.VideoCapture(self.video_path)
+        out = None
+        try:
+            if not cap.isOpened():
+                raise IOError("无法打开视频文件")
+
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            size = self.size or proxy_size(width, height)
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+            out = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*PROXY_CODEC), fps, size)
+            if not out.isOpened():
+                raise IOError("无法创建代理文件")
+
+            while not self._cancelled:
+                success, frame = cap.read()
+                if not success:
+                    break
+                out.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+                self.processed_frames += 1
+
+            out.release()
+            out = None
+            if self._cancelled:
+                return False
+            os.replace(temp_path, self.output_path)
+            self._complete = True
+            prune_proxies(os.path.dirname(self.output_path), keep=self.output_path)
+            return True
+        except Exception as e:
+            self.error = e
+            return False
+        finally:
+            if out is not None:
+                out.release()
+            cap.release()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
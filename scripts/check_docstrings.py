@@ -18,6 +18,18 @@ def check_docstrings():
         "main.py",
         "ui_components.py",
         "video_processor.py",
+        "keyframe_index.py",
+        "proxy.py",
+        "disk_cache.py",
+        "thumbnails.py",
+        "encoders.py",
+        "playback.py",
+        "ffmpeg_tools.py",
+        "export_pipeline.py",
+        "parallel_export.py",
+        "core.py",
+        "cli.py",
+        "batch.py",
         "crop_controller.py",
         "utils.py",
         "config.py",
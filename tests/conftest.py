@@ -11,6 +11,20 @@ import pytest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@pytest.fixture(autouse=True)
+def isolated_disk_cache(tmp_path, monkeypatch):
+    """每个测试使用独立的磁盘缓存，不读写用户目录下的缓存"""
+    import disk_cache
+
+    cache_path = str(tmp_path / "cache.sqlite3")
+    # 子进程（并行导出、批处理）通过环境变量使用同一个缓存文件
+    monkeypatch.setenv("VIDEOCLIP_CACHE_PATH", cache_path)
+    cache = disk_cache.DiskCache(cache_path)
+    monkeypatch.setattr(disk_cache, "_default_cache", cache)
+    yield cache
+    cache.close()
+
+
 @pytest.fixture
 def sample_video_info():
     """提供测试用的视频信息"""
@@ -36,3 +50,73 @@ def sample_trim_params():
         "start_frame": 30,  # 1秒
         "end_frame": 300,  # 10秒
     }
+
+
+@pytest.fixture
+def sample_video_path(tmp_path):
+    """生成一个小尺寸的测试视频，每帧亮度随帧号递增"""
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+
+    video_path = str(tmp_path / "sample.mp4")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("当前OpenCV不支持写入mp4v视频")
+
+    for i in range(60):
+        writer.write(np.full((48, 64, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return video_path
+
+
+def _marker_frame(np, frame_number, width=64, height=48):
+    """生成静止背景上以8个黑白方块（二进制）标记帧号的帧"""
+    frame = np.full((height, width, 3), 96, dtype=np.uint8)
+    block = width // 8
+    for bit in range(8):
+        frame[: height // 3, bit * block : (bit + 1) * block] = (
+            255 if frame_number >> bit & 1 else 0
+        )
+    return frame
+
+
+def read_frame_marker(frame):
+    """从帧（可以是缩小后的帧）读出_marker_frame()写入的帧号"""
+    height, width = frame.shape[:2]
+    block = width / 8
+    margin = width / 32
+    value = 0
+    for bit in range(8):
+        left = int(bit * block + margin)
+        right = int((bit + 1) * block - margin)
+        if frame[: height // 3, left:right].mean() > 128:
+            value |= 1 << bit
+    return value
+
+
+@pytest.fixture
+def long_gop_video_path(tmp_path):
+    """
+    生成一个长GOP的测试视频（VP8，90帧，每12帧一个关键帧）
+
+    画面静止，只有帧号标记变化，编码器不会插入额外的关键帧；
+    用frame_marker读出每帧的帧号，可以逐帧精确地验证定位和范围读取。
+    """
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+
+    video_path = str(tmp_path / "long_gop.webm")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"VP80"), 30.0, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("当前OpenCV不支持写入VP8视频")
+
+    for i in range(90):
+        writer.write(_marker_frame(np, i))
+    writer.release()
+    return video_path
+
+
+@pytest.fixture
+def frame_marker():
+    """返回从帧中读出帧号标记的函数"""
+    return read_frame_marker
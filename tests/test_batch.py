@@ -0,0 +1,80 @@
+"""
+批处理测试
+"""
+
+import json
+import os
+
+from batch import load_manifest, load_state, run_batch
+
+
+def test_load_csv_manifest(tmp_path):
+    """CSV清单解析裁切和时间裁切参数，未指定输出时自动生成文件名"""
+    manifest_path = tmp_path / "jobs.csv"
+    manifest_path.write_text(
+        "input,crop,trim,output\n"
+        '/videos/a.mp4,"0,0,320,240",,\n'
+        "/videos/b.mp4,,10:20,/out/b_clip.mp4\n",
+        encoding="utf-8",
+    )
+
+    jobs = load_manifest(str(manifest_path), output_dir="/out")
+
+    assert jobs[0]["crop_params"] == {"x": 0, "y": 0, "width": 320, "height": 240}
+    assert jobs[0]["trim_params"] is None
+    assert jobs[0]["output"] == os.path.abspath("/out/a_crop_320x240.mp4")
+    assert jobs[1]["trim_params"] == {"start_frame": 10, "end_frame": 20}
+    assert jobs[1]["output"] == os.path.abspath("/out/b_clip.mp4")
+
+
+def test_run_batch_resumes(sample_video_path, tmp_path):
+    """已完成的任务记录在状态文件中，再次运行时跳过"""
+    manifest_path = tmp_path / "jobs.json"
+    manifest_path.write_text(
+        json.dumps(
+            [
+                {
+                    "input": sample_video_path,
+                    "crop": "0,0,32,32",
+                    "output": str(tmp_path / "a.mp4"),
+                },
+                {
+                    "input": sample_video_path,
+                    "crop": "8,8,16,16",
+                    "output": str(tmp_path / "b.mp4"),
+                },
+            ]
+        ),
+        encoding="utf-8",
+    )
+    state_path = str(tmp_path / "state.json")
+    jobs = load_manifest(str(manifest_path))
+
+    summary = run_batch(jobs, state_path, workers=2, log=lambda message: None)
+    assert summary["done"] == 2
+    assert summary["frames"] > 0
+    assert all(entry["status"] == "done" for entry in load_state(state_path).values())
+
+    summary = run_batch(jobs, state_path, workers=2, log=lambda message: None)
+    assert summary["skipped"] == 2
+    assert summary["done"] == 0
+
+
+def test_run_batch_records_worker_exception(sample_video_path, tmp_path):
+    """工作进程中未处理的异常只让该任务失败，其余任务照常完成"""
+    good = {
+        "input": sample_video_path,
+        "output": str(tmp_path / "good.mp4"),
+        "crop_params": {"x": 0, "y": 0, "width": 32, "height": 32},
+        "trim_params": None,
+    }
+    # 缺少trim_params，run_job在工作进程中抛出KeyError
+    broken = {"input": sample_video_path, "output": str(tmp_path / "broken.mp4")}
+    state_path = str(tmp_path / "state.json")
+
+    summary = run_batch([good, broken], state_path, workers=2, log=lambda message: None)
+    assert summary["done"] == 1
+    assert summary["failed"] == 1
+    state = load_state(state_path)
+    assert state[good["output"]]["status"] == "done"
+    assert state[broken["output"]]["status"] == "failed"
@@ -0,0 +1,186 @@
+"""
+命令行和核心接口测试
+"""
+
+import os
+import subprocess
+import sys
+
+import cv2
+import pytest
+
+from cli import main
+from core import ExportError, export_video, iter_export, parse_crop, parse_trim
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_parse_arguments():
+    """解析裁切和时间裁切参数"""
+    assert parse_crop("10, 20,300,200") == {"x": 10, "y": 20, "width": 300, "height": 200}
+    assert parse_trim("30:300") == {"start_frame": 30, "end_frame": 300}
+
+    with pytest.raises(ValueError):
+        parse_crop("10,20,300")
+    with pytest.raises(ValueError):
+        parse_trim("300:30")
+
+
+def test_core_does_not_import_gui_modules():
+    """核心接口和命令行不导入tkinter和PIL"""
+    code = "import sys, cli; print('tkinter' in sys.modules, 'PIL' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False False"
+
+
+def test_iter_export_reports_progress(sample_video_path, tmp_path):
+    """迭代器依次报告进度并以完成事件结束"""
+    output_path = str(tmp_path / "crop.mp4")
+    events = list(
+        iter_export(
+            sample_video_path,
+            output_path,
+            crop_params={"x": 0, "y": 0, "width": 32, "height": 32},
+        )
+    )
+
+    assert events[-1] == {"type": "complete", "output_path": output_path}
+    assert any(event["type"] == "progress" for event in events)
+
+
+def test_export_video_raises_on_missing_input(tmp_path):
+    """无法打开输入文件时抛出ExportError"""
+    with pytest.raises(ExportError):
+        export_video(str(tmp_path / "missing.mp4"), str(tmp_path / "out.mp4"))
+
+
+def test_cli_crop_and_trim(sample_video_path, tmp_path, capsys):
+    """命令行执行裁切和剪辑"""
+    output_path = str(tmp_path / "cli.mp4")
+    exit_code = main(
+        [
+            sample_video_path,
+            "-o",
+            output_path,
+            "--crop",
+            "8,8,32,24",
+            "--trim",
+            "10:19",
+            "--quiet",
+        ]
+    )
+
+    assert exit_code == 0
+    assert capsys.readouterr().out.strip() == output_path
+    cap = cv2.VideoCapture(output_path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+    assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 32
+    cap.release()
+
+
+def test_cli_multiple_crops_single_decode(sample_video_path, tmp_path, capsys):
+    """重复指定--crop时一次解码导出多个区域，每个区域一个输出文件"""
+    outputs = [str(tmp_path / "left.mp4"), str(tmp_path / "right.mp4")]
+    exit_code = main(
+        [
+            sample_video_path,
+            "--crop",
+            "0,0,32,48",
+            "-o",
+            outputs[0],
+            "--crop",
+            "32,8,32,24",
+            "-o",
+            outputs[1],
+            "--trim",
+            "10:19",
+            "--quiet",
+        ]
+    )
+
+    assert exit_code == 0
+    assert capsys.readouterr().out.split() == outputs
+    for output_path, size in zip(outputs, [(32, 48), (32, 24)]):
+        cap = cv2.VideoCapture(output_path)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+        assert (
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        ) == size
+        cap.release()
+
+
+def test_cli_output_count_must_match_crops(sample_video_path, tmp_path):
+    """-o 的数量与 --crop 不一致时报错"""
+    exit_code = main(
+        [sample_video_path, "--crop", "0,0,16,16", "--crop", "16,0,16,16", "-o", "a.mp4"]
+    )
+    assert exit_code == 2
+
+
+def test_cli_split_every(sample_video_path, tmp_path, capsys):
+    """--split-every按固定时长切分为多个文件"""
+    video_path = str(tmp_path / "talk.mp4")
+    os.replace(sample_video_path, video_path)
+    exit_code = main([video_path, "--split-every", "0.5", "--encoder", "opencv", "--quiet"])
+
+    assert exit_code == 0
+    outputs = capsys.readouterr().out.split()
+    assert [os.path.basename(path) for path in outputs] == [
+        "talk_trim_0-14.mp4",
+        "talk_trim_15-29.mp4",
+        "talk_trim_30-44.mp4",
+        "talk_trim_45-59.mp4",
+    ]
+    for path in outputs:
+        cap = cv2.VideoCapture(path)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 15
+        cap.release()
+
+
+def test_parse_trim_multiple_ranges():
+    """逗号分隔的多个范围合并为一个时间裁切参数"""
+    trim_params = parse_trim("40:49,0:9")
+    assert (trim_params["start_frame"], trim_params["end_frame"]) == (0, 49)
+    assert [tuple(r) for r in trim_params["ranges"]] == [(0, 9), (40, 49)]
+    with pytest.raises(ValueError):
+        parse_trim("10:5")
+
+
+def test_cli_cut_ranges(sample_video_path, tmp_path):
+    """--cut删除指定范围，其余部分拼接为一个输出"""
+    output_path = str(tmp_path / "cut.mp4")
+    exit_code = main(
+        [sample_video_path, "--cut", "10:29", "-o", output_path, "--encoder", "opencv", "--quiet"]
+    )
+
+    assert exit_code == 0
+    cap = cv2.VideoCapture(output_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    assert len(frames) == 40
+    # 第10帧之后紧接第30帧
+    assert abs(float(frames[10].mean()) - 30 * 4) < 8
+
+
+def test_cli_split_honours_keep_ranges(sample_video_path, tmp_path, capsys):
+    """多个 --trim 中带逗号的值只导出其中的各个范围"""
+    exit_code = main(
+        [sample_video_path, "--trim", "0:9,50:59", "--trim", "5:7", "--encoder", "opencv", "-q"]
+    )
+
+    assert exit_code == 0
+    outputs = capsys.readouterr().out.split()
+    counts = []
+    for path in outputs:
+        cap = cv2.VideoCapture(path)
+        counts.append(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        cap.release()
+    assert counts == [20, 3]
@@ -0,0 +1,89 @@
+"""
+磁盘缓存测试
+"""
+
+import time
+
+import numpy as np
+
+from disk_cache import DiskCache, file_key
+from video_processor import DirectCallbackManager, VideoProcessor
+
+
+class TestDiskCache:
+    def test_round_trip(self, tmp_path):
+        """JSON、数组和缩略图条目可以原样读回"""
+        cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+        cache.put_json("k", "probe", {"fps": 30.0, "total_frames": 60})
+        cache.put_arrays("k", "index", {"keyframes": np.array([0, 12, 24])})
+        thumbnail = np.full((18, 32, 3), 128, dtype=np.uint8)
+        cache.put_thumbnail("k", 12, thumbnail)
+
+        assert cache.get_json("k", "probe") == {"fps": 30.0, "total_frames": 60}
+        assert cache.get_arrays("k", "index")["keyframes"].tolist() == [0, 12, 24]
+        restored = cache.get_thumbnail("k", 12, 18)
+        assert restored.shape == (18, 32, 3)
+        assert abs(int(restored.mean()) - 128) <= 2
+        assert cache.get_json("other", "probe") is None
+        cache.close()
+
+    def test_lru_eviction(self, tmp_path):
+        """超过大小上限时淘汰最久未访问的条目"""
+        cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+        cache.put("a", "blob", b"x" * 100)
+        time.sleep(0.01)
+        cache.put("b", "blob", b"x" * 100)
+        time.sleep(0.01)
+        cache.get("a", "blob")  # a 成为最近使用
+        time.sleep(0.01)
+        cache.put("c", "blob", b"x" * 100)
+
+        assert cache.get("a", "blob") is not None
+        assert cache.get("b", "blob") is None
+        assert cache.get("c", "blob") is not None
+        assert cache.total_bytes() == 200
+        cache.close()
+
+    def test_running_total_avoids_scans(self, tmp_path):
+        """未超过上限时写入不扫描数据库，替换条目按大小差值累计"""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = DiskCache(path, max_bytes=1000)
+        scans = []
+        original = cache._sum_sizes
+        cache._sum_sizes = lambda: scans.append(1) or original()
+
+        cache.put("a", "blob", b"x" * 100)
+        cache.put("a", "blob", b"x" * 300)
+        cache.put("b", "blob", b"x" * 200)
+        assert scans == []
+        assert cache._total == 500 == cache.total_bytes()
+        cache.close()
+
+        reopened = DiskCache(path, max_bytes=1000)
+        assert reopened._total == 500
+        reopened.close()
+
+    def test_file_key_changes_with_content(self, tmp_path):
+        """文件内容改变后缓存键随之改变"""
+        path = tmp_path / "video.bin"
+        path.write_bytes(b"1234")
+        first = file_key(str(path))
+        path.write_bytes(b"123456")
+        assert file_key(str(path)) != first
+
+
+class TestCachedIndex:
+    def test_reopen_uses_cached_index(self, sample_video_path):
+        """再次打开同一文件时直接使用缓存的关键帧索引，不再扫描"""
+        processor = VideoProcessor(DirectCallbackManager())
+        processor.load_video(sample_video_path)
+        assert processor.keyframe_index.wait(timeout=10)
+        keyframes = processor.keyframe_index.keyframes
+        processor.release()
+
+        reopened = VideoProcessor(DirectCallbackManager())
+        reopened.load_video(sample_video_path)
+        assert reopened.is_index_complete()
+        assert reopened.keyframe_index.keyframes == keyframes
+        assert reopened.get_video_info()["total_frames"] == 60
+        reopened.release()
@@ -0,0 +1,114 @@
+"""
+编码器测试
+"""
+
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+import encoders
+from encoders import (
+    EncoderError,
+    FFmpegPipeEncoder,
+    OpenCVEncoder,
+    build_encoder_command,
+    create_encoder,
+    resolve_encoder_params,
+)
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="未安装ffmpeg")
+
+
+def count_frames(path):
+    """统计视频文件可读出的帧数"""
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+class TestEncoderParams:
+    def test_auto_backend(self, monkeypatch):
+        """auto后端在安装了ffmpeg时使用ffmpeg，否则使用OpenCV"""
+        monkeypatch.setattr(encoders, "find_ffmpeg", lambda: "/usr/bin/ffmpeg")
+        assert resolve_encoder_params({"backend": "auto"})["backend"] == "ffmpeg"
+        monkeypatch.setattr(encoders, "find_ffmpeg", lambda: None)
+        assert resolve_encoder_params({"backend": "auto"})["backend"] == "opencv"
+
+    def test_unspecified_values_use_defaults(self):
+        """值为None的项使用默认值"""
+        params = resolve_encoder_params({"backend": "opencv", "crf": None, "preset": "ultrafast"})
+        assert params["crf"] == encoders.FFMPEG_ENCODER_CRF
+        assert params["preset"] == "ultrafast"
+
+    def test_build_encoder_command(self):
+        """从标准输入读取原始BGR帧，按指定编码器、CRF和预设编码"""
+        params = {"codec": "libx264", "crf": 23, "preset": "fast", "threads": 4}
+        command = build_encoder_command("ffmpeg", "out.mp4", 30.0, (640, 360), params)
+
+        assert command[command.index("-f") + 1] == "rawvideo"
+        assert command[command.index("-pix_fmt") + 1] == "bgr24"
+        assert command[command.index("-s") + 1] == "640x360"
+        assert command[command.index("-i") + 1] == "-"
+        assert command[command.index("-c:v") + 1] == "libx264"
+        assert command[command.index("-crf") + 1] == "23"
+        assert command[command.index("-preset") + 1] == "fast"
+        assert command[command.index("-threads") + 1] == "4"
+        assert "-vf" not in command
+        assert command[-1] == "out.mp4"
+
+    def test_odd_size_is_padded(self):
+        """奇数尺寸补齐为偶数，不支持预设的编码器不传-preset"""
+        params = {"codec": "mpeg4", "crf": None, "preset": "fast", "threads": 0}
+        command = build_encoder_command("ffmpeg", "out.mp4", 25.0, (33, 17), params)
+        assert "-vf" in command
+        assert "-preset" not in command
+        assert "-crf" not in command
+
+
+class TestEncoders:
+    def test_opencv_encoder(self, tmp_path):
+        """OpenCV后端写出可读的视频，abort删除输出文件"""
+        output_path = str(tmp_path / "out.mp4")
+        encoder = create_encoder(output_path, 30.0, (64, 48), {"backend": "opencv"})
+        assert isinstance(encoder, OpenCVEncoder)
+        for i in range(10):
+            encoder.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+        encoder.close()
+        assert count_frames(output_path) == 10
+
+        aborted = str(tmp_path / "aborted.mp4")
+        encoder = OpenCVEncoder(aborted, 30.0, (64, 48))
+        encoder.write(np.zeros((48, 64, 3), dtype=np.uint8))
+        encoder.abort()
+        assert not (tmp_path / "aborted.mp4").exists()
+
+    def test_opencv_rejects_yuv(self, tmp_path):
+        """OpenCV后端只接受BGR帧"""
+        with pytest.raises(EncoderError):
+            create_encoder(
+                str(tmp_path / "out.mp4"), 30.0, (64, 48), {"backend": "opencv"}, "yuv420p"
+            )
+
+    def test_unknown_backend(self, tmp_path):
+        """未知后端抛出EncoderError"""
+        with pytest.raises(EncoderError):
+            create_encoder(str(tmp_path / "out.mp4"), 30.0, (64, 48), {"backend": "gpu"})
+
+    @requires_ffmpeg
+    def test_ffmpeg_pipe_encoder(self, tmp_path):
+        """ffmpeg后端接受裁切得到的非连续数组，奇数尺寸也能编码"""
+        output_path = str(tmp_path / "out.mp4")
+        encoder = create_encoder(
+            output_path, 30.0, (33, 17), {"backend": "ffmpeg", "preset": "ultrafast"}
+        )
+        assert isinstance(encoder, FFmpegPipeEncoder)
+        frame = np.full((48, 64, 3), 128, dtype=np.uint8)
+        for _ in range(10):
+            encoder.write(frame[5:22, 7:40])
+        encoder.close()
+        assert count_frames(output_path) == 10
@@ -0,0 +1,124 @@
+"""
+导出流水线测试
+"""
+
+import time
+
+import pytest
+
+from export_pipeline import ExportPipeline, MultiOutputPipeline, PipelineError
+
+
+def test_frames_pass_through_in_order():
+    """所有帧按顺序经过变换后写出，并记录各阶段耗时"""
+    written = []
+    pipeline = ExportPipeline(
+        lambda: ((n, n) for n in range(100)),
+        lambda n, frame: frame * 2,
+        lambda n, frame: written.append((n, frame)),
+        queue_size=4,
+    )
+
+    assert pipeline.run() == 100
+    assert written == [(n, n * 2) for n in range(100)]
+    assert pipeline.stats["frames"] == 100
+    assert set(pipeline.stats) >= {"decode", "transform", "encode", "wall"}
+
+
+def test_error_stops_pipeline():
+    """变换阶段出错时中止流水线并报告出错的阶段和帧号"""
+
+    def transform(n, frame):
+        if n == 7:
+            raise ValueError("bad frame")
+        return frame
+
+    written = []
+    pipeline = ExportPipeline(
+        lambda: ((n, n) for n in range(1000)),
+        transform,
+        lambda n, frame: written.append(n),
+        queue_size=2,
+    )
+
+    with pytest.raises(PipelineError) as exc_info:
+        pipeline.run()
+
+    assert exc_info.value.stage == "transform"
+    assert exc_info.value.frame_number == 7
+    assert 7 not in written
+
+
+def test_backpressure_bounds_read_ahead():
+    """编码阶段较慢时，解码阶段最多领先队列容量范围内的帧数"""
+    decoded = []
+    max_lead = [0]
+
+    def read_frames():
+        for n in range(30):
+            decoded.append(n)
+            yield n, n
+
+    def write_frame(n, frame):
+        max_lead[0] = max(max_lead[0], len(decoded) - n)
+        time.sleep(0.002)
+
+    ExportPipeline(read_frames, lambda n, frame: frame, write_frame, queue_size=2).run()
+
+    # 两个队列各2帧，加上变换阶段和解码阶段手中的帧
+    assert max_lead[0] <= 2 * 2 + 3
+
+
+def test_multi_output_decodes_once():
+    """每帧只解码一次，每一路按顺序收到各自变换后的帧"""
+    decoded = []
+    written = [[], [], []]
+
+    def read_frames():
+        for n in range(50):
+            decoded.append(n)
+            yield n, n
+
+    outputs = [
+        (lambda n, frame, k=k: frame + k, lambda n, frame, k=k: written[k].append(frame))
+        for k in range(3)
+    ]
+    pipeline = MultiOutputPipeline(read_frames, outputs, queue_size=4)
+
+    assert pipeline.run() == 50
+    assert decoded == list(range(50))
+    for k in range(3):
+        assert written[k] == [n + k for n in range(50)]
+    assert pipeline.completed_frames == 50
+
+
+def test_multi_output_slow_writer_does_not_block_others():
+    """较慢的一路不影响其他路在队列容量内继续编码"""
+    fast_progress = []
+
+    def slow_write(n, frame):
+        time.sleep(0.01)
+        fast_progress.append((n, pipeline.written[1]))
+
+    outputs = [(lambda n, frame: frame, slow_write), (lambda n, frame: frame, lambda n, f: None)]
+    pipeline = MultiOutputPipeline(lambda: ((n, n) for n in range(20)), outputs, queue_size=8)
+    pipeline.run()
+
+    # 慢的一路写第一帧时，快的一路已经写完了队列中的多帧
+    assert fast_progress[0][1] > 1
+
+
+def test_multi_output_error_reports_output():
+    """任一路出错时中止所有输出并报告出错的输出"""
+
+    def failing_write(n, frame):
+        if n == 5:
+            raise IOError("disk full")
+
+    outputs = [(lambda n, frame: frame, lambda n, f: None), (lambda n, frame: frame, failing_write)]
+    pipeline = MultiOutputPipeline(lambda: ((n, n) for n in range(1000)), outputs, queue_size=2)
+
+    with pytest.raises(PipelineError) as exc_info:
+        pipeline.run()
+    assert exc_info.value.stage == "encode[1]"
+    assert exc_info.value.frame_number == 5
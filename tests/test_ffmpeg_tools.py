@@ -0,0 +1,123 @@
+"""
+ffmpeg工具测试
+"""
+
+import shutil
+
+import cv2
+import pytest
+
+from ffmpeg_tools import (
+    FFmpegError,
+    build_segment_command,
+    build_stream_copy_command,
+    build_yuv_decode_command,
+    iter_yuv420_frames,
+    plan_smart_render,
+    smart_render_encoder_args,
+    stream_copy_trim,
+)
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="未安装ffmpeg")
+
+
+def test_build_stream_copy_command():
+    """流复制命令在输入前定位并复制所有视频和音频包"""
+    command = build_stream_copy_command("ffmpeg", "in.mp4", "out.mp4", 2.0, 5.5)
+
+    assert command.index("-ss") < command.index("-i")
+    assert command[command.index("-ss") + 1] == "2.000000"
+    assert command[command.index("-t") + 1] == "3.500000"
+    assert command[command.index("-c") + 1] == "copy"
+    assert command[-1] == "out.mp4"
+
+
+def test_build_yuv_decode_command():
+    """解码命令输出指定帧数的原始YUV420帧，不补帧也不丢帧"""
+    command = build_yuv_decode_command("ffmpeg", "in.mp4", 1.5, 10)
+
+    assert command.index("-ss") < command.index("-i")
+    assert command[command.index("-frames:v") + 1] == "10"
+    assert command[command.index("-vsync") + 1] == "passthrough"
+    assert command[command.index("-pix_fmt") + 1] == "yuv420p"
+    assert command[-1] == "-"
+
+
+@requires_ffmpeg
+def test_iter_yuv420_frames(sample_video_path):
+    """逐帧读出YUV420平面，起始位置帧精确"""
+    frames = list(iter_yuv420_frames(sample_video_path, 64, 48, 10 / 30.0, 5))
+
+    assert len(frames) == 5
+    y, u, v = frames[0]
+    assert (y.shape, u.shape, v.shape) == ((48, 64), (24, 32), (24, 32))
+    # 测试视频每帧亮度为帧号的4倍（BT.601有限范围）
+    assert abs(float(y.mean()) - (16 + 40 * 219 / 255)) < 4
+
+
+class TestPlanSmartRender:
+    KEYFRAMES = [0, 30, 60, 90]
+
+    def test_partial_gops_at_both_ends(self):
+        """首尾不完整的GOP重新编码，中间完整的GOP复制"""
+        plan = plan_smart_render(self.KEYFRAMES, 10, 75, 120)
+        assert plan == [("encode", 10, 30), ("copy", 30, 60), ("encode", 60, 76)]
+
+    def test_aligned_range_is_copied(self):
+        """起止都在GOP边界上时整段复制"""
+        assert plan_smart_render(self.KEYFRAMES, 30, 89, 120) == [("copy", 30, 90)]
+        assert plan_smart_render(self.KEYFRAMES, 90, 119, 120) == [("copy", 90, 120)]
+
+    def test_range_inside_single_gop(self):
+        """范围内没有完整GOP时整段重新编码"""
+        assert plan_smart_render(self.KEYFRAMES, 35, 50, 120) == [("encode", 35, 51)]
+
+
+H264_STREAM = {"codec_name": "h264", "pix_fmt": "yuv420p", "profile": "High", "level": 41}
+
+
+def test_build_segment_command():
+    """复制片段添加码流过滤器，编码片段使用对应编码器，均限定帧数"""
+    copy = build_segment_command("ffmpeg", "in.mp4", "a.ts", "copy", 1.0, 30, H264_STREAM)
+    assert copy[copy.index("-c:v") + 1] == "copy"
+    assert copy[copy.index("-bsf:v") + 1] == "h264_mp4toannexb"
+    assert copy[copy.index("-frames:v") + 1] == "30"
+
+    encode = build_segment_command("ffmpeg", "in.mp4", "b.ts", "encode", 0.5, 12, H264_STREAM)
+    assert encode[encode.index("-c:v") + 1] == "libx264"
+    assert "-bsf:v" not in encode
+
+
+def test_smart_render_encoder_args_match_source():
+    """边界GOP按源视频的像素格式、profile和level编码"""
+    args = smart_render_encoder_args(H264_STREAM)
+    assert args[args.index("-pix_fmt") + 1] == "yuv420p"
+    assert args[args.index("-profile:v") + 1] == "high"
+    assert args[args.index("-level") + 1] == "4.1"
+
+    stream = {"codec_name": "hevc", "pix_fmt": "yuv422p10le", "profile": "Rext", "level": 123}
+    args = smart_render_encoder_args(stream)
+    assert args[args.index("-profile:v") + 1] == "main422-10"
+    assert args[args.index("-x265-params") + 1] == "level-idc=4.1"
+
+
+def test_smart_render_rejects_unmatched_source():
+    """无法匹配源视频的像素格式或profile时抛出FFmpegError，由调用方完整重新编码"""
+    with pytest.raises(FFmpegError):
+        smart_render_encoder_args({"codec_name": "hevc", "pix_fmt": "yuv422p", "level": 0})
+    with pytest.raises(FFmpegError):
+        smart_render_encoder_args(dict(H264_STREAM, profile="High 4:4:4 Intra"))
+    with pytest.raises(FFmpegError):
+        smart_render_encoder_args({"codec_name": "vp9", "pix_fmt": "yuv420p"})
+
+
+@requires_ffmpeg
+def test_stream_copy_trim(sample_video_path, tmp_path):
+    """流复制剪辑生成可读取的视频"""
+    output_path = str(tmp_path / "copy.mp4")
+    stream_copy_trim(sample_video_path, output_path, 0.0, 1.0)
+
+    cap = cv2.VideoCapture(output_path)
+    assert cap.isOpened()
+    assert cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+    cap.release()
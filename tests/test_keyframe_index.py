@@ -0,0 +1,48 @@
+"""
+关键帧索引测试
+"""
+
+from keyframe_index import KeyframeIndex
+
+
+class TestKeyframeIndex:
+    def test_build_counts_frames_and_keyframes(self, sample_video_path):
+        """扫描完成后得到实际帧数和关键帧列表"""
+        index = KeyframeIndex(sample_video_path)
+        assert index.build()
+
+        assert index.frame_count == 60
+        keyframes = index.keyframes
+        assert keyframes[0] == 0
+        assert keyframes == sorted(keyframes)
+
+    def test_keyframe_before(self, sample_video_path):
+        """查找不晚于目标帧的最近关键帧"""
+        index = KeyframeIndex(sample_video_path)
+        index.build()
+
+        keyframes = index.keyframes
+        for frame_number in (0, 13, 59):
+            keyframe = index.keyframe_before(frame_number)
+            assert keyframe <= frame_number
+            assert not [k for k in keyframes if keyframe < k <= frame_number]
+
+        assert index.keyframe_before(60) is None
+
+    def test_long_gop_keyframes(self, long_gop_video_path):
+        """长GOP视频只有每个GOP的第一帧是关键帧"""
+        index = KeyframeIndex(long_gop_video_path)
+        assert index.build()
+
+        assert index.frame_count == 90
+        assert index.keyframes == list(range(0, 90, 12))
+        assert index.keyframe_before(23) == 12
+        assert index.keyframe_before(24) == 24
+
+    def test_timestamps_in_presentation_order(self, sample_video_path):
+        """时间戳按帧率递增"""
+        index = KeyframeIndex(sample_video_path)
+        index.build()
+
+        assert index.get_timestamp(0) == 0
+        assert abs(index.get_timestamp(30) - 1000.0) < 1
@@ -0,0 +1,88 @@
+"""
+主程序窗口缩放处理测试（不创建Tk窗口）
+"""
+
+from types import SimpleNamespace
+
+from main import VideoCropper
+
+
+class StubRoot:
+    """记录after()定时器的根窗口替身"""
+
+    def __init__(self):
+        self.timers = {}
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        del self.timers[timer_id]
+
+
+class StubCropper(VideoCropper):
+    """跳过Tk初始化和析构时的资源释放"""
+
+    def __del__(self):
+        pass
+
+
+def make_cropper(redraw_mode):
+    """创建只带有窗口缩放处理所需属性的主程序对象"""
+    cropper = StubCropper.__new__(StubCropper)
+    cropper.root = StubRoot()
+    cropper.resize_timer = None
+    cropper.playback_reader = None
+    cropper.video_loaded = True
+    cropper.is_in_crop_preview = False
+    cropper.is_playing = False
+    cropper.scrubbing = False
+    cropper.decoded = []
+    cropper.shown = []
+    cropper.control_panel = SimpleNamespace(
+        filmstrip=SimpleNamespace(refresh=lambda force=False: None),
+        get_current_frame=lambda: 7,
+    )
+    cropper.video_canvas = SimpleNamespace(
+        redraw=lambda quality: redraw_mode,
+        show_frame=lambda frame, quality: cropper.shown.append(frame),
+        scale_x=1.0,
+        scale_y=1.0,
+        display_offset=(0, 0),
+    )
+    cropper.video_processor = SimpleNamespace(
+        get_frame=lambda n: cropper.decoded.append(n) or "frame"
+    )
+    cropper.crop_controller = SimpleNamespace(redraw_crop_rectangle=lambda: None)
+    cropper.status_bar = SimpleNamespace(set_scale_info=lambda *args: None)
+    return cropper
+
+
+class TestResizeDebounce:
+    def test_events_are_coalesced(self):
+        """连续的缩放事件只保留最后一个定时器，子控件的事件被忽略"""
+        cropper = make_cropper("frame")
+        for _ in range(5):
+            cropper.on_window_resize(SimpleNamespace(widget=cropper.root))
+        cropper.on_window_resize(SimpleNamespace(widget=object()))
+
+        assert list(cropper.root.timers) == [cropper.resize_timer]
+        cropper.root.timers.pop(cropper.resize_timer)()
+        assert cropper.resize_timer is None
+
+    def test_redraw_does_not_decode(self):
+        """有保存的原始帧时直接重新缩放，不调用解码器"""
+        cropper = make_cropper("frame")
+        cropper._redraw_after_resize()
+        assert cropper.decoded == []
+        assert cropper.shown == []
+
+    def test_falls_back_to_decoding(self):
+        """没有可用的原始帧时解码当前帧后显示"""
+        cropper = make_cropper(None)
+        cropper._redraw_after_resize()
+        assert cropper.decoded == [7]
+        assert cropper.shown == ["frame"]
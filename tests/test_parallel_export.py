@@ -0,0 +1,136 @@
+"""
+并行导出测试
+"""
+
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from keyframe_index import KeyframeIndex
+from parallel_export import export_chunk, plan_chunks, run_parallel_export
+from video_processor import DirectCallbackManager, VideoProcessor
+
+
+def read_all_frames(video_path):
+    """读取视频的所有帧"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+class TestPlanChunks:
+    def test_chunks_start_on_keyframes(self):
+        """除第一段外各段从关键帧开始，且首尾相接覆盖整个范围"""
+        keyframes = list(range(0, 1000, 50))
+        chunks = plan_chunks(keyframes, 10, 899, 4)
+
+        assert chunks[0][0] == 10
+        assert chunks[-1][1] == 899
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            assert start == end + 1
+            assert start in keyframes
+
+    def test_sparse_keyframes_reduce_chunk_count(self):
+        """关键帧不足时分段数减少"""
+        assert plan_chunks([0], 0, 99, 4) == [(0, 99)]
+
+
+def test_export_chunk_crops_frames(sample_video_path, tmp_path):
+    """分段导出写出指定范围内裁切后的帧"""
+    output_path = str(tmp_path / "chunk.mp4")
+    result = export_chunk(
+        {
+            "video_path": sample_video_path,
+            "output_path": output_path,
+            "start_frame": 12,
+            "end_frame": 23,
+            "crop_params": {"x": 8, "y": 8, "width": 32, "height": 16},
+            "fps": 30.0,
+            "frame_size": (32, 16),
+        }
+    )
+
+    assert result == {"frames": 12, "out_of_bounds": 0}
+    frames = read_all_frames(output_path)
+    assert len(frames) == 12
+    assert frames[0].shape == (16, 32, 3)
+    assert abs(float(np.mean(frames[0])) - 12 * 4) < 8
+
+
+def test_chunks_on_long_gop(long_gop_video_path, tmp_path, frame_marker):
+    """长GOP视频：分段从关键帧开始（第一段除外），各段导出的帧首尾相接、逐帧精确"""
+    index = KeyframeIndex(long_gop_video_path)
+    index.build()
+    chunks = plan_chunks(index.keyframes, 7, 80, 3)
+    assert len(chunks) == 3
+    assert all(start in index.keyframes for start, _ in chunks[1:])
+
+    markers = []
+    for i, (start_frame, end_frame) in enumerate(chunks):
+        output_path = str(tmp_path / f"chunk{i}.mp4")
+        export_chunk(
+            {
+                "video_path": long_gop_video_path,
+                "output_path": output_path,
+                "start_frame": start_frame,
+                "end_frame": end_frame,
+                "crop_params": None,
+                "fps": 30.0,
+                "frame_size": (64, 48),
+                "encoder_params": {"backend": "opencv"},
+            }
+        )
+        markers += [frame_marker(frame) for frame in read_all_frames(output_path)]
+    assert markers == list(range(7, 81))
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="未安装ffmpeg")
+def test_parallel_export_matches_serial(long_gop_video_path, tmp_path, frame_marker):
+    """并行导出拼接后的帧与串行导出逐帧一致（无损编码，第一段不从关键帧开始）"""
+    encoder_params = {"backend": "ffmpeg", "codec": "libx264", "crf": 0, "preset": "ultrafast"}
+    crop_params = {"x": 0, "y": 0, "width": 64, "height": 48}
+    start_frame, end_frame = 7, 80
+
+    index = KeyframeIndex(long_gop_video_path)
+    index.build()
+    chunks = plan_chunks(index.keyframes, start_frame, end_frame, 3)
+    assert chunks[0][0] not in index.keyframes and len(chunks) == 3
+
+    parallel_path = str(tmp_path / "parallel.mp4")
+    total = run_parallel_export(
+        long_gop_video_path,
+        parallel_path,
+        chunks,
+        crop_params,
+        30.0,
+        (64, 48),
+        2,
+        encoder_params=encoder_params,
+    )
+
+    callbacks = DirectCallbackManager()
+    processor = VideoProcessor(callbacks, cache_max_bytes=0)
+    processor.load_video(long_gop_video_path)
+    processor.parallel_workers = 1
+    processor.encoder_params = encoder_params
+    serial_path = str(tmp_path / "serial.mp4")
+    processor._process_video_thread(
+        serial_path, crop_params, {"start_frame": start_frame, "end_frame": end_frame}
+    )
+    processor.release()
+
+    parallel = read_all_frames(parallel_path)
+    serial = read_all_frames(serial_path)
+    assert total == len(parallel) == len(serial) == end_frame - start_frame + 1
+    assert [frame_marker(frame) for frame in parallel] == list(range(start_frame, end_frame + 1))
+    for parallel_frame, serial_frame in zip(parallel, serial):
+        difference = np.abs(parallel_frame.astype(np.int16) - serial_frame.astype(np.int16))
+        assert float(difference.mean()) < 2
@@ -0,0 +1,191 @@
+"""
+播放预读测试
+"""
+
+import threading
+import time
+
+from playback import PlaybackClock, PlaybackReader, ScrubDecoder
+
+
+def wait_idle(decoder, timeout=5.0):
+    """等待拖动解码器处理完所有请求"""
+    deadline = time.monotonic() + timeout
+    while decoder.busy and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def drain(reader, timeout=5.0):
+    """从预读器中取出所有帧，直到读取结束"""
+    frames = []
+    deadline = time.monotonic() + timeout
+    while not reader.finished and time.monotonic() < deadline:
+        item = reader.get_frame()
+        if item is None:
+            time.sleep(0.001)
+            continue
+        frames.append(item)
+    return frames
+
+
+class TestPlaybackReader:
+    def test_reads_range_in_order(self, sample_video_path):
+        """按顺序读取指定范围内的帧并应用预处理"""
+        reader = PlaybackReader(
+            sample_video_path, 5, 20, prepare=lambda n, frame: float(frame.mean()), buffer_size=4
+        )
+        reader.start()
+        frames = drain(reader)
+        reader.stop()
+
+        assert [n for n, _ in frames] == list(range(5, 21))
+        for frame_number, mean in frames:
+            assert abs(mean - frame_number * 4) < 4
+
+    def test_seek_flushes_buffer(self, sample_video_path):
+        """跳转后丢弃旧帧，从新位置继续读取"""
+        reader = PlaybackReader(sample_video_path, 0, 59, buffer_size=4)
+        reader.start()
+        first = None
+        while first is None:
+            first = reader.get_frame()
+        reader.seek(40)
+
+        frames = drain(reader)
+        reader.stop()
+
+        assert [n for n, _ in frames] == list(range(40, 60))
+
+    def test_skip_before_grabs_without_decoding(self, sample_video_path):
+        """落后于播放时钟时跳过中间帧，不对其预处理"""
+        prepared = []
+        reader = PlaybackReader(
+            sample_video_path,
+            0,
+            59,
+            prepare=lambda n, frame: prepared.append(n) or n,
+            buffer_size=4,
+        )
+        reader.skip_before(30)
+        reader.start()
+        frames = drain(reader)
+        reader.stop()
+
+        assert [n for n, _ in frames] == list(range(30, 60))
+        assert prepared == list(range(30, 60))
+        assert reader.skipped_frames == 30
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPlaybackClock:
+    def test_frames_follow_wall_clock(self):
+        """按经过的时间计算应显示的帧，不受处理耗时累积影响"""
+        fake = FakeClock()
+        clock = PlaybackClock(25.0, clock=fake)
+        clock.start(10)
+
+        assert clock.frame_at() == 10
+        assert abs(clock.time_until(11) - 0.04) < 1e-9
+        fake.now += 1.0
+        assert clock.frame_at() == 35
+        assert clock.time_until(35) <= 0
+
+    def test_speed_change_keeps_position(self):
+        """改变速度时从当前位置继续，速度限制在允许范围内"""
+        fake = FakeClock()
+        clock = PlaybackClock(10.0, clock=fake)
+        clock.start(0)
+        fake.now += 1.0
+        clock.set_speed(4.0)
+        assert clock.frame_at() == 10
+        fake.now += 0.5
+        assert clock.frame_at() == 30
+
+        clock.set_speed(100.0)
+        assert clock.speed == 8.0
+        clock.set_speed(0.01)
+        assert clock.speed == 0.25
+
+    def test_displayed_fps_and_drops(self):
+        """统计最近一秒的显示帧率和丢帧数"""
+        fake = FakeClock()
+        clock = PlaybackClock(30.0, clock=fake)
+        for _ in range(21):
+            clock.record_displayed()
+            fake.now += 0.05
+        clock.record_dropped(3)
+
+        assert abs(clock.displayed_fps - 20.0) < 1e-6
+        assert clock.dropped_frames == 3
+
+
+class TestScrubDecoder:
+    def test_only_latest_request_is_decoded(self):
+        """解码期间到达的中间请求被丢弃，只解码最新的请求"""
+        decoded = []
+        gate = threading.Event()
+
+        def get_frame(frame_number):
+            decoded.append(frame_number)
+            gate.wait(timeout=5.0)
+            return frame_number
+
+        decoder = ScrubDecoder(get_frame)
+        decoder.start()
+        decoder.request(1)
+        while not decoded:
+            time.sleep(0.001)
+        for frame_number in (2, 3, 4):
+            decoder.request(frame_number)
+        gate.set()
+        wait_idle(decoder)
+        decoder.stop()
+
+        assert decoded == [1, 4]
+        assert decoder.get_result() == (4, 4, None, True)
+
+    def test_approximate_then_exact(self):
+        """先提交近似帧，再细化为精确帧"""
+        results = []
+        decoder = ScrubDecoder(
+            lambda n: n,
+            prepare=lambda n, frame: results.append((n, frame)) or frame * 10,
+            approximate=lambda n: n - n % 12,
+        )
+        decoder.start()
+        decoder.request(30)
+        wait_idle(decoder)
+        decoder.stop()
+
+        assert results == [(24, 24), (30, 30)]
+        assert decoder.get_result() == (30, 30, 300, True)
+
+    def test_cancel_discards_result(self):
+        """取消后正在解码的帧完成时不再提交"""
+        gate = threading.Event()
+        started = threading.Event()
+
+        def get_frame(frame_number):
+            started.set()
+            gate.wait(timeout=5.0)
+            return frame_number
+
+        decoder = ScrubDecoder(get_frame)
+        decoder.start()
+        decoder.request(7)
+        started.wait(timeout=5.0)
+        decoder.cancel()
+        gate.set()
+        wait_idle(decoder)
+        decoder.stop()
+
+        assert decoder.get_result() is None
@@ -0,0 +1,86 @@
+"""
+代理文件测试
+"""
+
+import os
+
+import cv2
+
+import video_processor
+from proxy import ProxyBuilder, needs_proxy, proxy_size, prune_proxies
+from video_processor import DirectCallbackManager, VideoProcessor
+
+
+class TestProxyHelpers:
+    def test_needs_proxy(self):
+        """自动模式下只为高分辨率视频生成代理"""
+        assert needs_proxy(3840, 2160, "auto")
+        assert not needs_proxy(1920, 1080, "auto")
+        assert needs_proxy(1920, 1080, "always")
+        assert not needs_proxy(3840, 2160, "off")
+        assert not needs_proxy(640, 480, "always")
+
+    def test_proxy_size_keeps_aspect_and_even(self):
+        """代理尺寸保持宽高比，宽高均为偶数"""
+        assert proxy_size(3840, 2160) == (960, 540)
+        width, height = proxy_size(4096, 2160)
+        assert height == 540
+        assert width % 2 == 0 and abs(width / height - 4096 / 2160) < 0.01
+
+    def test_prune_proxies_lru(self, tmp_path):
+        """超过上限时先删除最久未用的代理，保留正在使用的代理和临时文件"""
+        proxy_dir = tmp_path / "proxies"
+        proxy_dir.mkdir()
+        paths = []
+        for i, name in enumerate(["a.avi", "b.avi", "c.avi", "d.part.avi"]):
+            path = proxy_dir / name
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+            paths.append(str(path))
+
+        removed = prune_proxies(str(proxy_dir), max_bytes=250, keep=paths[0])
+        assert removed == [paths[1]]
+        assert sorted(os.listdir(proxy_dir)) == ["a.avi", "c.avi", "d.part.avi"]
+
+
+class TestProxyBuilder:
+    def test_builds_all_frames(self, sample_video_path, tmp_path):
+        """代理文件帧数与源视频一致，尺寸为指定的代理尺寸"""
+        output_path = str(tmp_path / "proxy.avi")
+        builder = ProxyBuilder(sample_video_path, output_path, size=(32, 24))
+        assert builder.build()
+        assert builder.progress == 1.0
+
+        cap = cv2.VideoCapture(output_path)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 32
+        assert int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == 24
+        count = 0
+        while cap.grab():
+            count += 1
+        cap.release()
+        assert count == 60
+
+    def test_load_video_does_not_build_proxy_by_default(self, sample_video_path, monkeypatch):
+        """命令行和批处理导出不生成代理文件，只有指定build_proxy时才生成"""
+        monkeypatch.setattr(video_processor, "needs_proxy", lambda width, height: True)
+        processor = VideoProcessor(DirectCallbackManager())
+        processor.load_video(sample_video_path)
+        assert processor.proxy is None
+        processor.release()
+
+    def test_processor_switches_preview_to_proxy(self, sample_video_path, tmp_path):
+        """代理文件就绪后预览帧来自代理文件，导出仍使用源文件"""
+        processor = VideoProcessor(DirectCallbackManager())
+        processor.load_video(sample_video_path)
+        processor.proxy = ProxyBuilder(
+            sample_video_path, str(tmp_path / "proxy.avi"), size=(32, 24)
+        )
+        processor.proxy.build()
+
+        frame = processor.get_frame(40)
+        assert processor.using_proxy
+        assert frame.shape[:2] == (24, 32)
+        assert abs(frame.mean() - 40 * 4) < 6
+        assert processor.preview_path == processor.proxy.output_path
+        assert processor.decoder_pool.video_path == sample_video_path
+        processor.release()
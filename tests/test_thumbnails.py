@@ -0,0 +1,112 @@
+"""
+缩略图生成测试
+"""
+
+from keyframe_index import KeyframeIndex
+from thumbnails import ThumbnailGenerator, sample_positions
+from video_processor import DecoderPool
+
+
+class TestSamplePositions:
+    def test_levels_are_nested(self):
+        """每层只新增与上一层交错的采样点，合起来是等间距的"""
+        level0 = sample_positions(0, 99, 4, 0)
+        level1 = sample_positions(0, 99, 4, 1)
+        assert level0 == [0, 25, 50, 75]
+        assert level1 == [12, 37, 62, 87]
+        assert not set(level0) & set(level1)
+
+    def test_short_range(self):
+        """范围短于采样点数时每帧一个采样点"""
+        assert sample_positions(10, 12, 8, 0) == [10, 11, 12]
+
+
+class TestThumbnailGenerator:
+    def test_build_coarse_then_refine(self, sample_video_path):
+        """生成指定高度的缩略图，加密后采样点变密"""
+        generator = ThumbnailGenerator(sample_video_path, 60, height=24, levels=1)
+        generator.build(4, 0, 59)
+
+        assert generator.is_complete
+        frames = [n for n, _ in generator.thumbnails()]
+        assert len(frames) == 8
+        assert all(image.shape == (24, 32, 3) for _, image in generator.thumbnails())
+
+        frame_number, image = generator.nearest(31)
+        assert frame_number == 30
+        # 测试视频每帧亮度为帧号的4倍
+        assert abs(int(image.mean()) - 120) <= 6
+
+    def test_snaps_to_keyframes(self, sample_video_path):
+        """采样点靠近关键帧时使用关键帧"""
+        index = KeyframeIndex(sample_video_path)
+        index.build()
+        keyframes = index.keyframes
+        generator = ThumbnailGenerator(sample_video_path, 60, index, height=24, levels=0)
+        generator.build(2, 0, 59)
+
+        frames = [n for n, _ in generator.thumbnails()]
+        assert frames[0] == 0
+        spacing = 30
+        for n in frames:
+            keyframe = index.keyframe_before(n)
+            assert n in keyframes or n - keyframe > spacing // 2
+
+    def test_snaps_to_keyframes_long_gop(self, long_gop_video_path, frame_marker):
+        """长GOP视频：采样点吸附到附近的关键帧，每张缩略图都是其帧号对应的画面"""
+        index = KeyframeIndex(long_gop_video_path)
+        index.build()
+        generator = ThumbnailGenerator(long_gop_video_path, 90, index, height=24, levels=1)
+        generator.build(4, 0, 89)
+
+        assert generator.error is None
+        thumbnails = generator.thumbnails()
+        frames = [n for n, _ in thumbnails]
+        # 第0层采样点0、22、45、67分别吸附到关键帧0、12、36、60
+        assert {0, 12, 36, 60} <= set(frames)
+        for frame_number, image in thumbnails:
+            assert frame_marker(image) == frame_number
+
+    def test_reuses_disk_cache(self, sample_video_path, isolated_disk_cache):
+        """第二次生成直接从磁盘缓存读取，不再解码"""
+        first = ThumbnailGenerator(
+            sample_video_path, 60, height=24, disk_cache=isolated_disk_cache, cache_key="k"
+        )
+        first.build(4, 0, 59)
+
+        second = ThumbnailGenerator(
+            "missing.mp4", 60, height=24, disk_cache=isolated_disk_cache, cache_key="k", levels=0
+        )
+        second._decode_thumbnail = None  # 未命中缓存时会调用失败
+        second.build(4, 0, 59)
+        assert [n for n, _ in second.thumbnails()] == [0, 15, 30, 45]
+
+    def test_borrows_decoder_from_pool(self, sample_video_path):
+        """提供解码器池时从池中借用解码器，完成后归还"""
+        pool = DecoderPool(sample_video_path, max_handles=1)
+        generator = ThumbnailGenerator("missing.mp4", 60, height=24, levels=0, decoder_pool=pool)
+        generator.build(4, 0, 59)
+
+        assert generator.error is None
+        assert [n for n, _ in generator.thumbnails()] == [0, 15, 30, 45]
+        assert pool.open_count == 1
+        with pool.decoder(timeout=0):
+            pass
+        pool.close()
+
+    def test_stop_while_waiting_for_pool(self, sample_video_path):
+        """解码器池的句柄用尽时等待，停止后不再等待"""
+        pool = DecoderPool(sample_video_path, max_handles=1)
+        cap = pool.acquire()
+        generator = ThumbnailGenerator(sample_video_path, 60, height=24, decoder_pool=pool)
+        generator.start(4)
+        generator.stop()
+
+        assert not generator.is_complete
+        assert generator.thumbnails() == []
+        pool.release(cap)
+        pool.close()
+
+    def test_nearest_before_any_thumbnail(self):
+        """尚未生成缩略图时返回None"""
+        assert ThumbnailGenerator("missing.mp4", 60).nearest(10) is None
@@ -0,0 +1,163 @@
+"""
+画布显示准备测试（不创建Tk窗口）
+"""
+
+import numpy as np
+import pytest
+
+import ui_components
+from ui_components import QUALITY_FAST, QUALITY_HIGH, VideoCanvas
+
+
+def make_frame(width=1920, height=1080):
+    """生成左半蓝色、右半红色的BGR测试帧"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:, : width // 2] = (255, 0, 0)
+    frame[:, width // 2 :] = (0, 0, 255)
+    return frame
+
+
+class StubCanvas:
+    """记录图像项操作的画布替身"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.created = 0
+        self.configured = 0
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def create_image(self, x, y, **kwargs):
+        self.created += 1
+        return self.created
+
+    def itemconfigure(self, item, **kwargs):
+        self.configured += 1
+
+    def coords(self, item, x, y):
+        pass
+
+    def tag_lower(self, item):
+        pass
+
+    def delete(self, tag):
+        pass
+
+
+class StubPhotoImage:
+    """不需要Tk窗口的PhotoImage替身，记录创建和paste()次数"""
+
+    created = 0
+
+    def __init__(self, image):
+        StubPhotoImage.created += 1
+        self.size = image.size
+        self.pasted = 0
+
+    def width(self):
+        return self.size[0]
+
+    def height(self):
+        return self.size[1]
+
+    def paste(self, image):
+        assert image.size == self.size
+        self.pasted += 1
+
+
+@pytest.fixture
+def stub_canvas(monkeypatch):
+    """使用画布替身、不创建Tk窗口的VideoCanvas"""
+    monkeypatch.setattr(ui_components.ImageTk, "PhotoImage", StubPhotoImage)
+    StubPhotoImage.created = 0
+    canvas = VideoCanvas.__new__(VideoCanvas)
+    canvas.canvas = StubCanvas(640, 480)
+    canvas.source_size = None
+    canvas.tk_image = None
+    canvas.image_item = None
+    canvas.back_button = None
+    canvas.last_source = None
+    return canvas
+
+
+class TestDisplayPreparation:
+    def test_resize_for_display_converts_to_rgb(self):
+        """缩放结果为目标尺寸的RGB图像，两种质量颜色一致"""
+        frame = make_frame()
+        for quality in (QUALITY_FAST, QUALITY_HIGH):
+            image = VideoCanvas.resize_for_display(frame, 320, 180, quality)
+            assert image.size == (320, 180)
+            assert image.mode == "RGB"
+            assert image.getpixel((10, 90)) == (0, 0, 255)
+            assert image.getpixel((310, 90)) == (255, 0, 0)
+
+    def test_prepare_frame_keeps_only_shape(self):
+        """准备结果只保留原始帧尺寸，不保留全分辨率RGB副本"""
+        canvas = VideoCanvas.__new__(VideoCanvas)
+        canvas.source_size = None
+        prepared = canvas.prepare_frame(make_frame(), (800, 600), QUALITY_FAST)
+
+        assert prepared["frame_shape"] == (1080, 1920, 3)
+        assert "rgb_frame" not in prepared
+        assert prepared["image"].size == (800, 450)
+        assert prepared["offset"] == (0, 75)
+        assert abs(prepared["scale"][0] - 800 / 1920) < 1e-6
+
+    def test_prepare_frame_before_layout(self):
+        """画布尚未布局时不准备图像"""
+        canvas = VideoCanvas.__new__(VideoCanvas)
+        canvas.source_size = None
+        assert canvas.prepare_frame(make_frame(), (1, 1)) is None
+
+    def test_proxy_frame_maps_to_source_coordinates(self):
+        """显示低分辨率代理帧时，帧尺寸和缩放比例按源视频计算"""
+        canvas = VideoCanvas.__new__(VideoCanvas)
+        canvas.set_source_size(3840, 2160)
+        prepared = canvas.prepare_frame(make_frame(960, 540), (800, 600), QUALITY_FAST)
+
+        assert prepared["frame_shape"] == (2160, 3840, 3)
+        assert prepared["image"].size == (800, 450)
+        assert abs(prepared["scale"][0] - 800 / 3840) < 1e-6
+
+
+class TestCanvasRedraw:
+    def test_redraw_without_source(self, stub_canvas):
+        """没有显示过原始帧时redraw()返回None"""
+        assert stub_canvas.redraw() is None
+
+    def test_redraw_rescales_stored_frame(self, stub_canvas):
+        """redraw()把保存的原始帧按新的画布尺寸重新缩放，不需要重新解码"""
+        stub_canvas.show_frame(make_frame(), QUALITY_FAST)
+        assert stub_canvas.display_image.size == (640, 360)
+
+        stub_canvas.canvas.width, stub_canvas.canvas.height = 320, 240
+        assert stub_canvas.redraw(QUALITY_FAST) == "frame"
+        assert stub_canvas.display_image.size == (320, 180)
+        assert stub_canvas.display_offset == (0, 30)
+        assert abs(stub_canvas.scale_x - 320 / 1920) < 1e-6
+
+    def test_show_prepared_without_source_disables_redraw(self, stub_canvas):
+        """未提供原始帧时不保留旧的原始帧，redraw()返回None"""
+        stub_canvas.show_frame(make_frame(), QUALITY_FAST)
+        prepared = stub_canvas.prepare_frame(make_frame(), (640, 480), QUALITY_FAST)
+        assert stub_canvas.show_prepared(prepared)
+        assert stub_canvas.redraw() is None
+
+    def test_same_size_update_pastes(self, stub_canvas):
+        """尺寸不变时paste()到已有的PhotoImage，尺寸变化时才重新创建"""
+        for value in (0, 128, 255):
+            stub_canvas.show_frame(np.full((1080, 1920, 3), value, np.uint8), QUALITY_FAST)
+        assert StubPhotoImage.created == 1
+        assert stub_canvas.tk_image.pasted == 2
+        assert stub_canvas.canvas.created == 1
+
+        stub_canvas.canvas.width = 320
+        stub_canvas.redraw(QUALITY_FAST)
+        assert StubPhotoImage.created == 2
+        assert stub_canvas.canvas.created == 1
+        assert stub_canvas.canvas.configured == 1
@@ -4,7 +4,20 @@
 
 import unittest
 
-from utils import format_time, generate_output_filename, get_frame_range_limits
+import numpy as np
+
+from utils import (
+    align_crop_yuv420,
+    crop_yuv420,
+    format_time,
+    generate_output_filename,
+    get_frame_range_limits,
+    invert_ranges,
+    keep_ranges_to_trim,
+    merge_ranges,
+    split_every,
+    trim_ranges,
+)
 
 
 class TestUtils(unittest.TestCase):
@@ -52,6 +65,61 @@ class TestUtils(unittest.TestCase):
         filename = generate_output_filename("/path/to/video.mp4", 800, 600, True, 30, 300)
         self.assertEqual(filename, "video_crop_800x600_trim_30-300.mp4")
 
+    def test_crop_yuv420(self):
+        """裁切起点对齐到偶数，色度平面按一半的位置和尺寸裁切"""
+        crop = align_crop_yuv420({"x": 5, "y": 3, "width": 8, "height": 4})
+        self.assertEqual(crop, {"x": 4, "y": 2, "width": 8, "height": 4})
+        self.assertIsNone(align_crop_yuv420({"x": 0, "y": 0, "width": 0, "height": 0}))
+
+        luma = np.arange(16 * 32, dtype=np.uint8).reshape(16, 32)
+        chroma = np.arange(8 * 16, dtype=np.uint8).reshape(8, 16)
+        (y, u, v), in_bounds = crop_yuv420((luma, chroma, chroma), crop)
+        self.assertTrue(in_bounds)
+        self.assertEqual(y.shape, (4, 8))
+        self.assertEqual(u.shape, (2, 4))
+        self.assertEqual(y[0, 0], luma[2, 4])
+        self.assertEqual(v[0, 0], chroma[1, 2])
+
+        # 超出范围时返回同尺寸的黑色帧
+        outside = dict(crop, x=30)
+        (y, u, v), in_bounds = crop_yuv420((luma, chroma, chroma), outside)
+        self.assertFalse(in_bounds)
+        self.assertEqual((y.shape, u.shape), ((4, 8), (2, 4)))
+        self.assertEqual((int(y[0, 0]), int(u[0, 0])), (16, 128))
+
+    def test_merge_ranges(self):
+        """重叠和相邻的范围合并，结果按起始帧排序"""
+        self.assertEqual(merge_ranges([(50, 60), (0, 10), (5, 20), (21, 30)]), [(0, 30), (50, 60)])
+        self.assertEqual(merge_ranges([]), [])
+
+    def test_split_every(self):
+        """按固定时长切分，最后一段可以较短"""
+        clips = split_every(70, 30.0, 1)
+        self.assertEqual(
+            clips,
+            [
+                {"start_frame": 0, "end_frame": 29},
+                {"start_frame": 30, "end_frame": 59},
+                {"start_frame": 60, "end_frame": 69},
+            ],
+        )
+        with self.assertRaises(ValueError):
+            split_every(70, 30.0, 0)
+
+    def test_keep_ranges(self):
+        """保留范围列表与时间裁切参数互相转换，删除范围取反得到保留范围"""
+        trim_params = keep_ranges_to_trim([(200, 299), (0, 99)])
+        self.assertEqual(trim_params["start_frame"], 0)
+        self.assertEqual(trim_params["end_frame"], 299)
+        self.assertEqual(trim_ranges(trim_params), [(0, 99), (200, 299)])
+        self.assertEqual(trim_ranges({"start_frame": 5, "end_frame": 9}), [(5, 9)])
+        self.assertNotIn("ranges", keep_ranges_to_trim([(5, 9)]))
+        with self.assertRaises(ValueError):
+            keep_ranges_to_trim([])
+
+        self.assertEqual(invert_ranges([(10, 19), (50, 99)], 100), [(0, 9), (20, 49)])
+        self.assertEqual(invert_ranges([(0, 9)], 20), [(10, 19)])
+
 
 if __name__ == "__main__":
     unittest.main()
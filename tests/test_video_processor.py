@@ -0,0 +1,486 @@
+"""
+视频处理器测试
+"""
+
+import shutil
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import video_processor
+from encoders import EncoderError
+from video_processor import (
+    CallbackManager,
+    DecoderPool,
+    DirectCallbackManager,
+    FrameCache,
+    VideoProcessor,
+)
+
+
+class DummyCallbackManager:
+    """记录回调调用的简单回调管理器"""
+
+    def __init__(self):
+        self.events = []
+
+    def on_progress(self, processed, total):
+        self.events.append(("progress", processed, total))
+
+    def on_complete(self, output_path):
+        self.events.append(("complete", output_path))
+
+    def on_error(self, error_msg):
+        self.events.append(("error", error_msg))
+
+    def on_warning(self, warning_msg):
+        self.events.append(("warning", warning_msg))
+
+    def on_frame_warning(self, message, first_frame, last_frame=None, count=1):
+        self.events.append(("frame_warning", message, first_frame, last_frame, count))
+
+
+def read_frames(video_path):
+    """读取视频的所有帧"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def make_frame(value, size=(48, 64)):
+    """生成纯色测试帧"""
+    return np.full((size[0], size[1], 3), value, dtype=np.uint8)
+
+
+class TestFrameCache:
+    def test_lru_eviction_by_bytes(self):
+        """超出字节上限时淘汰最久未使用的帧"""
+        frame_bytes = make_frame(0).nbytes
+        cache = FrameCache(max_bytes=frame_bytes * 2)
+
+        cache.put(0, make_frame(0))
+        cache.put(1, make_frame(1))
+        assert cache.get(0) is not None  # 0 变为最近使用
+        cache.put(2, make_frame(2))
+
+        assert 0 in cache
+        assert 1 not in cache
+        assert 2 in cache
+        assert cache.current_bytes == frame_bytes * 2
+
+    def test_hit_miss_counters(self):
+        """命中和未命中计数"""
+        cache = FrameCache(max_bytes=10 * 1024 * 1024)
+        cache.put(5, make_frame(5))
+
+        assert cache.get(5) is not None
+        assert cache.get(6) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_oversized_frame_not_cached(self):
+        """单帧超过上限时不缓存"""
+        cache = FrameCache(max_bytes=10)
+        cache.put(0, make_frame(0))
+        assert len(cache) == 0
+
+
+class TestVideoProcessor:
+    def test_get_frame_uses_cache(self, sample_video_path):
+        """重复获取同一帧时命中缓存"""
+        processor = VideoProcessor(DummyCallbackManager())
+        success, _ = processor.load_video(sample_video_path)
+        assert success
+
+        first = processor.get_frame(10)
+        second = processor.get_frame(10)
+
+        assert first is second
+        stats = processor.get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        processor.release()
+
+    def test_sequential_reads_do_not_seek(self, sample_video_path):
+        """顺序读取和短距离向前跳转不触发seek，向后跳转才seek"""
+        processor = VideoProcessor(DummyCallbackManager(), cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+
+        for frame_number in range(5):
+            assert processor.get_frame(frame_number) is not None
+        assert processor.seek_count == 0
+
+        # 短距离向前跳转使用grab()
+        frame = processor.get_frame(12)
+        assert processor.seek_count == 0
+        assert abs(float(frame.mean()) - 12 * 4) < 4
+
+        # 向后跳转需要seek
+        frame = processor.get_frame(3)
+        assert processor.seek_count == 1
+        assert abs(float(frame.mean()) - 3 * 4) < 4
+        processor.release()
+
+    def test_random_access_long_gop(self, long_gop_video_path, frame_marker):
+        """长GOP视频中向前、向后、同一GOP内和跨GOP的跳转都得到精确的帧"""
+        processor = VideoProcessor(DummyCallbackManager(), cache_max_bytes=0)
+        processor.load_video(long_gop_video_path)
+        assert processor.keyframe_index.wait()
+
+        for frame_number in (50, 13, 14, 20, 89, 0, 47, 46, 25, 61, 60, 35, 36, 5, 80):
+            assert frame_marker(processor.get_frame(frame_number)) == frame_number
+        processor.release()
+
+    def test_reload_waits_for_in_flight_decode(self, sample_video_path):
+        """重新加载等待拖动预览正在进行的解码结束，旧的读取不会落在新句柄上"""
+        processor = VideoProcessor(DirectCallbackManager(), cache_max_bytes=10**8)
+        processor.load_video(sample_video_path)
+        entered = threading.Event()
+        proceed = threading.Event()
+
+        class BlockingCapture:
+            """第一次read()时等待，模拟耗时的解码"""
+
+            def __init__(self, cap):
+                self.cap = cap
+
+            def read(self):
+                entered.set()
+                proceed.wait(5)
+                return self.cap.read()
+
+            def __getattr__(self, name):
+                return getattr(self.cap, name)
+
+        processor.cap = BlockingCapture(processor.cap)
+        scrub = threading.Thread(target=processor.get_frame, args=(40,))
+        scrub.start()
+        assert entered.wait(5)
+
+        reload = threading.Thread(target=processor.load_video, args=(sample_video_path,))
+        reload.start()
+        reload.join(0.2)
+        assert reload.is_alive()  # 解码结束前不替换句柄
+
+        proceed.set()
+        scrub.join(5)
+        reload.join(5)
+        assert not reload.is_alive()
+
+        # 新加载的视频从第0帧开始，缓存中没有旧句柄读出的帧
+        assert processor._decoder_pos == 0
+        assert len(processor.frame_cache) == 0
+        for frame_number in (40, 41, 0):
+            frame = processor.get_frame(frame_number)
+            assert abs(float(np.mean(frame)) - frame_number * 4) < 8
+        processor.release()
+
+    def test_copy_trim_falls_back_without_ffmpeg(self, sample_video_path, tmp_path, monkeypatch):
+        """未安装ffmpeg时仅时间剪辑回退到重新编码"""
+        monkeypatch.setattr("video_processor.find_ffmpeg", lambda: None)
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks)
+        processor.load_video(sample_video_path)
+
+        output_path = str(tmp_path / "trim.mp4")
+        processor._process_video_thread(
+            output_path, None, {"start_frame": 10, "end_frame": 29}, "copy"
+        )
+
+        assert callbacks.events[-1] == ("complete", output_path)
+        cap = cv2.VideoCapture(output_path)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 20
+        cap.release()
+        processor.release()
+
+    def test_multi_export_reports_final_progress(self, sample_video_path, tmp_path):
+        """多路输出导出的最后一次进度为 (总帧数, 总帧数)"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+        processor.encoder_params = {"backend": "opencv"}
+
+        targets = [
+            ({"x": 0, "y": 0, "width": 32, "height": 24}, str(tmp_path / "a.mp4")),
+            ({"x": 32, "y": 24, "width": 32, "height": 24}, str(tmp_path / "b.mp4")),
+        ]
+        with processor.decoder_pool.decoder() as cap:
+            processor._export_multi(targets, None, cap, processor.encoder_params)
+        processor.release()
+
+        progress = [event for event in callbacks.events if event[0] == "progress"]
+        assert progress[-1] == ("progress", 60, 60)
+        assert callbacks.events[-1] == ("complete", [path for _, path in targets])
+
+    def test_keep_ranges_export_long_gop(self, long_gop_video_path, tmp_path, frame_marker):
+        """长GOP视频的保留范围：同一GOP内的间隔grab()跳过，较远的间隔seek到关键帧"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(long_gop_video_path)
+        assert processor.keyframe_index.wait()
+        processor.encoder_params = {"backend": "opencv"}
+
+        output_path = str(tmp_path / "keep.mp4")
+        ranges = [(5, 14), (20, 21), (50, 70)]
+        trim_params = {"start_frame": 5, "end_frame": 70, "ranges": ranges}
+        processor._process_video_thread(output_path, None, trim_params)
+        processor.release()
+
+        assert callbacks.events[-1] == ("complete", output_path)
+        expected = [n for start, end in ranges for n in range(start, end + 1)]
+        assert [frame_marker(frame) for frame in read_frames(output_path)] == expected
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="未安装ffmpeg")
+    def test_yuv_native_export(self, sample_video_path, tmp_path):
+        """YUV420原生导出的帧数、尺寸和内容与BGR导出一致"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+        processor.encoder_params = {"backend": "ffmpeg", "preset": "ultrafast"}
+
+        output_path = str(tmp_path / "yuv.mp4")
+        crop_params = {"x": 8, "y": 8, "width": 32, "height": 24}
+        assert processor._yuv_export(output_path, crop_params, {"start_frame": 10, "end_frame": 29})
+        processor.release()
+
+        assert callbacks.events[-1] == ("complete", output_path)
+        cap = cv2.VideoCapture(output_path)
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        assert len(frames) == 20
+        assert frames[0].shape == (24, 32, 3)
+        assert abs(float(np.mean(frames[0])) - 10 * 4) < 8
+
+    def test_split_export_single_pass(self, sample_video_path, tmp_path):
+        """一次顺序读取导出多个片段，重叠的片段共用解码的帧"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+        processor.encoder_params = {"backend": "opencv"}
+
+        paths = [str(tmp_path / f"clip{i}.mp4") for i in range(3)]
+        clips = [
+            ({"start_frame": 40, "end_frame": 49}, paths[2]),
+            ({"start_frame": 5, "end_frame": 14}, paths[0]),
+            ({"start_frame": 10, "end_frame": 19}, paths[1]),
+        ]
+        processor._process_split_thread(clips, {"x": 8, "y": 8, "width": 32, "height": 24})
+        processor.release()
+
+        assert callbacks.events[-1] == ("complete", [paths[2], paths[0], paths[1]])
+        # 只处理落在片段内的帧（5~19和40~49）
+        progress = [event for event in callbacks.events if event[0] == "progress"]
+        assert progress[-1] == ("progress", 25, 25)
+        for path, first in zip(paths, [5, 10, 40]):
+            cap = cv2.VideoCapture(path)
+            ret, frame = cap.read()
+            assert ret and frame.shape == (24, 32, 3)
+            assert abs(float(np.mean(frame)) - first * 4) < 8
+            assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+            cap.release()
+
+    def test_split_export_long_gop(self, long_gop_video_path, tmp_path, frame_marker):
+        """长GOP视频按片段切分时，每个片段的帧精确对应其范围"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(long_gop_video_path)
+        assert processor.keyframe_index.wait()
+        processor.encoder_params = {"backend": "opencv"}
+
+        paths = [str(tmp_path / f"clip{i}.mp4") for i in range(3)]
+        clips = [
+            ({"start_frame": 5, "end_frame": 30}, paths[0]),
+            ({"start_frame": 40, "end_frame": 89, "ranges": [(40, 45), (80, 89)]}, paths[1]),
+            ({"start_frame": 25, "end_frame": 27}, paths[2]),
+        ]
+        processor._process_split_thread(clips, None)
+        processor.release()
+
+        assert callbacks.events[-1] == ("complete", paths)
+        expected = [
+            list(range(5, 31)),
+            list(range(40, 46)) + list(range(80, 90)),
+            [25, 26, 27],
+        ]
+        for path, frames in zip(paths, expected):
+            assert [frame_marker(frame) for frame in read_frames(path)] == frames
+
+    def test_split_export_closes_every_encoder(self, sample_video_path, monkeypatch):
+        """一个片段关闭失败时仍关闭其余片段；意外异常时放弃所有仍在写入的片段"""
+        encoders = []
+
+        class FakeEncoder:
+            """记录关闭和放弃的编码器，a.mp4关闭时失败"""
+
+            def __init__(self, output_path, *args):
+                self.output_path = output_path
+                self.state = "open"
+                encoders.append(self)
+
+            def write(self, frame):
+                pass
+
+            def close(self):
+                self.state = "closed"
+                if self.output_path == "a.mp4":
+                    raise EncoderError("编码失败")
+
+            def abort(self):
+                self.state = "aborted"
+
+        monkeypatch.setattr(video_processor, "create_encoder", FakeEncoder)
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+        processor.encoder_params = {"backend": "opencv"}
+
+        # 两个片段都超出视频末尾，在读取结束后才关闭
+        clips = [
+            ({"start_frame": 50, "end_frame": 99}, "a.mp4"),
+            ({"start_frame": 55, "end_frame": 99}, "b.mp4"),
+        ]
+        processor._process_split_thread(clips, None)
+        assert [encoder.state for encoder in encoders] == ["closed", "closed"]
+        assert callbacks.events[-1] == ("error", "编码失败")
+
+        class FailingPipeline(video_processor.ExportPipeline):
+            """写入几帧后抛出PipelineError以外的异常"""
+
+            def run(self):
+                for frame_number, frame in self.read_frames():
+                    self.write_frame(frame_number, frame)
+                    if frame_number >= 56:
+                        raise RuntimeError("意外错误")
+
+        encoders.clear()
+        monkeypatch.setattr(video_processor, "ExportPipeline", FailingPipeline)
+        processor._process_split_thread(clips, None)
+        processor.release()
+        assert [encoder.state for encoder in encoders] == ["aborted", "aborted"]
+        assert callbacks.events[-1] == ("error", "意外错误")
+
+    def test_keep_ranges_export(self, sample_video_path, tmp_path):
+        """多个保留范围按顺序拼接为一个输出，跳过范围之间的帧"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+        processor.encoder_params = {"backend": "opencv"}
+
+        output_path = str(tmp_path / "keep.mp4")
+        trim_params = {"start_frame": 5, "end_frame": 54, "ranges": [(5, 14), (45, 54)]}
+        processor._process_video_thread(output_path, None, trim_params)
+        processor.release()
+
+        assert callbacks.events[-1] == ("complete", output_path)
+        cap = cv2.VideoCapture(output_path)
+        frames = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        assert len(frames) == 20
+        assert abs(float(np.mean(frames[0])) - 5 * 4) < 8
+        assert abs(float(np.mean(frames[10])) - 45 * 4) < 8
+
+
+class TestDecoderPool:
+    def test_limits_open_handles(self, sample_video_path):
+        """达到句柄上限时获取超时，归还后可以复用"""
+        pool = DecoderPool(sample_video_path, max_handles=2)
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is not second
+
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+
+        pool.release(first)
+        assert pool.acquire(timeout=0.01) is first
+        assert pool.open_count == 2
+        pool.close()
+
+    def test_export_does_not_disturb_preview(self, sample_video_path, tmp_path):
+        """导出使用独立句柄，不改变预览解码器的位置"""
+        callbacks = DummyCallbackManager()
+        processor = VideoProcessor(callbacks, cache_max_bytes=0)
+        processor.load_video(sample_video_path)
+        processor.get_frame(5)
+        seeks_before = processor.seek_count
+
+        output_path = str(tmp_path / "out.mp4")
+        processor._process_video_thread(
+            output_path, {"x": 8, "y": 8, "width": 32, "height": 24}, None
+        )
+
+        assert callbacks.events[-1] == ("complete", output_path)
+        assert processor.get_frame(6) is not None
+        assert processor.seek_count == seeks_before
+        processor.release()
+
+
+class TestCallbackManager:
+    def make_manager(self):
+        """创建不启动Tk定时器的回调管理器，并记录分发的事件"""
+        manager = CallbackManager(None)
+        events = []
+        manager.set_callbacks(
+            progress_cb=lambda processed, total: events.append(("progress", processed, total)),
+            complete_cb=lambda path: events.append(("complete", path)),
+            error_cb=lambda message: events.append(("error", message)),
+            warning_cb=lambda message: events.append(("warning", message)),
+        )
+        return manager, events
+
+    def test_events_wait_for_ui_thread(self):
+        """处理线程只入队，UI线程处理时才调用回调，连续进度只保留最新值"""
+        manager, events = self.make_manager()
+        manager._post("progress", 1, 100)
+        manager._post("progress", 2, 100)
+        manager.on_complete("out.mp4")
+        assert events == []
+
+        manager.process_events()
+        assert events == [("progress", 2, 100), ("complete", "out.mp4")]
+
+    def test_progress_throttled_by_time(self):
+        """短时间内的大量进度只报告一次，结束时补发最后的进度"""
+        manager, events = self.make_manager()
+        for processed in range(1, 100):
+            manager.on_progress(processed, 100)
+        manager.on_complete("out.mp4")
+        manager.process_events()
+
+        assert events == [("progress", 99, 100), ("complete", "out.mp4")]
+        assert manager.events.empty()
+
+    def test_frame_warnings_are_merged(self):
+        """逐帧警告首次出现时报告一次，结束时报告帧范围和总数"""
+        manager, events = self.make_manager()
+        for frame_number in range(120, 4501):
+            manager.on_frame_warning("裁切区域超出范围", frame_number)
+        manager.on_complete("out.mp4")
+        manager.process_events()
+
+        assert events == [
+            ("warning", "帧 120 裁切区域超出范围！"),
+            ("warning", "帧 120–4500 裁切区域超出范围（共 4381 帧）"),
+            ("complete", "out.mp4"),
+        ]
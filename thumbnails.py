@@ -0,0 +1,255 @@
+"""
+缩略图模块
+在后台线程中为时间轴胶片条生成缩略图，先粗后细逐步加密
+"""
+
+import bisect
+import threading
+
+import cv2
+
+from config import SEQUENTIAL_GRAB_LIMIT, THUMBNAIL_HEIGHT, THUMBNAIL_REFINE_LEVELS
+
+
+def sample_positions(first_frame, last_frame, count, level):
+    """
+    计算某一加密层级新增的采样帧号
+
+    第level层共有 count * 2**level 个等间距采样点，其中偶数位置与上一层重合，
+    因此第0层返回全部采样点，之后每层只返回新增的奇数位置。
+
+    Args:
+        first_frame: 范围起始帧（包含）
+        last_frame: 范围结束帧（包含）
+        count: 第0层的采样点数
+        level: 加密层级
+
+    Returns:
+        升序、去重的帧号列表
+    """
+    span = last_frame - first_frame + 1
+    total = min(count * 2**level, span)
+    step = 1 if level == 0 else 2
+    start = 0 if level == 0 else 1
+    positions = {first_frame + i * span // total for i in range(start, total, step)}
+    return sorted(positions)
+
+
+class ThumbnailGenerator:
+    """
+    缩略图生成器
+
+    使用独立的解码器（优先从解码器池借用），不占用预览解码器。采样点距离前一个关键帧足够近时改用该关键帧
+    （seek后第一帧即可得到），相邻采样点较近时用grab()向前推进而不是seek。
+    先生成粗略的一层覆盖整个范围，再逐层加密；已生成的缩略图保存到磁盘缓存。
+    """
+
+    def __init__(
+        self,
+        video_path,
+        total_frames,
+        keyframe_index=None,
+        height=THUMBNAIL_HEIGHT,
+        disk_cache=None,
+        cache_key=None,
+        levels=THUMBNAIL_REFINE_LEVELS,
+        decoder_pool=None,
+    ):
+        """
+        初始化缩略图生成器
+
+        Args:
+            video_path: 用于解码的文件路径（可以是代理文件）
+            total_frames: 总帧数
+            keyframe_index: 关键帧索引，None表示任意帧都可直接seek（如全帧内编码的代理文件）
+            height: 缩略图高度（像素）
+            disk_cache: 磁盘缓存，None表示不缓存
+            cache_key: 源视频在磁盘缓存中的键
+            levels: 第0层之后最多加密的层数
+            decoder_pool: 解码器池，提供时从池中借用解码器（遵守句柄上限），否则自行打开
+        """
+        self.video_path = video_path
+        self.total_frames = total_frames
+        self.keyframe_index = keyframe_index
+        self.height = height
+        self.disk_cache = disk_cache if cache_key else None
+        self.cache_key = cache_key
+        self.levels = levels
+        self.decoder_pool = decoder_pool
+
+        self.version = 0  # 每生成一张缩略图加一，UI据此判断是否需要重绘
+        self.error = None
+        self._frames = []  # 已生成缩略图的帧号（升序）
+        self._images = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._complete = False
+        self._thread = None
+
+    def start(self, count, first_frame=0, last_frame=None):
+        """
+        在后台线程中开始生成
+
+        Args:
+            count: 第0层的缩略图数量（通常为胶片条可容纳的格数）
+            first_frame: 范围起始帧
+            last_frame: 范围结束帧，默认为最后一帧
+        """
+        if last_frame is None:
+            last_frame = self.total_frames - 1
+        self._thread = threading.Thread(
+            target=self.build, args=(count, first_frame, last_frame), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止生成"""
+        self._stopped = True
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    @property
+    def is_complete(self):
+        """所有层级是否已生成完成"""
+        return self._complete
+
+    def nearest(self, frame_number):
+        """
+        获取离指定帧最近的已生成缩略图
+
+        Returns:
+            (帧号, BGR缩略图)，尚无缩略图时返回None
+        """
+        with self._lock:
+            if not self._frames:
+                return None
+            i = bisect.bisect_left(self._frames, frame_number)
+            candidates = self._frames[max(0, i - 1) : i + 1]
+            best = min(candidates, key=lambda n: abs(n - frame_number))
+            return best, self._images[best]
+
+    def thumbnails(self):
+        """已生成的全部缩略图 [(帧号, BGR缩略图), ...]，按帧号升序"""
+        with self._lock:
+            return [(n, self._images[n]) for n in self._frames]
+
+    def build(self, count, first_frame, last_frame):
+        """在当前线程中生成缩略图"""
+        if last_frame < first_frame or count <= 0:
+            self._complete = True
+            return
+
+        cap = None  # 全部命中磁盘缓存时不打开解码器
+        try:
+            position = None  # 解码器下一次read()将返回的帧号
+            span = last_frame - first_frame + 1
+            for level in range(self.levels + 1):
+                spacing = max(1, span // (count * 2**level))
+                for target in sample_positions(first_frame, last_frame, count, level):
+                    if self._stopped:
+                        return
+                    frame_number = self._snap_to_keyframe(target, spacing)
+                    if frame_number in self._images:
+                        continue
+                    image = self._cached_thumbnail(frame_number)
+                    if image is None:
+                        if cap is None:
+                            cap = self._open_decoder()
+                            if cap is None:
+                                return
+                        position, image = self._decode_thumbnail(cap, position, frame_number)
+                        if image is None:
+                            continue
+                    self._add(frame_number, image)
+                if spacing == 1:
+                    break
+            self._complete = True
+        except Exception as e:
+            self.error = e
+        finally:
+            if cap is not None:
+                self._close_decoder(cap)
+
+    def _open_decoder(self):
+        """
+        获取解码器；从解码器池借用时等待其他使用者归还句柄
+
+        Returns:
+            cv2.VideoCapture对象，等待期间被停止时返回None
+        """
+        if self.decoder_pool is None:
+            cap = cv2.VideoCapture(self.video_path)
+            if not cap.isOpened():
+                cap.release()
+                raise IOError("无法打开视频文件")
+            return cap
+
+        # 句柄已达上限时分段等待，以便及时响应stop()
+        while not self._stopped:
+            try:
+                return self.decoder_pool.acquire(timeout=0.2)
+            except TimeoutError:
+                continue
+        return None
+
+    def _close_decoder(self, cap):
+        """归还或关闭解码器"""
+        if self.decoder_pool is not None:
+            self.decoder_pool.release(cap)
+        else:
+            cap.release()
+
+    def _snap_to_keyframe(self, target, spacing):
+        """采样点距离前一个关键帧不超过半个采样间距时改用该关键帧"""
+        if self.keyframe_index is None:
+            return target
+        keyframe = self.keyframe_index.keyframe_before(target)
+        if keyframe is not None and target - keyframe <= spacing // 2:
+            return keyframe
+        return target
+
+    def _cached_thumbnail(self, frame_number):
+        """从磁盘缓存读取缩略图"""
+        if self.disk_cache is None:
+            return None
+        return self.disk_cache.get_thumbnail(self.cache_key, frame_number, self.height)
+
+    def _decode_thumbnail(self, cap, position, frame_number):
+        """
+        解码指定帧并缩小为缩略图
+
+        Returns:
+            (解码器的新位置, 缩略图)，解码失败时缩略图为None
+        """
+        keyframe = (
+            self.keyframe_index.keyframe_before(frame_number) if self.keyframe_index else None
+        )
+        forward = position is not None and position <= frame_number
+        same_gop = forward and keyframe is not None and keyframe <= position
+        if not (forward and (same_gop or frame_number - position <= SEQUENTIAL_GRAB_LIMIT)):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            position = frame_number
+
+        # 中间帧只grab()，不做颜色转换
+        while position < frame_number:
+            if not cap.grab():
+                return None, None
+            position += 1
+
+        success, frame = cap.read()
+        if not success:
+            return None, None
+
+        height, width = frame.shape[:2]
+        size = (max(1, int(round(width * self.height / height))), self.height)
+        image = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if self.disk_cache is not None:
+            self.disk_cache.put_thumbnail(self.cache_key, frame_number, image)
+        return position + 1, image
+
+    def _add(self, frame_number, image):
+        """保存生成的缩略图"""
+        with self._lock:
+            bisect.insort(self._frames, frame_number)
+            self._images[frame_number] = image
+            self.version += 1
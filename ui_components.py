@@ -8,7 +8,12 @@ import tkinter as tk
 import cv2
 from PIL import Image, ImageTk
 
-from utils import get_frame_range_limits
+from config import PLAYBACK_SPEEDS, THUMBNAIL_HEIGHT
+from utils import format_time, get_frame_range_limits
+
+# 显示质量：拖动/播放时使用快速缩放，暂停时使用高质量缩放
+QUALITY_FAST = "fast"
+QUALITY_HIGH = "high"
 
 
 class VideoControlPanel:
@@ -65,6 +70,12 @@ class VideoControlPanel:
             command=self._on_frame_change,
         )
         self.frame_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        # 拖动开始/结束事件，用于切换快速/高质量显示
+        self.frame_slider.bind("<ButtonPress-1>", self._on_scrub_start)
+        self.frame_slider.bind("<ButtonRelease-1>", self._on_scrub_end)
+
+        # 时间轴胶片条
+        self.filmstrip = Filmstrip(preview_frame)
 
         # 第二行：播放控制按钮
         playback_frame = tk.Frame(preview_frame, bg=self.bg_color)
@@ -86,6 +97,18 @@ class VideoControlPanel:
         )
         self.next_frame_btn.pack(side=tk.LEFT, padx=2)
 
+        # 播放速度
+        tk.Label(playback_frame, text="速度:", bg=self.bg_color).pack(side=tk.LEFT, padx=(8, 2))
+        self.speed_var = tk.StringVar(value=self._format_speed(1.0))
+        self.speed_menu = tk.OptionMenu(
+            playback_frame,
+            self.speed_var,
+            *[self._format_speed(speed) for speed in PLAYBACK_SPEEDS],
+            command=self._on_speed_change,
+        )
+        self.speed_menu.config(width=5)
+        self.speed_menu.pack(side=tk.LEFT, padx=2)
+
         # 设置起始/结束帧按钮
         tk.Label(playback_frame, text=" | ", bg=self.bg_color).pack(side=tk.LEFT, padx=5)
 
@@ -146,6 +169,24 @@ class VideoControlPanel:
         )
         self.end_frame_slider.pack(side=tk.LEFT, padx=5)
 
+        # 保留范围列表：可添加多个范围，导出时按顺序拼接为一个文件
+        range_frame = tk.Frame(self.control_frame, bg=self.bg_color)
+        range_frame.pack(fill=tk.X, pady=(0, 5))
+
+        tk.Label(range_frame, text="保留范围:", bg=self.bg_color).pack(side=tk.LEFT)
+        self.range_listbox = tk.Listbox(range_frame, height=3, width=48, exportselection=False)
+        self.range_listbox.pack(side=tk.LEFT, padx=5)
+
+        self.add_range_btn = tk.Button(
+            range_frame, text="添加范围", command=self._add_range, state=tk.DISABLED, width=10
+        )
+        self.add_range_btn.pack(side=tk.LEFT, padx=5)
+
+        self.remove_range_btn = tk.Button(
+            range_frame, text="删除范围", command=self._remove_range, state=tk.DISABLED, width=10
+        )
+        self.remove_range_btn.pack(side=tk.LEFT, padx=5)
+
     def _create_time_info(self):
         """创建时间信息显示"""
         time_info_frame = tk.Frame(self.control_frame, bg=self.bg_color)
@@ -203,11 +244,46 @@ class VideoControlPanel:
         if "frame_change" in self.callbacks:
             self.callbacks["frame_change"](value)
 
+    def _on_scrub_start(self, event):
+        """开始拖动预览帧滑块"""
+        if "scrub_start" in self.callbacks:
+            self.callbacks["scrub_start"]()
+
+    def _on_scrub_end(self, event):
+        """结束拖动预览帧滑块"""
+        if "scrub_end" in self.callbacks:
+            self.callbacks["scrub_end"]()
+
+    @staticmethod
+    def _format_speed(speed):
+        """格式化播放速度选项"""
+        return f"{speed:g}x"
+
+    def _on_speed_change(self, value):
+        """播放速度变化回调"""
+        if "speed_change" in self.callbacks:
+            self.callbacks["speed_change"](self.get_playback_speed())
+
+    def get_playback_speed(self):
+        """获取选择的播放速度（倍速）"""
+        return float(self.speed_var.get().rstrip("x"))
+
     def _toggle_trim(self):
         """切换时间裁切"""
         if "toggle_trim" in self.callbacks:
             self.callbacks["toggle_trim"]()
 
+    def _add_range(self):
+        """把开始帧到结束帧添加为保留范围"""
+        if "add_range" in self.callbacks:
+            self.callbacks["add_range"]()
+
+    def _remove_range(self):
+        """删除选中的保留范围"""
+        selection = self.range_listbox.curselection()
+        if selection and "remove_range" in self.callbacks:
+            self.callbacks["remove_range"](selection[0])
+
     def _on_start_frame_change(self, value):
         """开始帧变化回调"""
         if "start_frame_change" in self.callbacks:
@@ -302,6 +378,28 @@ class VideoControlPanel:
         state = tk.NORMAL if enabled else tk.DISABLED
         self.start_frame_slider.config(state=state)
         self.end_frame_slider.config(state=state)
+        self.add_range_btn.config(state=state)
+        self.remove_range_btn.config(state=state)
+        self.range_listbox.config(state=state)
+
+    def set_keep_ranges(self, ranges, fps):
+        """
+        显示保留范围列表
+
+        Args:
+            ranges: [(起始帧, 结束帧), ...]
+            fps: 帧率，用于显示时间
+        """
+        state = self.range_listbox.cget("state")
+        self.range_listbox.config(state=tk.NORMAL)
+        self.range_listbox.delete(0, tk.END)
+        for start_frame, end_frame in ranges:
+            start_time = format_time(start_frame / fps) if fps > 0 else "--"
+            end_time = format_time((end_frame + 1) / fps) if fps > 0 else "--"
+            self.range_listbox.insert(
+                tk.END, f"帧 {start_frame} - {end_frame}  ({start_time} - {end_time})"
+            )
+        self.range_listbox.config(state=state)
 
     def update_crop_info(self, x, y, width, height):
         """更新裁切信息显示"""
@@ -351,6 +449,170 @@ class VideoControlPanel:
         self.frame_slider.config(command=current_command)
 
 
+class Filmstrip:
+    """
+    时间轴胶片条
+
+    在预览帧滑块下方按时间均匀排列缩略图，缩略图由后台的ThumbnailGenerator生成，
+    每格显示离该格中心最近的已生成缩略图。鼠标悬停时显示放大的缩略图，点击跳转到该位置。
+    """
+
+    def __init__(self, parent, height=THUMBNAIL_HEIGHT):
+        """
+        初始化胶片条
+
+        Args:
+            parent: 父级窗口组件
+            height: 缩略图高度（像素）
+        """
+        self.height = height
+        self.callbacks = {}
+        self.generator = None
+        self.first_frame = 0
+        self.last_frame = 0
+        self.aspect = 16 / 9
+        self._drawn_version = -1
+        # 每格 [帧号, PhotoImage, 画布图像项]，None表示该格尚无缩略图；保存引用防止被垃圾回收
+        self._tiles = []
+        self._layout = None  # 绘制各格时的 (格数, 画布宽度, 格宽)
+
+        self.canvas = tk.Canvas(parent, height=height, bg="black", highlightthickness=0)
+        self.canvas.pack(fill=tk.X, padx=(60, 10), pady=(0, 2))
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", self._hide_tooltip)
+        self.canvas.bind("<ButtonPress-1>", self._on_click)
+
+        # 悬停时显示的放大缩略图
+        self.tooltip = tk.Toplevel(parent)
+        self.tooltip.withdraw()
+        self.tooltip.overrideredirect(True)
+        self.tooltip_label = tk.Label(self.tooltip, bg="black", fg="white", compound=tk.TOP)
+        self.tooltip_label.pack()
+        self._tooltip_photo = None
+
+    def set_callback(self, event_name, callback):
+        """设置回调函数"""
+        self.callbacks[event_name] = callback
+
+    def set_generator(self, generator, first_frame, last_frame, aspect):
+        """
+        设置缩略图来源和显示的帧范围
+
+        Args:
+            generator: ThumbnailGenerator，None表示清空
+            first_frame: 胶片条起始帧
+            last_frame: 胶片条结束帧
+            aspect: 视频宽高比
+        """
+        self.generator = generator
+        self.first_frame = first_frame
+        self.last_frame = max(first_frame, last_frame)
+        self.aspect = aspect
+        self._clear()
+        self.refresh(force=True)
+
+    @property
+    def slot_width(self):
+        """每格缩略图的宽度"""
+        return max(1, int(round(self.height * self.aspect)))
+
+    def slot_count(self):
+        """当前宽度可容纳的格数"""
+        return max(1, self.canvas.winfo_width() // self.slot_width)
+
+    def frame_at(self, x):
+        """胶片条上横坐标对应的帧号"""
+        width = max(1, self.canvas.winfo_width())
+        span = self.last_frame - self.first_frame + 1
+        offset = int(max(0, min(x, width - 1)) / width * span)
+        return min(self.last_frame, self.first_frame + offset)
+
+    def refresh(self, force=False):
+        """
+        有新的缩略图时重绘
+
+        只更新显示的缩略图发生变化的格：尺寸不变时原地更新Tk图像的像素，
+        格数或尺寸变化时才重建所有格。
+        """
+        generator = self.generator
+        if generator is None:
+            self._clear()
+            return
+        if not force and generator.version == self._drawn_version:
+            return
+        self._drawn_version = generator.version
+
+        slot_width = self.slot_width
+        slots = self.slot_count()
+        width = max(1, self.canvas.winfo_width())
+        layout = (slots, width, slot_width)
+        if layout != self._layout:
+            self._clear()
+            self._layout = layout
+            self._tiles = [None] * slots
+
+        for i in range(slots):
+            x = i * width / slots
+            item = generator.nearest(self.frame_at(x + width / slots / 2))
+            if item is None:
+                continue
+            frame_number, thumbnail = item
+            tile = self._tiles[i]
+            if tile is not None and tile[0] == frame_number:
+                continue
+
+            image = VideoCanvas.resize_for_display(thumbnail, slot_width, self.height, "fast")
+            if tile is None:
+                photo = ImageTk.PhotoImage(image=image)
+                canvas_item = self.canvas.create_image(int(x), 0, image=photo, anchor=tk.NW)
+                self._tiles[i] = [frame_number, photo, canvas_item]
+            elif (tile[1].width(), tile[1].height()) == image.size:
+                tile[1].paste(image)
+                tile[0] = frame_number
+            else:
+                tile[1] = ImageTk.PhotoImage(image=image)
+                self.canvas.itemconfigure(tile[2], image=tile[1])
+                tile[0] = frame_number
+
+    def _clear(self):
+        """清空所有格"""
+        self.canvas.delete("all")
+        self._tiles = []
+        self._layout = None
+
+    def _on_motion(self, event):
+        """鼠标悬停：显示离光标位置最近的缩略图（不使用预览解码器）"""
+        if self.generator is None:
+            return
+        frame_number = self.frame_at(event.x)
+        item = self.generator.nearest(frame_number)
+        if item is None:
+            self._hide_tooltip()
+            return
+
+        image = item[1]
+        zoom_height = self.height * 3
+        zoom_width = max(1, int(round(image.shape[1] * zoom_height / image.shape[0])))
+        self._tooltip_photo = ImageTk.PhotoImage(
+            image=VideoCanvas.resize_for_display(image, zoom_width, zoom_height, "fast")
+        )
+        self.tooltip_label.config(image=self._tooltip_photo, text=f"第{frame_number + 1}帧")
+        x = event.x_root - zoom_width // 2
+        y = self.canvas.winfo_rooty() - zoom_height - 30
+        self.tooltip.geometry(f"+{x}+{max(0, y)}")
+        self.tooltip.deiconify()
+        self.tooltip.lift()
+
+    def _hide_tooltip(self, event=None):
+        """隐藏悬停缩略图"""
+        self.tooltip.withdraw()
+
+    def _on_click(self, event):
+        """点击跳转到对应帧"""
+        if self.generator is not None and "seek" in self.callbacks:
+            self.callbacks["seek"](self.frame_at(event.x))
+
+
 class VideoCanvas:
     """视频显示画布"""
 
@@ -384,7 +646,17 @@ class VideoCanvas:
         self.scale_x = 1.0
         self.scale_y = 1.0
         self.display_image = None
-        self.current_frame = None
+        self.frame_shape = None  # 当前显示帧的原始尺寸 (高, 宽, 通道)
+        # 源视频尺寸 (宽, 高)；显示代理文件的低分辨率帧时，缩放比例仍按源视频坐标计算
+        self.source_size = None
+
+        # 复用的Tk图像和画布图像项，尺寸不变时原地更新像素，避免每帧重建
+        self.tk_image = None
+        self.image_item = None
+        self.back_button = None
+
+        # 最近一次显示的原始帧 (模式, BGR帧)，窗口大小变化时直接从它重新缩放
+        self.last_source = None
 
     def _start_draw(self, event):
         """开始绘制"""
@@ -405,53 +677,160 @@ class VideoCanvas:
         """设置回调函数"""
         self.callbacks[event_name] = callback
 
-    def show_frame(self, frame):
-        """显示帧图像"""
-        if not hasattr(self, "canvas") or self.canvas.winfo_width() < 10:
-            return False
+    def set_source_size(self, width, height):
+        """设置源视频尺寸，显示的帧分辨率不同时（代理文件）按此换算坐标"""
+        self.source_size = (width, height)
 
-        self.current_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(self.current_frame)
+    def get_canvas_size(self):
+        """获取画布当前尺寸（只能在UI线程中调用）"""
+        return self.canvas.winfo_width(), self.canvas.winfo_height()
 
-        # 调整图像大小以适应画布
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-
-        frame_height, frame_width = frame.shape[:2]
-        img_ratio = frame_width / frame_height
+    @staticmethod
+    def fit_size(image_width, image_height, canvas_width, canvas_height):
+        """计算保持宽高比缩放到画布内的尺寸"""
+        img_ratio = image_width / image_height
         canvas_ratio = canvas_width / canvas_height
 
-        # 计算缩放后的尺寸
         if img_ratio > canvas_ratio:
             new_width = canvas_width
             new_height = int(new_width / img_ratio)
         else:
             new_height = canvas_height
             new_width = int(new_height * img_ratio)
+        return new_width, new_height
+
+    @staticmethod
+    def resize_for_display(image, new_width, new_height, quality=QUALITY_HIGH):
+        """
+        将BGR图像缩放到显示尺寸并转换为PIL RGB图像
+
+        先缩放再转换颜色，颜色转换只作用于小图。快速模式直接用INTER_AREA缩放；
+        高质量模式先用INTER_AREA缩小到目标尺寸的两倍以内，再用LANCZOS完成最后一步，
+        避免在全分辨率图像上运行LANCZOS。
+        """
+        height, width = image.shape[:2]
+        if quality == QUALITY_HIGH:
+            pre_width = min(width, new_width * 2)
+            pre_height = min(height, new_height * 2)
+            if (pre_width, pre_height) != (width, height):
+                image = cv2.resize(image, (pre_width, pre_height), interpolation=cv2.INTER_AREA)
+            pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            if pil_image.size != (new_width, new_height):
+                pil_image = pil_image.resize((new_width, new_height), Image.LANCZOS)
+            return pil_image
+
+        if (new_width, new_height) != (width, height):
+            interpolation = cv2.INTER_AREA if new_width < width else cv2.INTER_LINEAR
+            image = cv2.resize(image, (new_width, new_height), interpolation=interpolation)
+        return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+    def prepare_frame(self, frame, canvas_size, quality=QUALITY_HIGH):
+        """
+        准备用于显示的帧图像
+
+        只做缩放和颜色转换，不访问Tk对象，可以在后台线程中调用。
+
+        Args:
+            frame: BGR格式的原始帧
+            canvas_size: 画布尺寸 (宽, 高)
+            quality: 显示质量，QUALITY_FAST 或 QUALITY_HIGH
+
+        Returns:
+            准备好的显示数据，画布尚未布局时返回None
+        """
+        canvas_width, canvas_height = canvas_size
+        if canvas_width < 10 or canvas_height < 10:
+            return None
+
+        # 调整图像大小以适应画布（按源视频尺寸计算，使裁切坐标对应源视频）
+        if self.source_size:
+            frame_width, frame_height = self.source_size
+        else:
+            frame_height, frame_width = frame.shape[:2]
+        new_width, new_height = self.fit_size(
+            frame_width, frame_height, canvas_width, canvas_height
+        )
 
         # 计算图像偏移量（居中显示）
         offset_x = (canvas_width - new_width) // 2
         offset_y = (canvas_height - new_height) // 2
-        self.display_offset = (offset_x, offset_y)
 
-        self.display_image = pil_image.resize((new_width, new_height), Image.LANCZOS)
-        tk_image = ImageTk.PhotoImage(image=self.display_image)
+        return {
+            "mode": "frame",
+            "frame_shape": (frame_height, frame_width) + frame.shape[2:],
+            "image": self.resize_for_display(frame, new_width, new_height, quality),
+            "offset": (offset_x, offset_y),
+            "scale": (new_width / frame_width, new_height / frame_height),
+        }
 
-        # 清除画布并显示新图像
-        self.canvas.delete("all")
-        self.canvas.create_image(
-            offset_x + new_width // 2, offset_y + new_height // 2, image=tk_image, anchor=tk.CENTER
+    def show_frame(self, frame, quality=QUALITY_HIGH):
+        """显示帧图像"""
+        if not hasattr(self, "canvas"):
+            return False
+        prepared = self.prepare_frame(frame, self.get_canvas_size(), quality)
+        return self.show_prepared(prepared, source=frame)
+
+    def show_prepared(self, prepared, source=None):
+        """
+        显示由prepare_frame或prepare_preview准备好的图像
+
+        Args:
+            prepared: 准备好的显示数据
+            source: 准备该图像所用的原始帧，提供时用于之后的重新缩放
+        """
+        if prepared is None:
+            return False
+        self.last_source = (prepared["mode"], source) if source is not None else None
+        if prepared["mode"] == "preview":
+            self._show_prepared_preview(prepared)
+            return True
+
+        self.frame_shape = prepared["frame_shape"]
+        self.display_image = prepared["image"]
+        self.display_offset = prepared["offset"]
+        offset_x, offset_y = self.display_offset
+
+        # 更新图像并清除旧的裁切矩形（由调用方重绘）
+        self._update_image(
+            self.display_image,
+            offset_x + self.display_image.width // 2,
+            offset_y + self.display_image.height // 2,
         )
+        self.canvas.delete("rect")
+        self._hide_back_button()
 
         # 更新缩放比例
-        self.scale_x = new_width / frame_width
-        self.scale_y = new_height / frame_height
-
-        # 确保图像不在垃圾回收时被删除
-        self.last_image = tk_image
+        self.scale_x, self.scale_y = prepared["scale"]
 
         return True
 
+    def _update_image(self, image, center_x, center_y):
+        """
+        在画布上显示PIL图像
+
+        尺寸与上一帧相同时用paste()原地更新已有的PhotoImage，
+        只在尺寸变化时重新创建；画布图像项始终只有一个，只移动其位置。
+        """
+        if (
+            self.tk_image is None
+            or self.tk_image.width() != image.width
+            or self.tk_image.height() != image.height
+        ):
+            # 保留引用，防止图像被垃圾回收
+            self.tk_image = ImageTk.PhotoImage(image=image)
+            if self.image_item is not None:
+                self.canvas.itemconfigure(self.image_item, image=self.tk_image)
+        else:
+            self.tk_image.paste(image)
+
+        if self.image_item is None:
+            self.image_item = self.canvas.create_image(
+                center_x, center_y, image=self.tk_image, anchor=tk.CENTER, tags="frame"
+            )
+            self.canvas.tag_lower(self.image_item)
+        else:
+            self.canvas.coords(self.image_item, center_x, center_y)
+
     def draw_crop_rectangle(self, x, y, width, height):
         """绘制裁切矩形"""
         if width <= 0 or height <= 0:
@@ -478,51 +857,83 @@ class VideoCanvas:
         """清除矩形"""
         self.canvas.delete("rect")
 
-    def show_preview(self, cropped_frame):
-        """显示裁切预览"""
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
+    def prepare_preview(self, cropped_frame, canvas_size, quality=QUALITY_HIGH):
+        """
+        准备用于显示的裁切预览图像（不访问Tk对象，可以在后台线程中调用）
 
-        # 转换为RGB
-        cropped_rgb = cv2.cvtColor(cropped_frame, cv2.COLOR_BGR2RGB)
-        cropped_pil = Image.fromarray(cropped_rgb)
+        Args:
+            cropped_frame: BGR格式的裁切后帧
+            canvas_size: 画布尺寸 (宽, 高)
+            quality: 显示质量，QUALITY_FAST 或 QUALITY_HIGH
+        """
+        canvas_width, canvas_height = canvas_size
+        if canvas_width < 1 or canvas_height < 1:
+            return None
 
         # 保持宽高比缩放
-        crop_ratio = cropped_frame.shape[1] / cropped_frame.shape[0]
-        canvas_ratio = canvas_width / canvas_height
+        crop_height, crop_width = cropped_frame.shape[:2]
+        new_width, new_height = self.fit_size(crop_width, crop_height, canvas_width, canvas_height)
+        if new_width <= 0 or new_height <= 0:
+            new_width, new_height = crop_width, crop_height
+
+        return {
+            "mode": "preview",
+            "image": self.resize_for_display(cropped_frame, new_width, new_height, quality),
+            "center": (canvas_width // 2, canvas_height // 2),
+        }
+
+    def show_preview(self, cropped_frame, quality=QUALITY_HIGH):
+        """显示裁切预览"""
+        prepared = self.prepare_preview(cropped_frame, self.get_canvas_size(), quality)
+        self.show_prepared(prepared, source=cropped_frame)
 
-        if crop_ratio > canvas_ratio:
-            new_width = canvas_width
-            new_height = int(new_width / crop_ratio)
-        else:
-            new_height = canvas_height
-            new_width = int(new_height * crop_ratio)
+    def redraw(self, quality=QUALITY_HIGH):
+        """
+        按当前画布尺寸重新缩放并显示最近一次的原始帧（不重新解码）
 
-        if new_width > 0 and new_height > 0:
-            preview_img = cropped_pil.resize((new_width, new_height), Image.LANCZOS)
+        Returns:
+            重绘的模式（"frame"或"preview"），没有可用的原始帧时返回None
+        """
+        if self.last_source is None:
+            return None
+        mode, source = self.last_source
+        canvas_size = self.get_canvas_size()
+        if mode == "preview":
+            prepared = self.prepare_preview(source, canvas_size, quality)
         else:
-            preview_img = cropped_pil
-
-        self.canvas.delete("all")
-        tk_preview = ImageTk.PhotoImage(image=preview_img)
-        self.canvas.create_image(
-            canvas_width // 2, canvas_height // 2, image=tk_preview, anchor=tk.CENTER
-        )
-        self.preview_tk_image = tk_preview  # 防止垃圾回收
+            prepared = self.prepare_frame(source, canvas_size, quality)
+        if not self.show_prepared(prepared, source=source):
+            return None
+        return mode
+
+    def _show_prepared_preview(self, prepared):
+        """显示准备好的裁切预览图像"""
+        center_x, center_y = prepared["center"]
+        self._update_image(prepared["image"], center_x, center_y)
+        self.canvas.delete("rect")
 
-        # 添加返回按钮
-        self.back_button = tk.Button(
-            self.canvas, text="返回预览", command=self._back_to_preview, bg="#e0e0e0", fg="#000000"
-        )
-        self.back_button.place(x=10, y=10)
+        # 返回按钮只创建一次，之后只显示或隐藏
+        if self.back_button is None:
+            self.back_button = tk.Button(
+                self.canvas,
+                text="返回预览",
+                command=self._back_to_preview,
+                bg="#e0e0e0",
+                fg="#000000",
+            )
+        if not self.back_button.place_info():
+            self.back_button.place(x=10, y=10)
+
+    def _hide_back_button(self):
+        """隐藏返回按钮"""
+        if self.back_button is not None:
+            self.back_button.place_forget()
 
     def _back_to_preview(self):
         """返回预览模式"""
         if "back_to_preview" in self.callbacks:
             self.callbacks["back_to_preview"]()
-
-        if hasattr(self, "back_button"):
-            self.back_button.destroy()
+        self._hide_back_button()
 
 
 class StatusBar:
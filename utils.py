@@ -3,6 +3,8 @@
 包含时间格式化等通用函数
 """
 
+import numpy as np
+
 
 def format_time(seconds):
     """格式化时间显示为 MM:SS.mmm"""
@@ -35,3 +37,164 @@ def generate_output_filename(
         suffix += f"_trim_{start_frame}-{end_frame}"
 
     return f"{base_name}{suffix}.mp4"
+
+
+def crop_frame(frame, crop_params):
+    """
+    对单帧执行空间裁切
+
+    Args:
+        frame: 原始帧
+        crop_params: 裁切参数，为None或尺寸为0时不裁切
+
+    Returns:
+        (裁切后的帧, 裁切区域是否在帧范围内)；超出范围时返回同尺寸的黑色帧
+    """
+    if not crop_params or crop_params["width"] <= 0 or crop_params["height"] <= 0:
+        return frame, True
+
+    if (
+        crop_params["x"] + crop_params["width"] <= frame.shape[1]
+        and crop_params["y"] + crop_params["height"] <= frame.shape[0]
+    ):
+        cropped = frame[
+            crop_params["y"] : crop_params["y"] + crop_params["height"],
+            crop_params["x"] : crop_params["x"] + crop_params["width"],
+        ]
+        return cropped, True
+
+    # 如果超出范围，创建黑色帧
+    return np.zeros((crop_params["height"], crop_params["width"], 3), dtype=np.uint8), False
+
+
+def align_crop_yuv420(crop_params):
+    """
+    将裁切起点向下对齐到偶数像素
+
+    YUV420的色度平面在水平和垂直方向都是亮度的一半，裁切起点为偶数时
+    才能与色度采样对齐。裁切尺寸保持不变。
+
+    Returns:
+        对齐后的裁切参数；为None或尺寸为0时返回None
+    """
+    if not crop_params or crop_params["width"] <= 0 or crop_params["height"] <= 0:
+        return None
+    return dict(crop_params, x=crop_params["x"] // 2 * 2, y=crop_params["y"] // 2 * 2)
+
+
+def crop_yuv420(planes, crop_params):
+    """
+    对单帧YUV420平面执行空间裁切（只是切片，不复制数据）
+
+    Args:
+        planes: (Y, U, V) 三个二维数组，U、V的宽高为Y的一半
+        crop_params: align_crop_yuv420()对齐后的裁切参数，宽高须为偶数；None表示不裁切
+
+    Returns:
+        (裁切后的平面, 裁切区域是否在帧范围内)；超出范围时返回同尺寸的黑色帧
+    """
+    if crop_params is None:
+        return planes, True
+
+    x, y = crop_params["x"], crop_params["y"]
+    width, height = crop_params["width"], crop_params["height"]
+    luma = planes[0]
+    if x + width <= luma.shape[1] and y + height <= luma.shape[0]:
+        cx, cy, cw, ch = x // 2, y // 2, width // 2, height // 2
+        return (
+            luma[y : y + height, x : x + width],
+            planes[1][cy : cy + ch, cx : cx + cw],
+            planes[2][cy : cy + ch, cx : cx + cw],
+        ), True
+
+    # 如果超出范围，创建黑色帧（BT.601有限范围的黑色：Y=16，U=V=128）
+    chroma = np.full((height // 2, width // 2), 128, dtype=np.uint8)
+    return (np.full((height, width), 16, dtype=np.uint8), chroma, chroma), False
+
+
+def merge_ranges(ranges):
+    """
+    合并重叠或相邻的帧范围
+
+    Args:
+        ranges: [(起始帧, 结束帧), ...]，均包含，顺序任意
+
+    Returns:
+        按起始帧升序、互不重叠的范围列表
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def split_every(total_frames, fps, seconds):
+    """
+    按固定时长把整个视频切分为连续的片段
+
+    Args:
+        total_frames: 总帧数
+        fps: 帧率
+        seconds: 每段的时长（秒）
+
+    Returns:
+        时间裁切参数列表 [{'start_frame': int, 'end_frame': int}, ...]
+    """
+    if seconds <= 0:
+        raise ValueError("切分时长必须大于0")
+    step = max(1, int(round(seconds * fps)))
+    return [
+        {"start_frame": start, "end_frame": min(start + step, total_frames) - 1}
+        for start in range(0, total_frames, step)
+    ]
+
+
+def trim_ranges(trim_params):
+    """
+    获取时间裁切参数中要保留的帧范围
+
+    时间裁切参数除 start_frame/end_frame 外，可以带有 "ranges"（保留范围列表），
+    此时导出按顺序拼接这些范围，start_frame/end_frame 为其整体边界。
+
+    Returns:
+        merge_ranges()合并后的范围列表
+    """
+    if trim_params.get("ranges"):
+        return merge_ranges([tuple(item) for item in trim_params["ranges"]])
+    return [(trim_params["start_frame"], trim_params["end_frame"])]
+
+
+def keep_ranges_to_trim(ranges):
+    """由保留范围列表构造时间裁切参数"""
+    merged = merge_ranges(ranges)
+    if not merged:
+        raise ValueError("保留范围不能为空")
+    trim_params = {"start_frame": merged[0][0], "end_frame": merged[-1][1]}
+    if len(merged) > 1:
+        trim_params["ranges"] = [list(item) for item in merged]
+    return trim_params
+
+
+def invert_ranges(cut_ranges, total_frames):
+    """
+    由要删除的帧范围计算要保留的帧范围
+
+    Args:
+        cut_ranges: [(起始帧, 结束帧), ...]，均包含
+        total_frames: 总帧数
+
+    Returns:
+        保留范围列表
+    """
+    keep = []
+    position = 0
+    for start, end in merge_ranges(cut_ranges):
+        if start > position:
+            keep.append((position, min(start, total_frames) - 1))
+        position = max(position, end + 1)
+    if position < total_frames:
+        keep.append((position, total_frames - 1))
+    return keep
@@ -4,10 +4,216 @@
 """
 
 import os
+import queue
 import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
 
 import cv2
-import numpy as np
+
+from config import (
+    DECODER_POOL_MAX_HANDLES,
+    EXPORT_YUV_NATIVE,
+    FRAME_CACHE_MAX_BYTES,
+    PARALLEL_EXPORT_CHUNKS_PER_WORKER,
+    PARALLEL_EXPORT_MIN_FRAMES,
+    PARALLEL_EXPORT_WORKERS,
+    PROGRESS_UPDATE_SECONDS,
+    SEQUENTIAL_GRAB_LIMIT,
+    TRIM_MODE,
+    UI_EVENT_POLL_MS,
+)
+from disk_cache import file_key, get_default_cache
+from encoders import EncoderError, create_encoder, resolve_encoder_params
+from export_pipeline import ExportPipeline, MultiOutputPipeline, PipelineError
+from ffmpeg_tools import (
+    FFmpegError,
+    find_ffmpeg,
+    iter_yuv420_frames,
+    plan_smart_render,
+    smart_render_trim,
+    stream_copy_trim,
+)
+from keyframe_index import KeyframeIndex
+from parallel_export import plan_chunks, resolve_worker_count, run_parallel_export
+from proxy import ProxyBuilder, needs_proxy
+from utils import align_crop_yuv420, crop_frame, crop_yuv420, merge_ranges, trim_ranges
+
+
+class FrameCache:
+    """
+    已解码帧的LRU缓存
+
+    以帧号为键，按字节数而不是帧数限制容量（4K帧每帧约25MB），
+    超出容量时淘汰最久未使用的帧。
+    """
+
+    def __init__(self, max_bytes=FRAME_CACHE_MAX_BYTES):
+        """
+        初始化帧缓存
+
+        Args:
+            max_bytes: 缓存占用内存上限（字节），为0时禁用缓存
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, frame_number):
+        """获取缓存的帧，未命中时返回None"""
+        with self._lock:
+            frame = self._frames.get(frame_number)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(frame_number)
+            self.hits += 1
+            return frame
+
+    def put(self, frame_number, frame):
+        """放入一帧，必要时淘汰最久未使用的帧"""
+        size = frame.nbytes
+        if size > self.max_bytes:
+            return
+
+        # 缓存中的帧会被多处共享，禁止原地修改
+        frame.flags.writeable = False
+
+        with self._lock:
+            old = self._frames.pop(frame_number, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+
+            self._frames[frame_number] = frame
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def clear(self):
+        """清空缓存并重置统计"""
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "frames": len(self._frames),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def __len__(self):
+        """缓存中的帧数"""
+        return len(self._frames)
+
+    def __contains__(self, frame_number):
+        """检查帧是否已缓存（不影响LRU顺序和统计）"""
+        return frame_number in self._frames
+
+
+class DecoderPool:
+    """
+    解码器句柄池
+
+    为预览、播放、导出等不同使用者分别提供独立的cv2.VideoCapture，
+    互不干扰读取位置；同时限制同一视频同时打开的句柄数量。
+    归还的句柄会被保留以便复用，复用时读取位置不确定，使用者需要自行定位。
+    """
+
+    def __init__(self, video_path, max_handles=DECODER_POOL_MAX_HANDLES):
+        """
+        初始化解码器池
+
+        Args:
+            video_path: 视频文件路径
+            max_handles: 同时打开的解码器句柄上限
+        """
+        self.video_path = video_path
+        self.max_handles = max_handles
+        self._idle = []
+        self._open_count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """
+        获取一个解码器句柄，达到上限时等待其他使用者归还
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            已打开的cv2.VideoCapture对象
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("解码器池已关闭")
+                if self._idle:
+                    return self._idle.pop()
+                if self._open_count < self.max_handles:
+                    self._open_count += 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("没有可用的解码器")
+
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            cap.release()
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise IOError("无法打开视频文件")
+        return cap
+
+    def release(self, cap):
+        """归还解码器句柄"""
+        with self._cond:
+            if self._closed:
+                cap.release()
+                self._open_count -= 1
+                return
+            self._idle.append(cap)
+            self._cond.notify()
+
+    @contextmanager
+    def decoder(self, timeout=None):
+        """以上下文管理器的方式借用解码器句柄"""
+        cap = self.acquire(timeout)
+        try:
+            yield cap
+        finally:
+            self.release(cap)
+
+    @property
+    def open_count(self):
+        """当前已打开的句柄数"""
+        return self._open_count
+
+    def close(self):
+        """关闭所有空闲句柄；使用中的句柄在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            for cap in self._idle:
+                cap.release()
+                self._open_count -= 1
+            self._idle = []
+            self._cond.notify_all()
 
 
 class VideoProcessor:
@@ -17,31 +223,65 @@ class VideoProcessor:
     负责视频文件的加载、帧提取、裁切和剪辑等核心功能。
     """
 
-    def __init__(self, callback_manager):
+    def __init__(self, callback_manager, cache_max_bytes=FRAME_CACHE_MAX_BYTES):
         """
         初始化视频处理器
 
         Args:
             callback_manager: 回调管理器，用于与UI通信
+            cache_max_bytes: 已解码帧缓存的内存上限（字节）
         """
         self.callback_manager = callback_manager
-        self.cap = None
+        self.frame_cache = FrameCache(cache_max_bytes)
+        self.disk_cache = get_default_cache()  # 持久化的探测信息和索引缓存，禁用时为None
+        self.cache_key = None
+        self.keyframe_index = None
+        self.decoder_pool = None  # 源文件的解码器池（导出始终使用源文件）
+        self.preview_pool = None  # 预览使用的解码器池，代理文件就绪后切换为代理文件
+        self.proxy = None  # 代理文件生成器，不需要代理时为None
+        self.using_proxy = False
+        self.cap = None  # 预览专用的解码器句柄
+        # 保护预览解码器句柄、读取位置和帧缓存；可重入，load_video()持有时可调用release()
+        self._decode_lock = threading.RLock()
         self.video_path = ""
         self.frame_width = 0
         self.frame_height = 0
         self.fps = 0
         self.total_frames = 0
+        self.last_export_stats = None  # 最近一次导出各阶段的耗时统计
+        self.parallel_workers = PARALLEL_EXPORT_WORKERS  # 分段并行导出的进程数
+        self.encoder_params = None  # 重新编码时的编码参数，None表示使用config中的默认值
 
-    def load_video(self, video_path):
-        """加载视频文件"""
-        if self.cap:
-            self.cap.release()
+        # 解码器下一次read()将返回的帧号，None表示未知
+        self._decoder_pos = None
+        self.seek_count = 0
 
-        self.video_path = video_path
-        self.cap = cv2.VideoCapture(video_path)
+    def load_video(self, video_path, build_proxy=False):
+        """
+        加载视频文件
 
-        if not self.cap.isOpened():
-            return False, "无法打开视频文件"
+        Args:
+            video_path: 视频文件路径
+            build_proxy: 高分辨率视频是否在后台生成预览用的代理文件（只有交互式预览需要）
+        """
+        # 等待其他线程（如拖动预览）正在进行的解码结束后再替换句柄，
+        # 避免旧的读取落在新句柄上、以错误的帧号写入缓存
+        with self._decode_lock:
+            self.release()
+
+            self.video_path = video_path
+            self.decoder_pool = DecoderPool(video_path)
+            self.preview_pool = self.decoder_pool
+            self._decoder_pos = None
+            self.seek_count = 0
+
+            try:
+                self.cap = self.decoder_pool.acquire()
+            except IOError:
+                return False, "无法打开视频文件"
+
+            # 新打开的解码器位于第0帧
+            self._decoder_pos = 0
 
         # 获取视频元数据
         self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -49,22 +289,206 @@ class VideoProcessor:
         self.fps = self.cap.get(cv2.CAP_PROP_FPS)
         self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+        # 优先使用磁盘缓存中的索引，否则后台建立，完成前按容器报告的帧数工作
+        self.cache_key = self._file_cache_key(video_path)
+        self.keyframe_index = self._load_cached_index()
+        if self.keyframe_index is None:
+            self.keyframe_index = KeyframeIndex(video_path, on_complete=self._save_index)
+            self.keyframe_index.start()
+
+        # 高分辨率视频在后台生成代理文件，完成后预览自动切换
+        if build_proxy and needs_proxy(self.frame_width, self.frame_height):
+            self.proxy = ProxyBuilder(video_path)
+            self.proxy.start()
+
         return True, "视频加载成功"
 
+    def _file_cache_key(self, video_path):
+        """计算磁盘缓存键，缓存不可用时返回None"""
+        if self.disk_cache is None:
+            return None
+        try:
+            return file_key(video_path)
+        except OSError:
+            return None
+
+    def _load_cached_index(self):
+        """从磁盘缓存恢复探测信息和关键帧索引，未命中时返回None"""
+        if self.cache_key is None:
+            return None
+        probe = self.disk_cache.get_json(self.cache_key, "probe")
+        arrays = self.disk_cache.get_arrays(self.cache_key, "keyframe_index")
+        if probe is None or arrays is None:
+            return None
+
+        self.total_frames = probe["total_frames"]
+        return KeyframeIndex.from_arrays(self.video_path, arrays["keyframes"], arrays["timestamps"])
+
+    def _save_index(self, index):
+        """关键帧索引建立完成后保存到磁盘缓存（在扫描线程中调用）"""
+        cache, key = self.disk_cache, self.cache_key
+        if cache is None or key is None or index.video_path != self.video_path:
+            return
+        cache.put_arrays(key, "keyframe_index", index.to_arrays())
+        cache.put_json(
+            key,
+            "probe",
+            {
+                "width": self.frame_width,
+                "height": self.frame_height,
+                "fps": self.fps,
+                "total_frames": index.frame_count,
+            },
+        )
+
+    @property
+    def preview_path(self):
+        """预览使用的文件路径（代理文件就绪后为代理文件）"""
+        return self.proxy.output_path if self.using_proxy else self.video_path
+
+    def _activate_proxy(self):
+        """代理文件生成完成后，将预览解码器切换到代理文件（需持有解码锁）"""
+        if self.using_proxy or self.proxy is None or not self.proxy.is_complete:
+            return
+        pool = DecoderPool(self.proxy.output_path)
+        try:
+            cap = pool.acquire()
+        except IOError:
+            # 代理文件不可用，继续使用源文件预览
+            pool.close()
+            self.proxy = None
+            return
+
+        self.preview_pool.release(self.cap)
+        self.preview_pool = pool
+        self.cap = cap
+        self._decoder_pos = 0
+        self.using_proxy = True
+        # 缓存中是源分辨率的帧，切换后不再混用
+        self.frame_cache.clear()
+
     def get_frame(self, frame_number):
         """获取指定帧"""
         if not self.cap or not self.cap.isOpened():
             return None
 
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        success, frame = self.cap.read()
+        if self.proxy is not None and not self.using_proxy and self.proxy.is_complete:
+            with self._decode_lock:
+                self._activate_proxy()
 
-        if success:
+        frame = self.frame_cache.get(frame_number)
+        if frame is not None:
             return frame
-        return None
+
+        with self._decode_lock:
+            # 等待锁期间视频可能已被释放或重新加载
+            if not self.cap:
+                return None
+            self._position_decoder(frame_number)
+            success, frame = self.cap.read()
+
+            if success:
+                self._decoder_pos = frame_number + 1
+                self.frame_cache.put(frame_number, frame)
+                return frame
+
+            self._decoder_pos = None
+            return None
+
+    def _position_decoder(self, frame_number):
+        """
+        将解码器移动到指定帧之前
+
+        顺序读取时不做任何操作；短距离向前跳转，或目标与解码器位于同一GOP时，
+        用grab()跳过中间帧，避免seek引起的关键帧回退和重新解码；
+        其余情况seek到索引中最近的前一个关键帧，再向前解码已知的帧数。
+        代理文件每帧都是关键帧，直接seek到目标帧。
+        """
+        pos = self._decoder_pos
+        if self.using_proxy:
+            keyframe = frame_number
+        elif self.keyframe_index:
+            keyframe = self.keyframe_index.keyframe_before(frame_number)
+        else:
+            keyframe = None
+
+        if pos is not None and pos <= frame_number:
+            same_gop = keyframe is not None and keyframe <= pos
+            if same_gop or frame_number - pos <= SEQUENTIAL_GRAB_LIMIT:
+                if self._grab_forward(frame_number):
+                    return
+
+        if keyframe is not None:
+            self._seek(keyframe)
+            if self._grab_forward(frame_number):
+                return
+
+        self._seek(frame_number)
+
+    def get_approximate_frame_number(self, frame_number):
+        """
+        获取可以比目标帧更快显示的近似帧号（拖动预览时先显示它）
+
+        目标帧已缓存、解码器可以短距离顺序到达，或离前一个关键帧很近时
+        直接解码目标帧更划算，返回None；否则返回前一个关键帧的帧号。
+        """
+        if frame_number in self.frame_cache or not self.keyframe_index or self.using_proxy:
+            return None
+        keyframe = self.keyframe_index.keyframe_before(frame_number)
+        if keyframe is None or frame_number - keyframe <= SEQUENTIAL_GRAB_LIMIT:
+            return None
+
+        pos = self._decoder_pos
+        if pos is not None and keyframe <= pos <= frame_number:
+            # 解码器已在同一GOP中，向前grab即可
+            return None
+        return keyframe
+
+    def _grab_forward(self, frame_number):
+        """用grab()将解码器向前推进到指定帧，成功返回True"""
+        pos = self._decoder_pos
+        while pos < frame_number:
+            if not self.cap.grab():
+                self._decoder_pos = None
+                return False
+            pos += 1
+        self._decoder_pos = pos
+        return True
+
+    def _seek(self, frame_number):
+        """将解码器seek到指定帧"""
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self._decoder_pos = frame_number
+        self.seek_count += 1
+
+    def get_cache_stats(self):
+        """获取帧缓存统计信息（命中/未命中次数等）"""
+        return self.frame_cache.get_stats()
+
+    def refresh_frame_count(self):
+        """
+        用关键帧索引统计的实际帧数更新总帧数
+
+        Returns:
+            总帧数是否发生变化
+        """
+        if not self.keyframe_index or not self.keyframe_index.is_complete:
+            return False
+
+        frame_count = self.keyframe_index.frame_count
+        if frame_count <= 0 or frame_count == self.total_frames:
+            return False
+
+        self.total_frames = frame_count
+        return True
+
+    def is_index_complete(self):
+        """关键帧索引是否已建立完成"""
+        return bool(self.keyframe_index and self.keyframe_index.is_complete)
 
     def get_video_info(self):
         """获取视频信息"""
+        self.refresh_frame_count()
         return {
             "width": self.frame_width,
             "height": self.frame_height,
@@ -73,7 +497,7 @@ class VideoProcessor:
             "duration": self.total_frames / self.fps if self.fps > 0 else 0,
         }
 
-    def process_video(self, output_path, crop_params=None, trim_params=None):
+    def process_video(self, output_path, crop_params=None, trim_params=None, trim_mode=None):
         """
         在后台线程中处理视频
 
@@ -81,109 +505,658 @@ class VideoProcessor:
             output_path: 输出文件路径
             crop_params: 裁切参数 {'x': int, 'y': int, 'width': int, 'height': int}
             trim_params: 时间裁切参数 {'start_frame': int, 'end_frame': int}
+            trim_mode: 仅时间剪辑时的处理方式，默认使用config.TRIM_MODE
         """
         threading.Thread(
             target=self._process_video_thread,
-            args=(output_path, crop_params, trim_params),
+            args=(output_path, crop_params, trim_params, trim_mode),
             daemon=True,
         ).start()
 
-    def _process_video_thread(self, output_path, crop_params, trim_params):
+    def process_video_multi(self, targets, trim_params=None):
+        """
+        在后台线程中从同一次解码导出多个裁切区域
+
+        每一帧只解码一次，各输出有独立的裁切视图和编码器，并发编码。
+        全部完成后以输出路径列表调用一次on_complete。
+
+        Args:
+            targets: [(裁切参数, 输出文件路径), ...]，裁切参数为None表示不裁切
+            trim_params: 时间裁切参数 {'start_frame': int, 'end_frame': int}
+        """
+        threading.Thread(
+            target=self._process_multi_thread, args=(targets, trim_params), daemon=True
+        ).start()
+
+    def _process_multi_thread(self, targets, trim_params):
+        """多输出导出线程"""
+        try:
+            sizes = [self._output_size(crop_params) for crop_params, _ in targets]
+            encoder_params = self._yuv_encoder_params(sizes)
+            if encoder_params:
+                self._export_multi(targets, trim_params, None, encoder_params)
+                return
+            with self.decoder_pool.decoder() as cap:
+                self._export_multi(targets, trim_params, cap, self.encoder_params)
+        except Exception as e:
+            self.callback_manager.on_error(str(e))
+
+    def process_video_split(self, clips, crop_params=None):
+        """
+        在后台线程中按顺序读一遍源视频，把若干帧范围分别导出为独立的文件
+
+        读取位置进入某个范围时打开它的编码器，离开时关闭；重叠的范围共用同一次解码的帧，
+        不属于任何范围的帧不做颜色转换。全部完成后以输出路径列表调用一次on_complete。
+
+        Args:
+            clips: [(时间裁切参数, 输出文件路径), ...]
+            crop_params: 所有片段共用的裁切参数，None表示不裁切
+        """
+        threading.Thread(
+            target=self._process_split_thread, args=(clips, crop_params), daemon=True
+        ).start()
+
+    def _process_split_thread(self, clips, crop_params):
+        """按时间切分导出线程"""
+        try:
+            encoder_params = self._yuv_encoder_params([self._output_size(crop_params)])
+            if encoder_params:
+                self._export_split(clips, crop_params, None, encoder_params)
+                return
+            with self.decoder_pool.decoder() as cap:
+                self._export_split(clips, crop_params, cap, self.encoder_params)
+        except Exception as e:
+            self.callback_manager.on_error(str(e))
+
+    def _process_video_thread(self, output_path, crop_params, trim_params, trim_mode=None):
         """视频处理线程"""
         try:
-            # 确定输出尺寸
-            if crop_params and crop_params["width"] > 0 and crop_params["height"] > 0:
-                output_width = crop_params["width"]
-                output_height = crop_params["height"]
-            else:
-                output_width = self.frame_width
-                output_height = self.frame_height
+            # 多个保留范围时直接顺序导出并拼接，不走快速剪辑和分段并行
+            single_range = len(self._keep_ranges(trim_params)) == 1
+
+            # 仅时间剪辑时优先尝试不重新编码的快速路径
+            if crop_params is None and trim_params and single_range:
+                if self._fast_trim(output_path, trim_params, trim_mode or TRIM_MODE):
+                    return
 
-            # 创建VideoWriter
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            out = cv2.VideoWriter(output_path, fourcc, self.fps, (output_width, output_height))
+            # 较长的导出分段并行处理
+            if single_range and self._parallel_export(output_path, crop_params, trim_params):
+                return
 
-            if not out.isOpened():
-                self.callback_manager.on_error("无法创建输出文件")
+            # 可以用ffmpeg解码和编码时，全程保持YUV420平面格式
+            if self._yuv_export(output_path, crop_params, trim_params):
                 return
 
-            # 保存当前帧位置
-            original_frame_pos = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
+            # 导出使用独立的解码器句柄，不影响预览的读取位置
+            with self.decoder_pool.decoder() as cap:
+                self._export_frames(cap, output_path, crop_params, trim_params)
+        except Exception as e:
+            self.callback_manager.on_error(str(e))
+
+    def _frame_time(self, frame_number):
+        """获取帧的显示时间（秒），优先使用关键帧索引中的时间戳"""
+        timestamp = self.keyframe_index.get_timestamp(frame_number) if self.keyframe_index else None
+        if timestamp is not None:
+            return timestamp / 1000.0
+        return frame_number / self.fps if self.fps > 0 else 0.0
+
+    def _frame_end_time(self, frame_number):
+        """获取帧的结束时间（秒），即下一帧的显示时间"""
+        if frame_number + 1 < self.total_frames:
+            return self._frame_time(frame_number + 1)
+        frame_duration = 1.0 / self.fps if self.fps > 0 else 0.0
+        return self._frame_time(frame_number) + frame_duration
+
+    def _fast_trim(self, output_path, trim_params, trim_mode):
+        """
+        尝试以不重新编码（或只重新编码边界GOP）的方式完成仅时间剪辑
+
+        Returns:
+            是否已完成；返回False时调用方应回退到逐帧重新编码
+        """
+        if trim_mode not in ("copy", "smart") or find_ffmpeg() is None:
+            return False
+
+        start_frame = trim_params["start_frame"]
+        end_frame = trim_params["end_frame"]
+        total_frames = end_frame - start_frame + 1
 
-            # 确定处理的帧范围
-            if trim_params:
-                start_frame = trim_params["start_frame"]
-                end_frame = trim_params["end_frame"]
+        try:
+            if trim_mode == "smart":
+                if not self.keyframe_index or not self.keyframe_index.wait():
+                    return False
+                self._smart_render_trim(output_path, start_frame, end_frame)
             else:
-                start_frame = 0
-                end_frame = self.total_frames - 1
+                self._stream_copy_trim(output_path, start_frame, end_frame)
+        except FFmpegError as e:
+            self.callback_manager.on_warning(f"快速剪辑失败，改为重新编码: {e}")
+            return False
 
-            # 设置起始帧位置
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        self.callback_manager.on_progress(total_frames, total_frames)
+        self.callback_manager.on_complete(output_path)
+        return True
 
-            # 计算进度
-            total_frames = end_frame - start_frame + 1
-            processed = 0
+    def _stream_copy_trim(self, output_path, start_frame, end_frame):
+        """从起始帧之前最近的关键帧开始流复制到结束帧"""
+        keyframe = self.keyframe_index.keyframe_before(start_frame) if self.keyframe_index else None
+        if keyframe is None:
+            keyframe = start_frame
 
-            current_frame_num = start_frame
-            while current_frame_num <= end_frame:
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
+        stream_copy_trim(
+            self.video_path,
+            output_path,
+            self._frame_time(keyframe),
+            self._frame_end_time(end_frame),
+        )
+
+    def _smart_render_trim(self, output_path, start_frame, end_frame):
+        """帧精确剪辑：重新编码首尾不完整的GOP，复制中间完整的GOP"""
+        # 按索引统计的实际帧数判断剪辑是否到达视频末尾，不使用容器报告的帧数
+        self.refresh_frame_count()
+        end_frame = min(end_frame, self.total_frames - 1)
+        plan = plan_smart_render(
+            self.keyframe_index.keyframes, start_frame, end_frame, self.total_frames
+        )
+        segments = [(mode, self._frame_time(first), stop - first) for mode, first, stop in plan]
+
+        total_frames = end_frame - start_frame + 1
+        segment_ends = [stop - start_frame for _, _, stop in plan]
+
+        def on_segment_done(done, _count):
+            """每完成一段报告已完成的帧数"""
+            self.callback_manager.on_progress(segment_ends[done - 1], total_frames)
+
+        smart_render_trim(
+            self.video_path,
+            output_path,
+            segments,
+            self._frame_time(start_frame),
+            self._frame_end_time(end_frame),
+            progress=on_segment_done,
+        )
+
+    def _output_size(self, crop_params):
+        """确定输出尺寸 (宽, 高)"""
+        if crop_params and crop_params["width"] > 0 and crop_params["height"] > 0:
+            return crop_params["width"], crop_params["height"]
+        return self.frame_width, self.frame_height
+
+    def _keep_ranges(self, trim_params):
+        """确定导出要保留的帧范围列表，按顺序拼接"""
+        if trim_params:
+            return trim_ranges(trim_params)
+        return [(0, self.total_frames - 1)]
+
+    def _export_range(self, trim_params):
+        """确定处理的帧范围 (起始帧, 结束帧)"""
+        if trim_params:
+            return trim_params["start_frame"], trim_params["end_frame"]
+        return 0, self.total_frames - 1
+
+    def _parallel_export(self, output_path, crop_params, trim_params):
+        """
+        对较长的导出按关键帧分段，在进程池中并行处理后拼接
+
+        Returns:
+            是否已完成；不满足并行条件或拼接失败时返回False，调用方应回退到串行导出
+        """
+        workers = resolve_worker_count(self.parallel_workers)
+        start_frame, end_frame = self._export_range(trim_params)
+        total_frames = end_frame - start_frame + 1
+
+        if workers <= 1 or total_frames < PARALLEL_EXPORT_MIN_FRAMES or find_ffmpeg() is None:
+            return False
+        if not self.keyframe_index or not self.keyframe_index.wait():
+            return False
+
+        # 分段数多于进程数，使各进程负载更均衡、进度更新更平滑
+        chunks = plan_chunks(
+            self.keyframe_index.keyframes,
+            start_frame,
+            end_frame,
+            workers * PARALLEL_EXPORT_CHUNKS_PER_WORKER,
+        )
+        if len(chunks) < 2:
+            return False
+
+        processed = [0]
+
+        def on_chunk_done(chunk, result):
+            """累计完成的帧数，汇总该块的越界警告并报告进度"""
+            processed[0] += result["frames"]
+            if result["out_of_bounds"]:
+                self.callback_manager.on_frame_warning(
+                    "裁切区域超出范围", chunk[0], chunk[1], result["out_of_bounds"]
+                )
+            self.callback_manager.on_progress(processed[0], total_frames)
+
+        try:
+            run_parallel_export(
+                self.video_path,
+                output_path,
+                chunks,
+                crop_params,
+                self.fps,
+                self._output_size(crop_params),
+                min(workers, len(chunks)),
+                on_chunk_done,
+                self.encoder_params,
+            )
+        except FFmpegError as e:
+            self.callback_manager.on_warning(f"并行导出拼接失败，改为串行导出: {e}")
+            return False
+
+        self.callback_manager.on_complete(output_path)
+        return True
+
+    def _yuv_export(self, output_path, crop_params, trim_params):
+        """
+        YUV420原生导出：ffmpeg解码为平面YUV420，按偶数对齐的位置裁切各平面后直接交给
+        ffmpeg编码，省去YUV→BGR→YUV两次颜色转换，每帧的数据量也只有BGR的一半
+
+        Returns:
+            是否已处理；未启用、没有ffmpeg、编码后端不是ffmpeg或尺寸为奇数时返回False，
+            调用方应回退到BGR导出
+        """
+        output_size = self._output_size(crop_params)
+        encoder_params = self._yuv_encoder_params([output_size])
+        if encoder_params is None:
+            return False
 
-                try:
-                    processed_frame = frame
-
-                    # 空间裁切（如果启用）
-                    if crop_params and crop_params["width"] > 0 and crop_params["height"] > 0:
-                        if (
-                            crop_params["x"] + crop_params["width"] <= frame.shape[1]
-                            and crop_params["y"] + crop_params["height"] <= frame.shape[0]
-                        ):
-                            processed_frame = frame[
-                                crop_params["y"] : crop_params["y"] + crop_params["height"],
-                                crop_params["x"] : crop_params["x"] + crop_params["width"],
-                            ]
-                        else:
-                            # 如果超出范围，创建黑色帧
-                            processed_frame = np.zeros(
-                                (crop_params["height"], crop_params["width"], 3), dtype=np.uint8
-                            )
-                            self.callback_manager.on_warning(
-                                f"帧 {current_frame_num} 裁切区域超出范围！"
-                            )
-
-                    out.write(processed_frame)
-
-                except Exception as e:
-                    self.callback_manager.on_error(f"帧 {current_frame_num}: {str(e)}")
-                    out.release()
-                    if os.path.exists(output_path):
-                        os.remove(output_path)
+        crop = align_crop_yuv420(crop_params)
+        ranges = self._keep_ranges(trim_params)
+
+        out = create_encoder(output_path, self.fps, output_size, encoder_params, "yuv420p")
+
+        def transform(frame_number, planes):
+            """裁切YUV420平面，越界时记录警告"""
+            cropped, in_bounds = crop_yuv420(planes, crop)
+            if not in_bounds:
+                self.callback_manager.on_frame_warning("裁切区域超出范围", frame_number)
+            return cropped
+
+        self._run_export_pipeline(
+            out,
+            output_path,
+            partial(self._read_yuv_ranges, ranges),
+            transform,
+            sum(end - start + 1 for start, end in ranges),
+        )
+        return True
+
+    def _yuv_encoder_params(self, output_sizes):
+        """
+        判断能否以YUV420原生格式导出
+
+        Returns:
+            可以时返回解析后的编码参数；未启用、没有ffmpeg、编码后端不是ffmpeg
+            或尺寸为奇数时返回None
+        """
+        if not EXPORT_YUV_NATIVE or find_ffmpeg() is None:
+            return None
+        encoder_params = resolve_encoder_params(self.encoder_params)
+        if encoder_params["backend"] != "ffmpeg":
+            return None
+
+        # YUV420的色度平面为亮度的一半，源和输出的宽高都须为偶数
+        sizes = [self.frame_width, self.frame_height]
+        for width, height in output_sizes:
+            sizes += [width, height]
+        if any(size % 2 for size in sizes):
+            return None
+        return encoder_params
+
+    def _read_yuv_frames(self, start_frame, end_frame):
+        """用ffmpeg解码，逐帧返回 (帧号, (Y, U, V))"""
+        frames = iter_yuv420_frames(
+            self.video_path,
+            self.frame_width,
+            self.frame_height,
+            self._frame_time(start_frame),
+            end_frame - start_frame + 1,
+        )
+        for i, planes in enumerate(frames):
+            yield start_frame + i, planes
+
+    def _should_seek(self, position, frame_number):
+        """
+        顺序导出跳过不需要的帧时，是否应seek而不是grab()
+
+        间隔中有关键帧（跨越GOP边界）时seek到目标之前的关键帧更快；
+        间隔在同一GOP内时seek也要从同一个关键帧解码，直接grab()。
+        关键帧索引尚未覆盖目标位置时按SEQUENTIAL_GRAB_LIMIT判断。
+        """
+        keyframe = (
+            self.keyframe_index.keyframe_before(frame_number) if self.keyframe_index else None
+        )
+        if keyframe is not None:
+            return keyframe > position
+        return frame_number - position > SEQUENTIAL_GRAB_LIMIT
+
+    def _group_ranges(self, ranges):
+        """把merge_ranges()合并后的范围按是否需要seek分组，同一组内顺序读取"""
+        groups = []
+        for start_frame, end_frame in ranges:
+            if groups and not self._should_seek(groups[-1][-1][1] + 1, start_frame):
+                groups[-1].append((start_frame, end_frame))
+            else:
+                groups.append([(start_frame, end_frame)])
+        return groups
+
+    def _read_yuv_ranges(self, ranges):
+        """
+        用ffmpeg解码，只返回落在merge_ranges()合并后的范围内的 (帧号, (Y, U, V))
+
+        间隔较短的范围由同一个ffmpeg进程顺序解码，跨越GOP的间隔重新启动解码（seek）。
+        """
+        for group in self._group_ranges(ranges):
+            index = 0
+            for frame_number, planes in self._read_yuv_frames(group[0][0], group[-1][1]):
+                while frame_number > group[index][1]:
+                    index += 1
+                if frame_number >= group[index][0]:
+                    yield frame_number, planes
+
+    def _read_bgr_ranges(self, cap, ranges):
+        """
+        用给定的解码器句柄顺序读取merge_ranges()合并后的各个范围
+
+        GOP内的短间隔只grab()，不做颜色转换；跨越GOP的间隔seek到目标之前的关键帧。
+        """
+        position = None
+        for start_frame, end_frame in ranges:
+            if position is None or self._should_seek(position, start_frame):
+                keyframe = (
+                    self.keyframe_index.keyframe_before(start_frame)
+                    if self.keyframe_index
+                    else None
+                )
+                position = start_frame if keyframe is None else keyframe
+                cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            while position < start_frame:
+                if not cap.grab():
+                    return
+                position += 1
+            for frame_number in range(start_frame, end_frame + 1):
+                ret, frame = cap.read()
+                if not ret:
                     return
+                position += 1
+                yield frame_number, frame
+
+    def _export_frames(self, cap, output_path, crop_params, trim_params):
+        """使用给定的解码器句柄执行裁切和剪辑导出"""
+        try:
+            out = create_encoder(
+                output_path, self.fps, self._output_size(crop_params), self.encoder_params
+            )
+        except EncoderError as e:
+            self.callback_manager.on_error(str(e))
+            return
 
-                processed += 1
-                current_frame_num += 1
+        # 确定保留的帧范围，按顺序拼接
+        ranges = self._keep_ranges(trim_params)
 
-                if processed % 10 == 0:  # 每10帧更新一次进度
-                    self.callback_manager.on_progress(processed, total_frames)
+        self._run_export_pipeline(
+            out,
+            output_path,
+            partial(self._read_bgr_ranges, cap, ranges),
+            lambda n, frame: self._crop_frame(n, frame, crop_params),
+            sum(end - start + 1 for start, end in ranges),
+        )
 
-            # 释放资源
-            out.release()
+    def _run_export_pipeline(self, out, output_path, read_frames, transform, total_frames):
+        """通过三级流水线把帧写入编码器，完成或失败时通知回调"""
+        written = [0]
 
-            # 恢复原始帧位置
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, original_frame_pos)
+        def write_frame(frame_number, frame):
+            """编码一帧并报告进度"""
+            out.write(frame)
+            written[0] += 1
+            # 回调管理器按时间节流，这里每帧都报告
+            self.callback_manager.on_progress(written[0], total_frames)
 
-            # 通知完成
-            self.callback_manager.on_complete(output_path)
+        pipeline = ExportPipeline(read_frames, transform, write_frame)
+        try:
+            pipeline.run()
+        except PipelineError as e:
+            self.callback_manager.on_error(f"帧 {e.frame_number}: {e.error}")
+            out.abort()
+            return
+        finally:
+            self.last_export_stats = pipeline.stats
 
-        except Exception as e:
+        # 等待编码完成
+        try:
+            out.close()
+        except EncoderError as e:
             self.callback_manager.on_error(str(e))
+            return
+
+        # 通知完成
+        self.callback_manager.on_complete(output_path)
+
+    def _export_multi(self, targets, trim_params, cap, encoder_params):
+        """
+        单次解码、多路输出导出
+
+        Args:
+            targets: [(裁切参数, 输出文件路径), ...]
+            trim_params: 时间裁切参数
+            cap: 解码器句柄；为None时用ffmpeg以YUV420原生格式解码和编码
+            encoder_params: 编码参数
+        """
+        ranges = self._keep_ranges(trim_params)
+        total_frames = sum(end - start + 1 for start, end in ranges)
+        yuv = cap is None
+        if yuv:
+            read_frames = partial(self._read_yuv_ranges, ranges)
+        else:
+            read_frames = partial(self._read_bgr_ranges, cap, ranges)
+
+        encoders = []
+        try:
+            for crop_params, output_path in targets:
+                encoders.append(
+                    create_encoder(
+                        output_path,
+                        self.fps,
+                        self._output_size(crop_params),
+                        encoder_params,
+                        "yuv420p" if yuv else "bgr24",
+                    )
+                )
+        except EncoderError as e:
+            for out in encoders:
+                out.abort()
+            self.callback_manager.on_error(str(e))
+            return
+
+        def make_output(crop_params, output_path, out):
+            """为一路输出创建裁切和编码函数"""
+            crop = align_crop_yuv420(crop_params) if yuv else crop_params
+            crop_function = crop_yuv420 if yuv else crop_frame
+            message = f"裁切区域超出范围（{os.path.basename(output_path)}）"
+
+            def transform(frame_number, frame):
+                """裁切这一路的区域，越界时记录警告"""
+                cropped, in_bounds = crop_function(frame, crop)
+                if not in_bounds:
+                    self.callback_manager.on_frame_warning(message, frame_number)
+                return cropped
+
+            def write_frame(frame_number, frame):
+                """编码这一路的一帧，报告所有输出都已完成的帧数"""
+                out.write(frame)
+                self.callback_manager.on_progress(pipeline.completed_frames, total_frames)
+
+            return transform, write_frame
+
+        pipeline = MultiOutputPipeline(
+            read_frames,
+            [
+                make_output(crop_params, output_path, out)
+                for (crop_params, output_path), out in zip(targets, encoders)
+            ],
+        )
+        try:
+            pipeline.run()
+        except PipelineError as e:
+            self.callback_manager.on_error(f"帧 {e.frame_number}: {e.error}")
+            for out in encoders:
+                out.abort()
+            return
+        finally:
+            self.last_export_stats = pipeline.stats
+
+        # write_frame()在该帧计入pipeline.written之前报告进度，最后一帧在此补报
+        self.callback_manager.on_progress(pipeline.completed_frames, total_frames)
+
+        # 等待所有编码器完成
+        error = None
+        for out in encoders:
+            try:
+                out.close()
+            except EncoderError as e:
+                error = error or e
+        if error:
+            self.callback_manager.on_error(str(error))
+            return
+
+        self.callback_manager.on_complete([output_path for _, output_path in targets])
+
+    def _export_split(self, clips, crop_params, cap, encoder_params):
+        """
+        单次顺序读取、按时间切分导出
+
+        Args:
+            clips: [(时间裁切参数, 输出文件路径), ...]，时间裁切参数带有"ranges"时
+                该片段只写入这些范围内的帧
+            crop_params: 所有片段共用的裁切参数
+            cap: 解码器句柄；为None时用ffmpeg以YUV420原生格式解码和编码
+            encoder_params: 编码参数
+        """
+        yuv = cap is None
+        ordered = sorted(clips, key=lambda clip: clip[0]["start_frame"])
+        ranges = merge_ranges(
+            [keep for trim_params, _ in clips for keep in trim_ranges(trim_params)]
+        )
+        total_frames = sum(end - start + 1 for start, end in ranges)
+        output_size = self._output_size(crop_params)
+
+        if yuv:
+            read_frames = partial(self._read_yuv_ranges, ranges)
+            crop = align_crop_yuv420(crop_params)
+            crop_function = crop_yuv420
+        else:
+            read_frames = partial(self._read_bgr_ranges, cap, ranges)
+            crop = crop_params
+            crop_function = crop_frame
+
+        def transform(frame_number, frame):
+            """裁切所有片段共用的区域，越界时记录警告"""
+            cropped, in_bounds = crop_function(frame, crop)
+            if not in_bounds:
+                self.callback_manager.on_frame_warning("裁切区域超出范围", frame_number)
+            return cropped
+
+        # 正在写入的片段 [(结束帧, 保留范围, 编码器), ...]
+        active = []
+        opened = set()
+        next_clip = [0]
+        processed = [0]
+
+        def write_frame(frame_number, frame):
+            """把一帧写入覆盖它的各个片段，按片段边界打开和关闭编码器"""
+            # 读取位置进入新的片段时打开编码器
+            while (
+                next_clip[0] < len(ordered)
+                and ordered[next_clip[0]][0]["start_frame"] <= frame_number
+            ):
+                trim_params, output_path = ordered[next_clip[0]]
+                next_clip[0] += 1
+                if trim_params["end_frame"] >= frame_number:
+                    out = create_encoder(
+                        output_path,
+                        self.fps,
+                        output_size,
+                        encoder_params,
+                        "yuv420p" if yuv else "bgr24",
+                    )
+                    active.append((trim_params["end_frame"], trim_ranges(trim_params), out))
+                    opened.add(output_path)
+
+            for _, keep, out in active:
+                if any(start <= frame_number <= end for start, end in keep):
+                    out.write(frame)
+
+            # 离开片段时关闭编码器
+            for item in [item for item in active if item[0] <= frame_number]:
+                active.remove(item)
+                item[2].close()
+
+            processed[0] += 1
+            self.callback_manager.on_progress(processed[0], total_frames)
+
+        pipeline = ExportPipeline(read_frames, transform, write_frame)
+        finished = False
+        try:
+            pipeline.run()
+            finished = True
+        except PipelineError as e:
+            self.callback_manager.on_error(f"帧 {e.frame_number}: {e.error}")
+            return
+        finally:
+            self.last_export_stats = pipeline.stats
+            # 出错（包括PipelineError以外的异常）时放弃所有仍在写入的片段
+            if not finished:
+                for _, _, out in active:
+                    out.abort()
+
+        # 源视频提前结束时，仍在写入的片段就此结束；逐个关闭，保留第一个错误
+        error = None
+        for _, _, out in active:
+            try:
+                out.close()
+            except EncoderError as e:
+                error = error or e
+        if error:
+            self.callback_manager.on_error(str(error))
+            return
+
+        self.callback_manager.on_complete(
+            [output_path for _, output_path in clips if output_path in opened]
+        )
+
+    def _crop_frame(self, frame_number, frame, crop_params):
+        """对单帧执行空间裁切，超出范围时发出警告"""
+        cropped, in_bounds = crop_frame(frame, crop_params)
+        if not in_bounds:
+            self.callback_manager.on_frame_warning("裁切区域超出范围", frame_number)
+        return cropped
 
     def release(self):
-        """释放视频资源"""
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
+        """释放视频资源（等待正在进行的预览解码结束）"""
+        with self._decode_lock:
+            if self.preview_pool:
+                if self.cap:
+                    self.preview_pool.release(self.cap)
+                if self.preview_pool is not self.decoder_pool:
+                    self.preview_pool.close()
+                self.preview_pool = None
+            if self.decoder_pool:
+                self.decoder_pool.close()
+                self.decoder_pool = None
+            self.cap = None
+            self._decoder_pos = None
+            self.frame_cache.clear()
+        if self.proxy:
+            self.proxy.cancel()
+            self.proxy = None
+        self.using_proxy = False
+        if self.keyframe_index:
+            self.keyframe_index.cancel()
+            self.keyframe_index = None
 
     def __del__(self):
         """析构函数"""
@@ -191,14 +1164,20 @@ class VideoProcessor:
 
 
 class CallbackManager:
-    """回调管理器，用于视频处理器与UI通信"""
+    """
+    回调管理器，用于视频处理器与UI通信
+
+    处理线程只把事件放入线程安全的队列，UI线程用定时器定期取出并调用回调，
+    处理线程不直接调用任何Tk方法。进度按时间节流，取出时只保留最新值；
+    逐帧警告按消息合并计数，首次出现时报告一次，结束时报告汇总。
+    """
 
     def __init__(self, root):
         """
         初始化回调管理器
 
         Args:
-            root: Tkinter根窗口对象，用于线程间通信
+            root: Tkinter根窗口对象，用于在UI线程中定时处理事件
         """
         self.root = root
         self.progress_callback = None
@@ -206,6 +1185,15 @@ class CallbackManager:
         self.error_callback = None
         self.warning_callback = None
 
+        self.events = queue.Queue()
+        self._lock = threading.Lock()
+        self._last_progress_time = 0.0
+        self._unsent_progress = None
+        self._frame_warnings = OrderedDict()
+
+        if self.root is not None:
+            self.root.after(UI_EVENT_POLL_MS, self._poll_events)
+
     def set_callbacks(self, progress_cb=None, complete_cb=None, error_cb=None, warning_cb=None):
         """设置回调函数"""
         self.progress_callback = progress_cb
@@ -214,21 +1202,129 @@ class CallbackManager:
         self.warning_callback = warning_cb
 
     def on_progress(self, processed, total):
-        """进度回调"""
-        if self.progress_callback:
-            self.root.after(10, self.progress_callback, processed, total)
+        """进度回调（距离上次报告不足PROGRESS_UPDATE_SECONDS时只记录，不报告）"""
+        now = time.monotonic()
+        with self._lock:
+            if processed < total and now - self._last_progress_time < PROGRESS_UPDATE_SECONDS:
+                self._unsent_progress = (processed, total)
+                return
+            self._last_progress_time = now
+            self._unsent_progress = None
+        self._post("progress", processed, total)
 
     def on_complete(self, output_path):
         """完成回调"""
-        if self.complete_callback:
-            self.root.after(10, self.complete_callback, output_path)
+        self._finish()
+        self._post("complete", output_path)
 
     def on_error(self, error_msg):
         """错误回调"""
-        if self.error_callback:
-            self.root.after(10, self.error_callback, error_msg)
+        self._finish()
+        self._post("error", error_msg)
 
     def on_warning(self, warning_msg):
         """警告回调"""
-        if self.warning_callback:
-            self.root.after(10, self.warning_callback, warning_msg)
+        self._post("warning", warning_msg)
+
+    def on_frame_warning(self, message, first_frame, last_frame=None, count=1):
+        """
+        逐帧警告回调，相同消息的警告合并计数
+
+        Args:
+            message: 警告内容（不含帧号）
+            first_frame: 出现警告的帧号，或帧范围的起始帧
+            last_frame: 帧范围的结束帧，默认与first_frame相同
+            count: 本次报告的帧数
+        """
+        if last_frame is None:
+            last_frame = first_frame
+        with self._lock:
+            entry = self._frame_warnings.get(message)
+            first_report = entry is None
+            if first_report:
+                entry = self._frame_warnings[message] = [first_frame, last_frame, 0]
+            entry[0] = min(entry[0], first_frame)
+            entry[1] = max(entry[1], last_frame)
+            entry[2] += count
+        if first_report:
+            self._post("warning", self._format_frame_warning(message, *entry))
+
+    @staticmethod
+    def _format_frame_warning(message, first_frame, last_frame, count):
+        """格式化合并后的逐帧警告"""
+        if first_frame == last_frame:
+            return f"帧 {first_frame} {message}！"
+        return f"帧 {first_frame}–{last_frame} {message}（共 {count} 帧）"
+
+    def _finish(self):
+        """处理结束时补发最后的进度和逐帧警告汇总，并重置状态"""
+        with self._lock:
+            progress, self._unsent_progress = self._unsent_progress, None
+            warnings = list(self._frame_warnings.items())
+            self._frame_warnings.clear()
+            self._last_progress_time = 0.0
+        if progress:
+            self._post("progress", *progress)
+        for message, entry in warnings:
+            if entry[2] > 1:
+                self._post("warning", self._format_frame_warning(message, *entry))
+
+    def _post(self, kind, *args):
+        """将事件放入队列（可在任意线程中调用）"""
+        self.events.put((kind, args))
+
+    def process_events(self):
+        """
+        取出并分发队列中的所有事件（在UI线程中调用）
+
+        连续的进度事件只分发最新的一个，重复的警告只分发一次。
+        """
+        pending = []
+        while True:
+            try:
+                kind, args = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if pending and kind == "progress" and pending[-1][0] == "progress":
+                pending[-1] = (kind, args)
+            elif kind == "warning" and (kind, args) in pending:
+                continue
+            else:
+                pending.append((kind, args))
+
+        for kind, args in pending:
+            self._dispatch(kind, args)
+
+    def _dispatch(self, kind, args):
+        """调用事件对应的回调"""
+        callback = {
+            "progress": self.progress_callback,
+            "complete": self.complete_callback,
+            "error": self.error_callback,
+            "warning": self.warning_callback,
+        }[kind]
+        if callback:
+            callback(*args)
+
+    def _poll_events(self):
+        """UI定时器：处理队列中的事件后再次安排"""
+        try:
+            self.process_events()
+        finally:
+            self.root.after(UI_EVENT_POLL_MS, self._poll_events)
+
+
+class DirectCallbackManager(CallbackManager):
+    """
+    不依赖Tk的回调管理器
+
+    在处理线程中直接调用回调函数，供命令行和脚本等无界面场景使用。
+    """
+
+    def __init__(self):
+        """初始化回调管理器"""
+        super().__init__(None)
+
+    def _post(self, kind, *args):
+        """直接调用回调，不经过队列"""
+        self._dispatch(kind, args)